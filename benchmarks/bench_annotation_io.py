@@ -0,0 +1,78 @@
+"""
+Compare ways of persisting and reloading a layer of annotations:
+- the binary encoding in AnnotationIO,
+- JSON Lines via AnnotationIO.write_jsonl()/read_jsonl(),
+- the previous approaches: json.dumps() of Annotation.to_dict() per object,
+  and __repr__ plus Annotation.str_to_annotation().
+
+Sample call:
+    python -m benchmarks.bench_annotation_io --size 200000
+"""
+import argparse
+import io
+import json
+import random
+import time
+
+from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction import AnnotationIO
+
+
+def build_annotations(size: int):
+    words = ['between', '170', 'pounds', 'within', 'range', 'times', 'weight', 'gym']
+    rng = random.Random(0)
+    anns = []
+    pos = 0
+    for idx in range(size):
+        word = rng.choice(words)
+        if idx % 10 == 0:
+            anns.append(Annotation('MinMax', word, pos, pos + len(word),
+                                   {'min_number': '170', 'max_number': '220'}))
+        else:
+            anns.append(Annotation('Token', word, pos, pos + len(word), {'kind': 'word'}))
+        pos += len(word) + 1
+    return anns
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<40} {elapsed * 1000:10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=200_000)
+    args = parser.parse_args()
+
+    anns = build_annotations(args.size)
+    print(f"{len(anns)} annotations\n")
+
+    print("Binary (AnnotationIO.annotations_to_bytes):")
+    data = timed("encode", lambda: AnnotationIO.annotations_to_bytes(anns))
+    timed("decode", lambda: AnnotationIO.annotations_from_bytes(data))
+    print(f"  {'size':<40} {len(data) / 1e6:10.1f} MB\n")
+
+    print("JSON Lines (AnnotationIO.write_jsonl):")
+    buffer = io.StringIO()
+    timed("write", lambda: AnnotationIO.write_jsonl(anns, buffer))
+    buffer.seek(0)
+    timed("read", lambda: list(AnnotationIO.read_jsonl(buffer)))
+    print(f"  {'size':<40} {len(buffer.getvalue()) / 1e6:10.1f} MB\n")
+
+    print("Per-object to_dict() + json:")
+    dumped = timed("encode", lambda: [json.dumps(ann.to_dict()) for ann in anns])
+    timed("decode", lambda: [Annotation(**{'ann_type': d['type'], 'contents': d['text'],
+                                           'start_offset': d['start'], 'end_offset': d['end']})
+                             for d in map(json.loads, dumped)])
+    print()
+
+    print("__repr__ + Annotation.str_to_annotation (drops properties):")
+    reprs = timed("encode", lambda: [repr(ann) for ann in anns])
+    timed("decode", lambda: [Annotation.str_to_annotation(r) for r in reprs])
+
+
+if __name__ == '__main__':
+    main()
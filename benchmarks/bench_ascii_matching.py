@@ -0,0 +1,88 @@
+"""
+Compare matching ASCII text with the RegexStrings of the stamp description
+and min/max examples (see examples/) under Unicode semantics
+(ascii_input=False), with the re.ASCII fast path chosen by checking the
+text (ascii_input=None, the default), and with the fast path assumed
+(ascii_input=True).
+
+Sample call:
+    python -m benchmarks.bench_ascii_matching --copies 20000
+"""
+import argparse
+import inspect
+import time
+
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+STAMP_TEXT = inspect.cleandoc("""
+    # 11A - 1853-55 3c George Washington, dull red, type II, imperf
+    # 17 - 1851 12c Washington imperforate, black
+    # 12 - 1856 5c Jefferson, red brown, type I, imperforate
+    # 18 - 1861 1c Franklin, type I, perf 15
+    # 40 - 1875 1c Franklin, bright blue
+    # 42 - 1875 5c Jefferson, orange brown
+    # 62B - 1861 10c Washington, dark green
+""") + '\n'
+
+MIN_MAX_TEXT = inspect.cleandoc("""
+    During those fraught times his weight ranged between 170 and 220 pounds.
+    He visited the gym within the range of 3 to 5 times per week.
+""") + '\n'
+
+
+def make_stamp_patterns(ascii_input):
+    type_phrase_rs = RegexString.concat_with_word_distances(
+        RegexString(['type', 'Type'], whole_word=True, ascii_input=ascii_input),
+        RegexString(['I', 'II', 'III', 'IV', 'V'], whole_word=True, ascii_input=ascii_input),
+        min_nbr_words=0, max_nbr_words=0)
+    type_phrase_rs.ascii_input = ascii_input
+    imperf_rs = RegexString(['imperforate', 'imperf'])
+    perf_sized_rs = RegexString(['perf'], append=r'\s\d+')
+    perf_combined_rs = RegexString.from_regex(
+        f'(?:{imperf_rs.get_regex_str()}|{perf_sized_rs.get_regex_str()})')
+    perf_combined_rs.ascii_input = ascii_input
+    return [
+        RegexString(['#'], append=r'\s\d+(?:\w+)?', ascii_input=ascii_input),
+        RegexString(['c', '¢'], prepend=r'\d\d?', ascii_input=ascii_input),
+        type_phrase_rs,
+        perf_combined_rs,
+    ]
+
+
+def make_min_max_patterns(ascii_input):
+    return [
+        RegexString(['within the range of', 'between'], ascii_input=ascii_input),
+        RegexString([r'\d+'], escape=False, ascii_input=ascii_input),
+        RegexString(['pounds', 'times'], whole_word=True, ascii_input=ascii_input),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=20_000,
+                        help='number of copies of each example text to match')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for name, text, make_patterns in [('stamp description', STAMP_TEXT * args.copies, make_stamp_patterns),
+                                      ('min/max', MIN_MAX_TEXT * args.copies, make_min_max_patterns)]:
+        print(f"{name}: {len(text):,} characters")
+        expected = [rs.get_match_triples(text) for rs in make_patterns(False)]
+        for label, ascii_input in [('unicode', False), ('ascii, detected', None), ('ascii, assumed', True)]:
+            patterns = make_patterns(ascii_input)
+            assert [rs.get_match_triples(text) for rs in patterns] == expected
+            for case_insensitive in (False, True):
+                best = min(_time(lambda: [rs.get_match_triples(text, case_insensitive) for rs in patterns])
+                           for _ in range(args.repeat))
+                case = 'case-insensitive' if case_insensitive else 'case-sensitive'
+                print(f"  {label:<16} {case:<17} {best * 1000:8.1f} ms   {len(text) / best / 1e6:6.2f} M chars/s")
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Compare matching a RegexString against many short records with one
+get_match_triples() call per record and with a single
+RegexString.get_batch_match_triples() call.
+
+Sample call:
+    python -m benchmarks.bench_batch_matching --records 200000 --batch-size 10000
+"""
+import argparse
+import random
+import time
+
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=10_000,
+                        help='number of records per get_batch_match_triples() call')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    words = 'the quick brown fox jumps over lazy dog 12 kg 3 lbs red perf'.split()
+    records = [' '.join(rng.choice(words) for _ in range(rng.randrange(3, 12)))
+               for _ in range(args.records)]
+    regex_strs = [
+        ('literal list', RegexString(['kg', 'lbs', 'red', 'perf'], whole_word=True)),
+        ('prepended regex', RegexString(['kg', 'lbs'], prepend=r'\d+\s', whole_word=True)),
+        ('aho_corasick', RegexString(['kg', 'lbs', 'red', 'perf'], whole_word=True, backend='aho_corasick')),
+    ]
+    batches = [records[start:start + args.batch_size] for start in range(0, len(records), args.batch_size)]
+
+    print(f"{len(records):,} records, {sum(map(len, records)) / len(records):.0f} characters on average, "
+          f"batches of {args.batch_size:,}")
+    for name, rs in regex_strs:
+        expected = [rs.get_match_triples(record) for record in records]
+        assert [triples for batch in batches for triples in rs.get_batch_match_triples(batch)] == expected
+
+        per_record = min(_time(lambda: [rs.get_match_triples(record) for record in records])
+                         for _ in range(args.repeat))
+        batched = min(_time(lambda: [rs.get_batch_match_triples(batch) for batch in batches])
+                      for _ in range(args.repeat))
+        print(f"{name:<16} per record {per_record * 1e6 / len(records):6.2f} us   "
+              f"batched {batched * 1e6 / len(records):6.2f} us   "
+              f"saved {(per_record - batched) * 1e6 / len(records):6.2f} us/record")
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
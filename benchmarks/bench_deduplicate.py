@@ -0,0 +1,48 @@
+"""
+Measure Annotation.deduplicate() against deduplication through Annotation
+__hash__() and __eq__(), i.e. with a set or dict of annotations, on a large
+layer of spans merged from two overlapping sources.
+
+Sample call:
+    python -m benchmarks.bench_deduplicate --size 1000000 --duplicates 0.3
+"""
+import argparse
+import random
+import time
+
+from text_to_relations.relation_extraction.Annotation import Annotation
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=1_000_000,
+                        help='number of spans, duplicates included')
+    parser.add_argument('--duplicates', type=float, default=0.3,
+                        help='fraction of spans which duplicate an earlier span')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    types = ['Number', 'Unit', 'Range', 'CARDINAL']
+    nbr_unique = int(args.size * (1 - args.duplicates))
+    doc = 'x' * (nbr_unique * 10 + 20)
+    unique = []
+    for idx in range(nbr_unique):
+        start = idx * 10 + rng.randrange(5)
+        unique.append(Annotation.from_doc(rng.choice(types), doc, start, start + rng.randrange(1, 15)))
+    anns = unique + [Annotation.from_doc(ann.type, doc, ann.start_offset, ann.end_offset)
+                     for ann in rng.choices(unique, k=args.size - nbr_unique)]
+    rng.shuffle(anns)
+    print(f"{len(anns):,} spans, {nbr_unique:,} distinct")
+
+    for label, func in [('dict.fromkeys (__hash__)', lambda a: list(dict.fromkeys(a))),
+                        ("deduplicate('first')", Annotation.deduplicate),
+                        ("deduplicate('merge')", lambda a: Annotation.deduplicate(a, 'merge')),
+                        ("deduplicate('distinct')", lambda a: Annotation.deduplicate(a, 'distinct'))]:
+        start = time.perf_counter()
+        result = func(anns)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<26} {elapsed * 1000:9.1f} ms   {len(result):,} kept")
+
+
+if __name__ == '__main__':
+    main()
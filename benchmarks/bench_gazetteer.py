@@ -0,0 +1,68 @@
+"""
+Compare building a RegexString from a gazetteer file at every start-up with
+loading it from the cache of Gazetteer.load_gazetteer(), for the flat,
+trie=True and 'aho_corasick' variants. Start-up is measured up to the first
+match, so that it includes compiling the regex.
+
+Sample call:
+    python -m benchmarks.bench_gazetteer --terms 50000
+"""
+import argparse
+import os
+import random
+import re
+import tempfile
+import time
+
+from benchmarks.bench_regex_trie import make_terms
+from text_to_relations.relation_extraction import Gazetteer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--terms', type=int, default=50_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    terms = make_terms(rng, args.terms)
+    text = ' '.join(rng.choice(terms) if rng.random() < 0.1 else ''.join(rng.choices('xyzkl', k=5))
+                    for _ in range(1_000))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'gazetteer.txt')
+        with open(path, 'w', encoding='utf-8') as fp:
+            fp.write('\n'.join(terms) + '\n')
+        cache_dir = os.path.join(tmp_dir, 'cache')
+
+        print(f"gazetteer: {args.terms:,} terms")
+        print(f"{'variant':<6} {'build ms':>9} {'cached ms':>10} {'cache MB':>9}")
+        for label, options in [('flat', {}), ('trie', {'trie': True}),
+                               ('aho', {'backend': 'aho_corasick'})]:
+            def start_up(use_cache):
+                # Simulate a new process: nothing loaded or compiled yet.
+                Gazetteer._loaded.clear()
+                re.purge()
+                rs = Gazetteer.load_gazetteer(path, cache_dir=cache_dir, use_cache=use_cache,
+                                              whole_word=True, **options)
+                return rs.get_match_triples(text)
+
+            expected = start_up(False)
+            # Fill the cache.
+            assert start_up(True) == expected
+            built = min(_time(lambda: start_up(False)) for _ in range(args.repeat))
+            cached = min(_time(lambda: start_up(True)) for _ in range(args.repeat))
+            cache_size = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+            for name in os.listdir(cache_dir):
+                os.remove(os.path.join(cache_dir, name))
+            print(f"{label:<6} {built * 1000:9.1f} {cached * 1000:10.1f} {cache_size / 1e6:9.1f}")
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare the compile and match times of a RegexString built as a flat,
+length-sorted alternation with one built with trie=True and one using the
+'aho_corasick' backend, for gazetteers of increasing size.
+
+Sample call:
+    python -m benchmarks.bench_regex_trie --sizes 100 1000 10000 50000 --text-words 20000
+"""
+import argparse
+import random
+import re
+import time
+from typing import Set
+
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+
+def make_terms(rng: random.Random, count: int):
+    syllables = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'ze', 'an', 'or', 'el']
+    terms: Set[str] = set()
+    while len(terms) < count:
+        words = [''.join(rng.choices(syllables, k=rng.randrange(1, 4)))
+                 for _ in range(rng.randrange(1, 3))]
+        terms.add(' '.join(words))
+    return list(terms)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1_000, 10_000, 50_000])
+    parser.add_argument('--text-words', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    all_terms = make_terms(rng, max(args.sizes))
+    text = ' '.join(rng.choice(all_terms) if rng.random() < 0.1 else ''.join(rng.choices('xyzkl', k=5))
+                    for _ in range(args.text_words))
+
+    print(f"text: {len(text):,} characters")
+    print(f"{'terms':>8} {'variant':<6} {'build ms':>9} {'compile ms':>11} {'match ms':>9} {'matches':>8}")
+    for size in args.sizes:
+        terms = all_terms[:size]
+        results = []
+        for label, options in [('flat', {}), ('trie', {'trie': True}),
+                               ('aho', {'backend': 'aho_corasick'})]:
+            start = time.perf_counter()
+            rs = RegexString(list(terms), whole_word=True, **options)
+            built = time.perf_counter()
+            if 'backend' in options:
+                # Matching an empty text builds the automaton.
+                rs.get_match_triples('')
+            else:
+                # Purge the re module's cache so that compiling is measured.
+                re.purge()
+                rs.get_compiled()
+            compiled = time.perf_counter()
+            triples = rs.get_match_triples(text)
+            matched = time.perf_counter()
+            results.append(triples)
+            print(f"{size:>8,} {label:<6} {(built - start) * 1000:9.1f} {(compiled - built) * 1000:11.1f} "
+                  f"{(matched - compiled) * 1000:9.1f} {len(triples):8,}")
+        if any(triples != results[0] for triples in results[1:]):
+            print("    WARNING: results differ")
+
+
+if __name__ == '__main__':
+    main()
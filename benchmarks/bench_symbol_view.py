@@ -0,0 +1,70 @@
+"""
+Compare the full annotation view of ExtractionPhaseABC.build_merged_representation()
+with the compact symbol view of build_symbol_representation(): their size,
+and the time spent by the chain regexes of the min/max example's chain on
+each, for a document of synthetic weight ranges.
+
+Sample call:
+    python -m benchmarks.bench_symbol_view --sentences 2000
+"""
+import argparse
+import random
+import sys
+
+from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC, SimpleExtractionPhase, ChainLink
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
+from text_to_relations.relation_extraction.RegexString import RegexString
+from text_to_relations.relation_extraction.extraction_loop import get_sorted_annotations_for_matching
+
+
+def make_text(rng: random.Random, nbr_sentences: int) -> str:
+    fillers = ['his', 'weight', 'was', 'noted', 'during', 'those', 'fraught', 'times', 'by', 'the', 'gym']
+    sentences = []
+    for _ in range(nbr_sentences):
+        words = rng.choices(fillers, k=rng.randrange(3, 12))
+        if rng.random() < 0.5:
+            words += ['between', str(rng.randrange(100, 200)), 'and', str(rng.randrange(200, 300)), 'pounds']
+        sentences.append(' '.join(words).capitalize() + '.')
+    return ' '.join(sentences)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sentences', type=int, default=2_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    text = make_text(random.Random(0), args.sentences)
+    regex_patterns = {'Between': RegexString(['between'], whole_word=True),
+                      'Number': RegexString([r'\d+'], escape=False),
+                      'Unit_of_Measure': RegexString(['pounds', 'times'], whole_word=True)}
+    chain = [ChainLink('Between', 'between', 0, 1, 'Number', 'min_number'),
+             ChainLink('Number', 'min_number', 0, 4, 'Number', 'max_number'),
+             ChainLink('Number', 'max_number', 0, 2, 'Unit_of_Measure', 'unit')]
+
+    anns = get_sorted_annotations_for_matching(text, regex_patterns, [])
+    text_view = ExtractionPhaseABC.build_merged_representation(text, anns)
+    symbol_view, view_anns = ExtractionPhaseABC.build_symbol_representation(text, anns)
+    print(f"text: {len(text):,} characters, {len(view_anns):,} annotations")
+    print(f"'text' view:    {len(text_view):,} characters, {sys.getsizeof(text_view) / 1e6:.2f} MB")
+    print(f"'symbols' view: {len(symbol_view):,} characters, {sys.getsizeof(symbol_view) / 1e6:.2f} MB")
+
+    print(f"{'view':<8} {'chain ms':>9} {'total ms':>9} {'relations':>10}")
+    results = []
+    for view in ExtractionPhaseABC.ANNOTATION_VIEWS:
+        best_chain = best_total = float('inf')
+        for _ in range(args.repeat):
+            profiler = PhaseProfiler()
+            phase = SimpleExtractionPhase('MinMax', regex_patterns, chain, profiler=profiler,
+                                          annotation_view=view)
+            relations = phase.find_match(text)
+            chain_time = sum(row[1] for row in profiler.get_report() if row[0].startswith('chain['))
+            best_chain = min(best_chain, chain_time)
+            best_total = min(best_total, profiler.total_seconds)
+        results.append(relations)
+        print(f"{view:<8} {best_chain * 1000:9.1f} {best_total * 1000:9.1f} {len(relations):10,}")
+    assert all(relations == results[0] for relations in results)
+
+
+if __name__ == '__main__':
+    main()
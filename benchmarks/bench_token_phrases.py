@@ -0,0 +1,66 @@
+"""
+Compare matching phrase lists of 100 to 10,000 items with a RegexString
+(flat and trie=True alternations of whole words) and with a
+TokenPhraseMatcher over the document's tokens. As in a phase, the tokens
+are computed once, so they are timed separately from the matching.
+
+Sample call:
+    python -m benchmarks.bench_token_phrases --sizes 100 1000 10000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_regex_trie import make_terms
+from text_to_relations.relation_extraction.RegexString import RegexString
+from text_to_relations.relation_extraction.TokenAnn import TokenAnn
+from text_to_relations.relation_extraction.TokenPhraseMatcher import TokenPhraseMatcher
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1_000, 10_000])
+    parser.add_argument('--text-words', type=int, default=20_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    all_terms = make_terms(rng, max(args.sizes))
+    text = ' '.join(rng.choice(all_terms) if rng.random() < 0.1 else ''.join(rng.choices('xyzkl', k=5))
+                    for _ in range(args.text_words))
+
+    start = time.perf_counter()
+    tokens = TokenAnn.get_token_objects(text, 0)
+    tokenize_time = time.perf_counter() - start
+    print(f"text: {len(text):,} characters, {len(tokens):,} tokens, tokenized in {tokenize_time * 1000:.1f} ms")
+    print(f"{'terms':>8} {'variant':<7} {'build ms':>9} {'match ms':>9} {'matches':>8}")
+    for size in args.sizes:
+        terms = all_terms[:size]
+        variants = [('flat', lambda: RegexString(terms, whole_word=True)),
+                    ('trie', lambda: RegexString(terms, whole_word=True, trie=True)),
+                    ('tokens', lambda: TokenPhraseMatcher(terms))]
+        results = []
+        for label, build in variants:
+            start = time.perf_counter()
+            matcher = build()
+            build_time = time.perf_counter() - start
+            if isinstance(matcher, RegexString):
+                # Compile outside the timed match.
+                matcher.get_match_triples('')
+                match = lambda: matcher.get_match_triples(text)  # noqa: E731
+            else:
+                match = lambda: matcher.get_match_triples(text, tokens=tokens)  # noqa: E731
+            triples = match()
+            match_time = min(_time(match) for _ in range(3))
+            results.append(triples)
+            print(f"{size:8,} {label:<7} {build_time * 1000:9.1f} {match_time * 1000:9.1f} {len(triples):8,}")
+        assert all(triples == results[0] for triples in results)
+
+
+def _time(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+"""
+AhoCorasick: a multi-string matcher for lists of literal terms, used as an
+alternative to the regex engine by RegexString(..., backend='aho_corasick').
+
+Case-insensitive matching folds case as re.IGNORECASE does. Besides simple
+lowercasing, that treats some different lowercase characters with the same
+uppercase as equal, e.g. 's' and 'ſ', or 'σ' and 'ς'. Their table is private
+to the re module (re._casefix from Python 3.11, sre_compile before), so it
+is imported from there and may need updating for new Python versions.
+"""
+import heapq
+import sys
+from typing import Dict, Iterator, List, Optional, Tuple
+
+if sys.version_info >= (3, 11):
+    from re._casefix import _EXTRA_CASES as _CASE_EQUIVALENTS  # type: ignore
+else:
+    from sre_compile import _ignorecase_fixes as _CASE_EQUIVALENTS  # type: ignore
+
+
+def _is_word_char(char: str) -> bool:
+    # The same characters as the \w of the re module, for str patterns.
+    return char.isalnum() or char == '_'
+
+
+class _FoldTable(dict):
+    """
+    A str.translate() table, filled in as characters are seen, mapping each
+    character to the representative of the characters re.IGNORECASE treats
+    as equal to it.
+    """
+
+    def __missing__(self, code: int) -> int:
+        lowered = chr(code).lower()
+        # Only 'İ' has a lowercase of several characters; re uses its first.
+        folded = ord(lowered[0])
+        folded = min((folded,) + tuple(_CASE_EQUIVALENTS.get(folded, ())))
+        self[code] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
+
+
+def ignorecase_fold(text: str) -> str:
+    """
+    Fold text character by character, as re.IGNORECASE does, without
+    changing its length: two strings match each other under re.IGNORECASE
+    exactly when their folds are equal.
+
+    Args:
+        text (str):
+
+    Returns:
+        str:
+    """
+    if text.isascii():
+        # Each ASCII letter's lowercase is already the representative.
+        return text.lower()
+    return text.translate(_FOLD_TABLE)
+
+
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton over a list of literal terms.
+
+    find_longest() returns the same matches as re.finditer() with a regex
+    alternating the terms longest first, optionally surrounded by '\\b', but
+    the automaton reads each character of the text once, so the time taken
+    grows with the length of the text and the number of candidate matches
+    rather than with the number of terms.
+    """
+
+    def __init__(self, terms: List[str], case_insensitive: bool = False):
+        """
+        Args:
+            terms (List[str]): the literal strings to find.
+            case_insensitive (bool, optional): if True, terms and text are
+                compared after folding case as re.IGNORECASE does. Defaults
+                to False.
+
+        Raises:
+            ValueError: if any term is empty.
+        """
+        if any(term == '' for term in terms):
+            raise ValueError("Aho-Corasick terms cannot be empty.")
+        self.case_insensitive = case_insensitive
+
+        # State 0 is the root. For each state: its transitions, the length of
+        # the term ending there (0 if none), its failure link, and its output
+        # link--the nearest state along the failure links where a term ends.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._term_len: List[int] = [0]
+        for term in terms:
+            if case_insensitive:
+                term = ignorecase_fold(term)
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._term_len.append(0)
+                state = next_state
+            self._term_len[state] = len(term)
+
+        nbr_states = len(self._goto)
+        self._fail = [0] * nbr_states
+        self._output = [0] * nbr_states
+        # Breadth-first, so that the failure link of each state is computed
+        # before those of its children.
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                child_fail = self._goto[fail].get(char, 0)
+                if child_fail == child:
+                    child_fail = 0
+                self._fail[child] = child_fail
+                self._output[child] = child_fail if self._term_len[child_fail] else self._output[child_fail]
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Return the (start, end) offsets of every occurrence of every term in
+        text, overlapping ones included, in order of end offset.
+
+        Args:
+            text (str):
+
+        Returns:
+            List[Tuple[int, int]]:
+        """
+        return list(self.iter_all(text))
+
+    def iter_all(self, text: str, start: int = 0,
+                 end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+        """
+        Lazily yield what find_all() returns, optionally for the terms lying
+        entirely within text[start:end], with offsets relative to text.
+
+        Args:
+            text (str):
+            start (int, optional): Defaults to 0.
+            end (int, optional): Defaults to None, meaning len(text).
+
+        Returns:
+            Iterator[Tuple[int, int]]:
+        """
+        if end is None:
+            end = len(text)
+        if start or end < len(text):
+            text = text[start:end]
+        if self.case_insensitive:
+            text = ignorecase_fold(text)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        term_len = self._term_len
+
+        state = 0
+        for match_end, char in enumerate(text, start + 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = state if term_len[state] else output[state]
+            while found:
+                yield match_end - term_len[found], match_end
+                found = output[found]
+
+    def find_longest(self, text: str, whole_word: bool = False) -> List[Tuple[str, int, int]]:
+        """
+        Return non-overlapping matches, scanning left to right and taking
+        the longest term at each position, as the regex engine does with an
+        alternation sorted longest first.
+
+        Args:
+            text (str):
+            whole_word (bool, optional): if True, a match must start and end
+                at a word boundary, as if the alternation were surrounded by
+                '\\b'. Defaults to False.
+
+        Returns:
+            List[Tuple[str, int, int]]: (text-matched, start-offset,
+                end-offset) triples; the matched text keeps the casing of text.
+        """
+        return list(self.iter_longest(text, whole_word))
+
+    def iter_longest(self, text: str, whole_word: bool = False, start: int = 0,
+                     end: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+        """
+        Lazily yield what find_longest() returns, optionally searching only
+        text[start:end] as re.finditer(text, start, end) would: offsets are
+        relative to text, and a word boundary at start depends on the
+        character before it.
+
+        Matches are yielded as soon as no longer term starting at the same
+        position can still be found, so memory use does not grow with the
+        length of the text.
+
+        Args:
+            text (str):
+            whole_word (bool, optional): Defaults to False.
+            start (int, optional): Defaults to 0.
+            end (int, optional): Defaults to None, meaning len(text).
+
+        Returns:
+            Iterator[Tuple[str, int, int]]:
+        """
+        if end is None:
+            end = len(text)
+        max_term_len = max(self._term_len)
+        # Matches arrive in order of end offset, so for a given start offset
+        # the last match seen is the longest. A start offset is settled once
+        # the scan is max_term_len characters past it.
+        longest_end: Dict[int, int] = {}
+        pending: List[int] = []
+        pos = start
+        for match_start, match_end in self.iter_all(text, start, end):
+            if whole_word and not (self._at_boundary(text, match_start, end) and
+                                   self._at_boundary(text, match_end, end)):
+                continue
+            if match_start not in longest_end:
+                heapq.heappush(pending, match_start)
+            longest_end[match_start] = match_end
+            while pending and pending[0] <= match_end - max_term_len:
+                pos = yield from self._settle(text, heapq.heappop(pending), longest_end, pos)
+        while pending:
+            pos = yield from self._settle(text, heapq.heappop(pending), longest_end, pos)
+
+    @staticmethod
+    def _settle(text: str, match_start: int, longest_end: Dict[int, int], pos: int):
+        """Yield the longest match at match_start unless it overlaps the previous one."""
+        match_end = longest_end.pop(match_start)
+        if match_start < pos:
+            return pos
+        yield text[match_start:match_end], match_start, match_end
+        return match_end
+
+    @staticmethod
+    def _at_boundary(text: str, idx: int, end: int) -> bool:
+        # The same test as '\\b', for a string ending at end.
+        return (idx > 0 and _is_word_char(text[idx - 1])) != \
+            (idx < end and _is_word_char(text[idx]))
+
+
+if __name__ == '__main__':
+    pass
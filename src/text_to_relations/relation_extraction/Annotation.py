@@ -1,24 +1,85 @@
-import re
-from typing import Dict, Collection, List, Optional
+import copy
+from bisect import bisect_left, bisect_right
+from operator import attrgetter
+from typing import Dict, Collection, List, Optional, Sequence, Tuple, Union
 
 from text_to_relations.relation_extraction import StringUtils
+from text_to_relations.relation_extraction import TypeRegistry
+
+# Characters escaped in the text field and property values of __repr__, so
+# that any text can be parsed back by str_to_annotation() and neither can be
+# mistaken for the angle brackets delimiting annotations in a merged
+# representation.
+_REPR_TEXT_ESCAPES = str.maketrans({'\\': '\\\\', "'": "\\'", '<': '\\x3c', '>': '\\x3e'})
+_SIMPLE_UNESCAPES = {'\\': '\\', "'": "'", '"': '"'}
+# For each quote character: the separators around the text, start and end
+# fields, exactly as written by __repr__.
+_REPR_SEPARATORS = {quote: (f"{quote}(text={quote}", f"{quote}, start={quote}", f"{quote}, end={quote}")
+                    for quote in '\'"'}
+# The key on which Annotation.deduplicate() identifies duplicates.
+_dedup_key = attrgetter('type_id', 'start_offset', 'end_offset')
+
+
+def _normalize_text(contents: str) -> str:
+    """
+    Return contents with newlines replaced by spaces, multiple spaces
+    collapsed, and whitespace stripped.
+    """
+    cleaned_contents = contents.replace('\n', ' ')
+    return StringUtils.remove_multiple_spaces(cleaned_contents).strip()
+
+
+def _unescape(value: str) -> str:
+    """Reverse the escaping applied to the text field of Annotation.__repr__()."""
+    chars = []
+    idx = 0
+    value_len = len(value)
+    while idx < value_len:
+        char = value[idx]
+        if char == '\\' and idx + 1 < value_len:
+            next_char = value[idx + 1]
+            if next_char in _SIMPLE_UNESCAPES:
+                chars.append(_SIMPLE_UNESCAPES[next_char])
+                idx += 2
+                continue
+            hex_digits = value[idx + 2:idx + 4]
+            if next_char == 'x' and len(hex_digits) == 2 and \
+                    all(digit in '0123456789abcdefABCDEF' for digit in hex_digits):
+                chars.append(chr(int(hex_digits, 16)))
+                idx += 4
+                continue
+        # Not an escape sequence we produce: keep the character as is.
+        chars.append(char)
+        idx += 1
+    return ''.join(chars)
+
 
 class Annotation:
     """Represents a typed, offset-based annotation (entity mention) in a document."""
-    regexQuote = r"['\"].*?['\"]"
 
-    def __init__(self, ann_type: str, contents: str,
+    # Strategies accepted by resolve_overlaps().
+    OVERLAP_STRATEGIES = ('longest', 'priority', 'leftmost')
+    # Property handling modes accepted by deduplicate().
+    DEDUPLICATE_MODES = ('first', 'merge', 'distinct')
+
+    def __init__(self, ann_type: str, contents: Optional[str],
                  start_offset: int, end_offset: int,
-                 properties: Optional[Dict[str, object]] = None):
+                 properties: Optional[Dict[str, object]] = None,
+                 doc: Optional[str] = None):
         """
 
         Args:
             ann_type (str): annotation (entity) type, e.g. Person, Currency, River
-            contents (str): the mention in the doc, e.g. 'John Smith', 'Euros', 'Amazon'
+            contents (str, optional): the mention in the doc, e.g. 'John Smith',
+                'Euros', 'Amazon'. May be None if doc is given.
             start_offset (int):
             end_offset (int):
             properties (Dict[str, object], optional): A free-form dict for
                 adding attributes. Defaults to None.
+            doc (str, optional): the document the offsets refer to. If contents
+                is None, the annotation keeps a reference to doc and only slices
+                and normalizes its text the first time the text property is
+                read. See from_doc(). Defaults to None.
         """
         if start_offset > end_offset:
             raise ValueError(
@@ -28,20 +89,99 @@ class Annotation:
             raise ValueError(
                 f"Start and end offset cannot be less than 0. Start: {start_offset}; End: {end_offset}")
 
+        # Also sets self.type_id; see the type property.
         self.type = ann_type
         self.start_offset = start_offset
         self.end_offset = end_offset
 
-        cleaned_contents = contents.replace('\n', ' ')
-        # Contents with newlines replaced by spaces, multiple spaces collapsed,
-        # and whitespace stripped.
-        self.text = StringUtils.remove_multiple_spaces(cleaned_contents).strip()
+        self._text: Optional[str] = None
+        self._doc: Optional[str] = None
+        if contents is not None:
+            self._text = _normalize_text(contents)
+        elif doc is not None:
+            if end_offset > len(doc):
+                raise ValueError(
+                    f"End offset cannot be greater than the document length. End: {end_offset}; "
+                    f"Length: {len(doc)}")
+            self._doc = doc
+        else:
+            raise ValueError("Either contents or doc must be given.")
 
         if properties is None:
             properties = {}
         self.properties = properties
 
 
+    @staticmethod
+    def from_doc(ann_type: str, doc: str, start_offset: int, end_offset: int,
+                 properties: Optional[Dict[str, object]] = None) -> 'Annotation':
+        """
+        Create an Annotation whose text is taken from the document only when
+        it is first needed, then cached.
+
+        Most token and entity annotations are used only for their offsets
+        during matching; creating them this way avoids copying and
+        normalizing text which may never be read.
+
+        Args:
+            ann_type (str): annotation (entity) type
+            doc (str): the document the offsets refer to
+            start_offset (int):
+            end_offset (int):
+            properties (Dict[str, object], optional): Defaults to None.
+
+        Returns:
+            'Annotation':
+        """
+        return Annotation(ann_type, None, start_offset, end_offset, properties, doc=doc)
+
+
+    @property
+    def type(self) -> str:
+        """
+        The annotation type name. Assigning it also updates type_id, the
+        type's id in the process-wide TypeRegistry, which is what equality
+        checks and the matching engine compare.
+        """
+        return self._type
+
+    @type.setter
+    def type(self, value: str):
+        self.type_id = TypeRegistry.get_type_id(value)
+        self._type = TypeRegistry.get_type_name(self.type_id)
+
+    @property
+    def text(self) -> str:
+        """
+        The mention in the doc, with newlines replaced by spaces, multiple
+        spaces collapsed, and whitespace stripped.
+        """
+        if self._text is None:
+            assert self._doc is not None
+            self._text = _normalize_text(self._doc[self.start_offset:self.end_offset])
+            # The text is cached, so the document is no longer needed.
+            self._doc = None
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        self._text = value
+        self._doc = None
+
+    def __getstate__(self):
+        # Don't pickle a whole document along with each lazily-created annotation.
+        state = self.__dict__.copy()
+        state['_text'] = self.text
+        state['_doc'] = None
+        # Type ids are only meaningful within one process; see __setstate__().
+        del state['type_id']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.type = state['_type']
+
+
     def to_dict(self) -> Dict[str, object]:
         """Return a dict representation with type, start, end, and text keys."""
         result = {'type': self.type,
@@ -52,17 +192,21 @@ class Annotation:
 
 
     def __repr__(self):
+        # Backslashes, single quotes and angle brackets in the text and the
+        # property values are escaped; see _REPR_TEXT_ESCAPES.
+        text = self.text.translate(_REPR_TEXT_ESCAPES)
         if self.properties == {}:
-            result = (f"<'{self.type}'(text='{self.text}', "
+            result = (f"<'{self.type}'(text='{text}', "
                       f"start='{self.start_offset}', end='{self.end_offset}')>")
         else:
             features = ''
             for feature_name in self.properties:
-                features += f"{feature_name}='{self.properties[feature_name]}', "
+                value = str(self.properties[feature_name]).translate(_REPR_TEXT_ESCAPES)
+                features += f"{feature_name}='{value}', "
             # Remove last comma-space.
             features = features[0:-2]
 
-            result = (f"<'{self.type}'(text='{self.text}', "
+            result = (f"<'{self.type}'(text='{text}', "
                       f"start='{self.start_offset}', end='{self.end_offset}', {features})>")
 
         return result
@@ -74,7 +218,7 @@ class Annotation:
             return True
         if self.properties != other.properties:
             return False
-        if self.type == other.type and \
+        if self.type_id == other.type_id and \
                 self.start_offset == other.start_offset and \
                 self.end_offset == other.end_offset and \
                 self.text == other.text:
@@ -106,21 +250,82 @@ class Annotation:
         - "<'AnnotationName'(text='...', start='m', end='n')>"
         - '<"AnnotationName"(text="...", start="m", end="n")>'
 
+        The string is parsed in a single left-to-right scan. Escape sequences
+        written by __repr__ in the text field are decoded, so text containing
+        quotes, backslashes or angle brackets round-trips. Fields after text,
+        start and end--i.e. the properties, whose values __repr__ escapes
+        in the same way--are ignored.
+
         Args:
             ann_str (str):
 
+        Raises:
+            ValueError: if ann_str is not in one of the forms above.
+
         Returns:
             'Annotation':
         """
-        matches = re.findall(Annotation.regexQuote, ann_str)
-        # We use '[1:-1]' to chop off the quote at either end.
-        a_type = matches[0][1:-1]
-        contents = matches[1][1:-1]
-        start = int(matches[2][1:-1])
-        end = int(matches[3][1:-1])
-        ann = Annotation(a_type, contents, start, end)
-        return ann
+        if len(ann_str) < 2 or ann_str[0] != '<' or ann_str[1] not in '\'"':
+            raise ValueError(f"Not an annotation string: {ann_str!r}")
+
+        quote = ann_str[1]
+        type_end = ann_str.find(quote, 2)
+        if type_end == -1 or ann_str[type_end + 1:type_end + 2] != '(':
+            raise ValueError(f"Not an annotation string: {ann_str!r}")
+        a_type = ann_str[2:type_end]
+
+        # Fast path for the exact layout written by __repr__, with no escapes in the text.
+        text_sep, start_sep, end_sep = _REPR_SEPARATORS[quote]
+        if ann_str.startswith(text_sep, type_end):
+            text_start = type_end + len(text_sep)
+            start_sep_idx = ann_str.find(start_sep, text_start)
+            if start_sep_idx != -1 and ann_str.find('\\', text_start, start_sep_idx) == -1:
+                start_val_idx = start_sep_idx + len(start_sep)
+                end_sep_idx = ann_str.find(end_sep, start_val_idx)
+                if end_sep_idx != -1:
+                    end_val_idx = end_sep_idx + len(end_sep)
+                    end_val_end = ann_str.find(quote, end_val_idx)
+                    if end_val_end != -1:
+                        return Annotation(a_type, ann_str[text_start:start_sep_idx],
+                                          int(ann_str[start_val_idx:end_sep_idx]),
+                                          int(ann_str[end_val_idx:end_val_end]))
+
+        # General case: scan the key='value' fields in whatever order they appear.
+        fields: Dict[str, str] = {}
+        idx = type_end + 2
+        str_len = len(ann_str)
+        while len(fields) < 3:
+            # Skip the separator between fields. The separator is optional.
+            while idx < str_len and ann_str[idx] in ', ':
+                idx += 1
+            equals_idx = ann_str.find('=', idx)
+            if equals_idx == -1 or equals_idx + 1 >= str_len or \
+                    ann_str[equals_idx + 1] not in '\'"':
+                raise ValueError(f"Not an annotation string: {ann_str!r}")
+            key = ann_str[idx:equals_idx]
+            value_quote = ann_str[equals_idx + 1]
+            value_start = equals_idx + 2
+
+            # Find the closing quote, skipping over escaped characters.
+            value_end = ann_str.find(value_quote, value_start)
+            backslash_idx = ann_str.find('\\', value_start, value_end)
+            while backslash_idx != -1 and value_end != -1:
+                if backslash_idx + 1 == value_end:
+                    value_end = ann_str.find(value_quote, value_end + 1)
+                backslash_idx = ann_str.find('\\', backslash_idx + 2, value_end)
+            if value_end == -1:
+                raise ValueError(f"Not an annotation string: {ann_str!r}")
 
+            value = ann_str[value_start:value_end]
+            if key in ('text', 'start', 'end'):
+                fields[key] = value
+            idx = value_end + 1
+
+        contents = fields['text']
+        if '\\' in contents:
+            contents = _unescape(contents)
+        ann = Annotation(a_type, contents, int(fields['start']), int(fields['end']))
+        return ann
 
     @staticmethod
     def encloses(ann1: 'Annotation', ann2: 'Annotation') -> bool:
@@ -160,5 +365,260 @@ class Annotation:
         return result
 
 
+    @staticmethod
+    def get_enclosed_pairs(containers: List['Annotation'],
+                           ann_list: List['Annotation']
+                           ) -> List[Tuple['Annotation', 'Annotation']]:
+        """
+        Bulk version of get_enclosed(): return every (container, enclosed)
+        pair between two annotation layers--e.g. sentences and tokens--in a
+        single sweep over both lists, instead of calling get_enclosed() once
+        per container.
+
+        Both lists must already be sorted by starting and ending offset, as
+        returned by Annotation.sort(). Pairs are returned in ann_list order;
+        an annotation enclosed by several containers yields one pair per
+        container, in containers order.
+
+        The sweep runs in O(n + m) time for n containers and m annotations
+        when the containers do not overlap one another (sentences, paragraphs,
+        relations); in general each annotation is compared only against the
+        containers still open at its starting offset.
+        Args:
+            containers (List['Annotation']): sorted candidate enclosing annotations
+            ann_list (List['Annotation']): sorted annotations to be enclosed
+
+        Returns:
+            List[Tuple['Annotation', 'Annotation']]:
+        """
+        result = []
+        # Containers whose start offset has been reached and whose end offset
+        # may still enclose an upcoming annotation.
+        open_containers: List['Annotation'] = []
+        next_container_idx = 0
+        nbr_containers = len(containers)
+
+        for ann_element in ann_list:
+            while next_container_idx < nbr_containers and \
+                    containers[next_container_idx].start_offset <= ann_element.start_offset:
+                open_containers.append(containers[next_container_idx])
+                next_container_idx += 1
+
+            still_open = []
+            for container in open_containers:
+                # Because ann_list is sorted by start offset, a container
+                # ending before this annotation starts cannot enclose any
+                # later annotation either.
+                if container.end_offset < ann_element.start_offset:
+                    continue
+                still_open.append(container)
+                if container.end_offset >= ann_element.end_offset:
+                    result.append((container, ann_element))
+            open_containers = still_open
+
+        return result
+
+
+    @staticmethod
+    def resolve_overlaps(items: Collection['Annotation'],
+                         strategy: str = 'longest',
+                         type_priority: Optional[Sequence[str]] = None
+                         ) -> List['Annotation']:
+        """
+        Remove overlapping annotations, keeping a subset in which no two
+        annotations share a character. Annotations which merely touch, e.g.
+        one ending where the next starts, do not overlap.
+
+        Candidates are ranked according to the strategy and then accepted
+        greedily, best first, whenever they do not overlap an annotation
+        already accepted:
+            'longest': longer annotations win; ties go to the leftmost.
+            'priority': annotations whose type comes earlier in type_priority
+                win, then longer ones, then the leftmost. Types missing from
+                type_priority rank below all listed types.
+            'leftmost': annotations starting earlier win; ties go to the longest.
+        Remaining ties, e.g. two annotations of different types on the same
+        span, go to the one which comes first in items.
+
+        Ranking is an O(n log n) sort; each acceptance test is then a
+        binary search of the accepted annotations, which are kept sorted.
+        Args:
+            items (Collection['Annotation']): annotations in any order
+            strategy (str, optional): one of OVERLAP_STRATEGIES. Defaults to 'longest'.
+            type_priority (Sequence[str], optional): annotation type names,
+                highest priority first. Required by the 'priority' strategy.
+
+        Raises:
+            ValueError: if strategy is unknown, or if it is 'priority' and
+                type_priority is not given.
+
+        Returns:
+            List['Annotation']: the surviving annotations, sorted as by
+                Annotation.sort().
+        """
+        if strategy not in Annotation.OVERLAP_STRATEGIES:
+            raise ValueError(f"Unknown overlap strategy: {strategy!r}. "
+                             f"Expected one of {Annotation.OVERLAP_STRATEGIES}.")
+        if strategy == 'priority' and type_priority is None:
+            raise ValueError("The 'priority' overlap strategy requires type_priority.")
+
+        if strategy == 'leftmost':
+            # A single sweep suffices: once ranked leftmost-first, a candidate
+            # can only overlap the last non-empty annotation accepted, or
+            # duplicate the last annotation accepted.
+            result: List['Annotation'] = []
+            last_end = -1
+            last_start = -1
+            for ann in sorted(items, key=lambda a: (a.start_offset, -a.end_offset)):
+                if ann.start_offset == ann.end_offset:
+                    if last_start < ann.start_offset < last_end or \
+                            (result and result[-1].start_offset == result[-1].end_offset == ann.start_offset):
+                        continue
+                else:
+                    if ann.start_offset < last_end:
+                        continue
+                    last_start, last_end = ann.start_offset, ann.end_offset
+                result.append(ann)
+            return result
+
+        rank_by_type_id: Dict[int, int] = {}
+        unlisted = 0
+        if strategy == 'priority':
+            assert type_priority is not None
+            unlisted = len(type_priority)
+            for idx, type_name in enumerate(type_priority):
+                rank_by_type_id.setdefault(TypeRegistry.get_type_id(type_name), idx)
+
+        def rank(ann: 'Annotation') -> Tuple[int, int, int]:
+            return (rank_by_type_id.get(ann.type_id, unlisted),
+                    ann.start_offset - ann.end_offset, ann.start_offset)
+
+        # The accepted non-empty annotations do not overlap, so sorted by
+        # start offset they are also sorted by end offset. They are kept as
+        # two parallel sorted lists, and the accepted zero-length
+        # annotations as a sorted list of their offsets; each acceptance
+        # test is then a few binary searches against the neighbouring
+        # intervals:
+        #   starts, ends: offsets of the accepted non-empty annotations
+        #   points: offsets of the accepted zero-length annotations
+        starts: List[int] = []
+        ends: List[int] = []
+        points: List[int] = []
+
+        accepted: List['Annotation'] = []
+        for ann in sorted(items, key=rank):
+            start, end = ann.start_offset, ann.end_offset
+            # The accepted annotation starting last before end, if any, is
+            # the only one which can reach past start.
+            idx = bisect_left(starts, end if start < end else start)
+            if idx > 0 and ends[idx - 1] > start:
+                continue
+            point_idx = bisect_right(points, start) if start < end else bisect_left(points, start)
+            if start == end:
+                # Zero-length: it overlaps an annotation strictly enclosing it.
+                if point_idx < len(points) and points[point_idx] == start:
+                    continue
+                points.insert(point_idx, start)
+            else:
+                # A zero-length annotation strictly inside this one overlaps it.
+                if point_idx < len(points) and points[point_idx] < end:
+                    continue
+                starts.insert(idx, start)
+                ends.insert(idx, end)
+            accepted.append(ann)
+        return Annotation.sort(accepted)
+
+
+    @staticmethod
+    def deduplicate(items: Collection['Annotation'],
+                    properties: str = 'first') -> List['Annotation']:
+        """
+        Remove duplicate annotations, e.g. the same entity found both by an
+        external tool and by a pattern. Two annotations are duplicates if
+        they have the same type and the same offsets; their text, which the
+        offsets determine, is not compared.
+
+        Duplicates are found with a dict keyed on (type_id, start_offset,
+        end_offset), in O(n) time, rather than with __eq__() and __hash__(),
+        which compare properties and hash the whole __repr__().
+
+        How the properties of duplicates are handled depends on properties:
+            'first': the first annotation is kept and the properties of its
+                duplicates are discarded.
+            'merge': the first annotation is kept, with the properties of its
+                duplicates added to it. Where two duplicates set the same
+                property, the earlier value wins. The input annotations are
+                not modified: a merged annotation is a copy.
+            'distinct': annotations are only duplicates if their properties
+                are equal too; the first of each is kept.
+        Args:
+            items (Collection['Annotation']): annotations in any order
+            properties (str, optional): one of DEDUPLICATE_MODES. Defaults to 'first'.
+
+        Raises:
+            ValueError: if properties is unknown.
+
+        Returns:
+            List['Annotation']: the first annotation of each group of
+                duplicates, in the order of items.
+        """
+        if properties not in Annotation.DEDUPLICATE_MODES:
+            raise ValueError(f"Unknown deduplication mode: {properties!r}. "
+                             f"Expected one of {Annotation.DEDUPLICATE_MODES}.")
+
+        if properties == 'first':
+            # dict.setdefault() keeps the first annotation per key, and the
+            # dict preserves first-insertion order.
+            first_by_key: Dict[Tuple[int, int, int], 'Annotation'] = {}
+            for ann in items:
+                first_by_key.setdefault(_dedup_key(ann), ann)
+            return list(first_by_key.values())
+
+        result: List['Annotation'] = []
+        if properties == 'distinct':
+            # Properties dicts are not hashable, so annotations with the same
+            # key are compared on properties within their (usually tiny) group.
+            # Keys with a single annotation so far map to the annotation itself.
+            groups: Dict[Tuple[int, int, int], Union['Annotation', List['Annotation']]] = {}
+            for ann in items:
+                key = _dedup_key(ann)
+                group = groups.setdefault(key, ann)
+                if group is not ann:
+                    if isinstance(group, Annotation):
+                        if ann.properties == group.properties:
+                            continue
+                        groups[key] = [group, ann]
+                    elif all(ann.properties != other.properties for other in group):
+                        group.append(ann)
+                    else:
+                        continue
+                result.append(ann)
+            return result
+
+        result_idx: Dict[Tuple[int, int, int], int] = {}
+        copied = set()
+        for ann in items:
+            key = _dedup_key(ann)
+            idx = result_idx.get(key)
+            if idx is None:
+                result_idx[key] = len(result)
+                result.append(ann)
+                continue
+            if not ann.properties:
+                continue
+            kept = result[idx]
+            new_names = [name for name in ann.properties if name not in kept.properties]
+            if not new_names:
+                continue
+            if idx not in copied:
+                kept = copy.copy(kept)
+                kept.properties = dict(kept.properties)
+                result[idx] = kept
+                copied.add(idx)
+            for name in new_names:
+                kept.properties[name] = ann.properties[name]
+        return result
+
+
 if __name__ == '__main__':
     pass
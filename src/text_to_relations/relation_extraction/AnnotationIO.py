@@ -0,0 +1,226 @@
+"""
+Bulk serialization of annotations: a compact binary encoding for caching
+whole annotation layers, and streaming JSON Lines readers and writers for
+exchanging them between pipeline stages.
+"""
+import json
+import struct
+import sys
+from array import array
+from typing import Dict, IO, Iterable, Iterator, List, Optional
+
+from text_to_relations.relation_extraction.Annotation import Annotation
+
+# Binary layout, all integers little-endian:
+#   header     magic (4 bytes), version (u8), annotation count (u32),
+#              type count (u32), text length (u32), properties length (u32)
+#   types      per type: byte length (u32) followed by UTF-8 bytes
+#   columns    type ids (u32 * n), start offsets (i64 * n), end offsets (i64 * n),
+#              text lengths in characters (u32 * n)
+#   text       all annotation texts concatenated, UTF-8 encoded
+#   properties JSON list with one properties dict (or null) per annotation;
+#              absent when no annotation has properties
+_MAGIC = b'T2RA'
+_VERSION = 1
+_HEADER = struct.Struct('<4sBIIII')
+_U32 = struct.Struct('<I')
+
+
+def _column_to_bytes(typecode: str, values: Iterable[int]) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _column_from_bytes(typecode: str, data: bytes, offset: int, count: int) -> array:
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(data[offset:end])
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column
+
+
+def annotations_to_bytes(anns: List[Annotation]) -> bytes:
+    """
+    Encode a list of annotations, including their properties, in a compact
+    binary form which annotations_from_bytes() reverses.
+
+    Property values must be JSON-serializable.
+
+    Args:
+        anns (List[Annotation]):
+
+    Returns:
+        bytes:
+    """
+    type_names: List[str] = []
+    type_idx_by_name: Dict[str, int] = {}
+    type_ids = []
+    for ann in anns:
+        type_idx = type_idx_by_name.get(ann.type)
+        if type_idx is None:
+            type_idx = len(type_names)
+            type_idx_by_name[ann.type] = type_idx
+            type_names.append(ann.type)
+        type_ids.append(type_idx)
+
+    texts = [ann.text for ann in anns]
+    text_bytes = ''.join(texts).encode('utf-8')
+
+    properties_bytes = b''
+    if any(ann.properties for ann in anns):
+        properties_bytes = json.dumps([ann.properties or None for ann in anns],
+                                      separators=(',', ':')).encode('utf-8')
+
+    parts = [_HEADER.pack(_MAGIC, _VERSION, len(anns), len(type_names),
+                          len(text_bytes), len(properties_bytes))]
+    for type_name in type_names:
+        encoded = type_name.encode('utf-8')
+        parts.append(_U32.pack(len(encoded)))
+        parts.append(encoded)
+    parts.append(_column_to_bytes('I', type_ids))
+    parts.append(_column_to_bytes('q', (ann.start_offset for ann in anns)))
+    parts.append(_column_to_bytes('q', (ann.end_offset for ann in anns)))
+    parts.append(_column_to_bytes('I', (len(text) for text in texts)))
+    parts.append(text_bytes)
+    parts.append(properties_bytes)
+    return b''.join(parts)
+
+
+def annotations_from_bytes(data: bytes) -> List[Annotation]:
+    """
+    Decode the output of annotations_to_bytes().
+
+    Args:
+        data (bytes):
+
+    Raises:
+        ValueError: if data was not produced by annotations_to_bytes(), or
+            by an incompatible version of it.
+
+    Returns:
+        List[Annotation]:
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Data is too short to hold encoded annotations.")
+    magic, version, nbr_anns, nbr_types, text_len, properties_len = \
+        _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise ValueError("Data does not hold encoded annotations.")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported annotation encoding version: {version}")
+
+    offset = _HEADER.size
+    type_names = []
+    for _ in range(nbr_types):
+        (name_len,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        type_names.append(data[offset:offset + name_len].decode('utf-8'))
+        offset += name_len
+
+    type_ids = _column_from_bytes('I', data, offset, nbr_anns)
+    offset += nbr_anns * type_ids.itemsize
+    starts = _column_from_bytes('q', data, offset, nbr_anns)
+    offset += nbr_anns * starts.itemsize
+    ends = _column_from_bytes('q', data, offset, nbr_anns)
+    offset += nbr_anns * ends.itemsize
+    text_lens = _column_from_bytes('I', data, offset, nbr_anns)
+    offset += nbr_anns * text_lens.itemsize
+
+    all_text = data[offset:offset + text_len].decode('utf-8')
+    offset += text_len
+
+    properties: List[Optional[Dict[str, object]]]
+    if properties_len > 0:
+        properties = json.loads(data[offset:offset + properties_len].decode('utf-8'))
+    else:
+        properties = [None] * nbr_anns
+
+    result = []
+    text_pos = 0
+    for idx in range(nbr_anns):
+        text_end = text_pos + text_lens[idx]
+        result.append(Annotation(type_names[type_ids[idx]], all_text[text_pos:text_end],
+                                 starts[idx], ends[idx], properties[idx]))
+        text_pos = text_end
+    return result
+
+
+def annotation_to_json_dict(ann: Annotation) -> Dict[str, object]:
+    """
+    Return a JSON-serializable dict for an annotation: the keys of
+    Annotation.to_dict() plus, if the annotation has any, its properties
+    under the 'properties' key.
+
+    Args:
+        ann (Annotation):
+
+    Returns:
+        Dict[str, object]:
+    """
+    result = ann.to_dict()
+    if ann.properties:
+        result['properties'] = ann.properties
+    return result
+
+
+def json_dict_to_annotation(ann_dict: Dict) -> Annotation:
+    """
+    Reverse annotation_to_json_dict().
+
+    Args:
+        ann_dict (Dict): a dict with keys 'type', 'text', 'start', 'end' and,
+            optionally, 'properties'.
+
+    Returns:
+        Annotation:
+    """
+    return Annotation(ann_dict['type'], ann_dict['text'], ann_dict['start'], ann_dict['end'],
+                      ann_dict.get('properties'))
+
+
+def write_jsonl(anns: Iterable[Annotation], fp: IO[str]) -> int:
+    """
+    Write annotations to a text file object as JSON Lines, one annotation
+    per line. Annotations are consumed and written one at a time, so
+    anns may be a generator over an arbitrarily large layer.
+
+    Args:
+        anns (Iterable[Annotation]):
+        fp (IO[str]): a file object opened for writing in text mode.
+
+    Returns:
+        int: the number of annotations written.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    count = 0
+    for ann in anns:
+        fp.write(encoder.encode(annotation_to_json_dict(ann)))
+        fp.write('\n')
+        count += 1
+    return count
+
+
+def read_jsonl(fp: IO[str]) -> Iterator[Annotation]:
+    """
+    Lazily read annotations written by write_jsonl(), one line at a time.
+    Blank lines are skipped.
+
+    Args:
+        fp (IO[str]): a file object opened for reading in text mode.
+
+    Yields:
+        Annotation:
+    """
+    decoder = json.JSONDecoder()
+    for line in fp:
+        line = line.strip()
+        if not line:
+            continue
+        yield json_dict_to_annotation(decoder.decode(line))
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,320 @@
+"""
+AnnotationSet: a columnar, NumPy-backed collection of annotations on one document.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from text_to_relations.relation_extraction import StringUtils
+from text_to_relations.relation_extraction import TypeRegistry
+from text_to_relations.relation_extraction.Annotation import Annotation
+
+
+class AnnotationSet:
+    """
+    A collection of annotations on a single document, stored as parallel
+    NumPy arrays of type ids (see TypeRegistry), start offsets and end
+    offsets rather than as a list of Annotation objects.
+
+    Sorting, filtering by type, and containment and overlap queries run as
+    vectorized array operations, which makes post-processing of very large
+    annotation collections much cheaper than looping over Annotation
+    objects with Annotation.sort(), encloses() or get_enclosed().
+
+    The annotations' text is not stored: it is sliced from the document
+    only when an individual annotation is accessed. Use from_annotations()
+    and to_annotations() to convert to and from lists of Annotation objects.
+    """
+
+    def __init__(self, doc: str,
+                 type_ids: Union[Sequence[int], np.ndarray],
+                 starts: Union[Sequence[int], np.ndarray],
+                 ends: Union[Sequence[int], np.ndarray],
+                 properties: Optional[List[Dict[str, object]]] = None):
+        """
+        Args:
+            doc (str): the document the offsets refer to.
+            type_ids (Union[Sequence[int], np.ndarray]): one TypeRegistry
+                type id per annotation.
+            starts (Union[Sequence[int], np.ndarray]): one start offset per
+                annotation.
+            ends (Union[Sequence[int], np.ndarray]): one end offset per
+                annotation.
+            properties (List[Dict[str, object]], optional): one properties
+                dict per annotation. Defaults to None, meaning no annotation
+                has properties.
+
+        Raises:
+            ValueError: if the columns differ in length, or if any offsets
+                are invalid as Annotation offsets.
+        """
+        self.doc = doc
+        self.type_ids = np.asarray(type_ids, dtype=np.int32)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.properties = properties
+
+        nbr_anns = len(self.type_ids)
+        if len(self.starts) != nbr_anns or len(self.ends) != nbr_anns or \
+                (properties is not None and len(properties) != nbr_anns):
+            raise ValueError("type_ids, starts, ends and properties must all have the same length.")
+
+        if nbr_anns > 0:
+            if np.any(self.starts > self.ends):
+                raise ValueError("Start offset cannot be greater than end offset.")
+            if np.any(self.starts < 0):
+                raise ValueError("Start and end offset cannot be less than 0.")
+            if np.any(self.type_ids < 0) or \
+                    np.any(self.type_ids >= TypeRegistry.get_nbr_types()):
+                raise ValueError("type_ids must be registered TypeRegistry ids.")
+
+    @staticmethod
+    def from_annotations(anns: Sequence[Annotation], doc: str) -> 'AnnotationSet':
+        """
+        Build an AnnotationSet from a list of Annotation objects.
+
+        Args:
+            anns (Sequence[Annotation]): annotations whose offsets refer to doc.
+            doc (str): the document the annotations were created on.
+
+        Returns:
+            AnnotationSet: the annotations in their original order.
+        """
+        type_ids = np.empty(len(anns), dtype=np.int32)
+        starts = np.empty(len(anns), dtype=np.int64)
+        ends = np.empty(len(anns), dtype=np.int64)
+        has_properties = False
+
+        for idx, ann in enumerate(anns):
+            type_ids[idx] = ann.type_id
+            starts[idx] = ann.start_offset
+            ends[idx] = ann.end_offset
+            if ann.properties:
+                has_properties = True
+
+        properties = [ann.properties for ann in anns] if has_properties else None
+        return AnnotationSet(doc, type_ids, starts, ends, properties)
+
+    def to_annotations(self) -> List[Annotation]:
+        """
+        Convert to a list of Annotation objects, in this set's order.
+
+        Returns:
+            List[Annotation]:
+        """
+        return [self[idx] for idx in range(len(self))]
+
+    def __len__(self) -> int:
+        return len(self.type_ids)
+
+    def __getitem__(self, idx: int) -> Annotation:
+        start = int(self.starts[idx])
+        end = int(self.ends[idx])
+        properties = dict(self.properties[idx]) if self.properties is not None else None
+        return Annotation.from_doc(TypeRegistry.get_type_name(int(self.type_ids[idx])), self.doc,
+                                   start, end, properties)
+
+    def __iter__(self) -> Iterator[Annotation]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def __repr__(self):
+        type_names = [TypeRegistry.get_type_name(int(type_id)) for type_id in np.unique(self.type_ids)]
+        return f"AnnotationSet({len(self)} annotations, types={type_names})"
+
+    def get_text(self, idx: int) -> str:
+        """
+        Return the text of one annotation, normalized the same way as
+        Annotation.text, without building an Annotation object.
+
+        Args:
+            idx (int): position of the annotation in this set.
+
+        Returns:
+            str:
+        """
+        contents = self.doc[int(self.starts[idx]):int(self.ends[idx])].replace('\n', ' ')
+        return StringUtils.remove_multiple_spaces(contents).strip()
+
+    def get_types(self) -> List[str]:
+        """
+        Return the type name of every annotation, in this set's order.
+
+        Returns:
+            List[str]:
+        """
+        type_names = TypeRegistry.get_type_names()
+        return [type_names[type_id] for type_id in self.type_ids]
+
+    def take(self, indices: np.ndarray) -> 'AnnotationSet':
+        """
+        Return a new AnnotationSet containing the annotations at the given
+        positions (an integer index array or a boolean mask), in that order.
+
+        Args:
+            indices (np.ndarray):
+
+        Returns:
+            AnnotationSet:
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == np.bool_:
+            indices = np.flatnonzero(indices)
+        properties = None
+        if self.properties is not None:
+            properties = [self.properties[idx] for idx in indices]
+        return AnnotationSet(self.doc, self.type_ids[indices],
+                             self.starts[indices], self.ends[indices], properties)
+
+    def sort(self) -> 'AnnotationSet':
+        """
+        Return a copy sorted by starting and ending offset. Like
+        Annotation.sort(), the sort is stable.
+
+        Returns:
+            AnnotationSet:
+        """
+        return self.take(np.lexsort((self.ends, self.starts)))
+
+    def is_sorted(self) -> bool:
+        """
+        Is this set already in Annotation.sort() order?
+
+        Returns:
+            bool:
+        """
+        if len(self) < 2:
+            return True
+        start_diffs = np.diff(self.starts)
+        if np.any(start_diffs < 0):
+            return False
+        same_start = start_diffs == 0
+        return not np.any(np.diff(self.ends)[same_start] < 0)
+
+    def type_mask(self, *type_names: str) -> np.ndarray:
+        """
+        Return a boolean mask selecting the annotations of the given types.
+
+        Args:
+            type_names (str): one or more annotation type names.
+
+        Returns:
+            np.ndarray:
+        """
+        wanted = [TypeRegistry.lookup_type_id(name) for name in type_names]
+        return np.isin(self.type_ids, [type_id for type_id in wanted if type_id is not None])
+
+    def filter_by_type(self, *type_names: str) -> 'AnnotationSet':
+        """
+        Return the annotations of the given types, in this set's order.
+
+        Args:
+            type_names (str): one or more annotation type names.
+
+        Returns:
+            AnnotationSet:
+        """
+        return self.take(self.type_mask(*type_names))
+
+    def enclosed_mask(self, start: int, end: int) -> np.ndarray:
+        """
+        Return a boolean mask selecting the annotations enclosed by the
+        span [start, end), as determined by Annotation.encloses().
+
+        Args:
+            start (int):
+            end (int):
+
+        Returns:
+            np.ndarray:
+        """
+        return (self.starts >= start) & (self.ends <= end)
+
+    def enclosing_mask(self, start: int, end: int) -> np.ndarray:
+        """
+        Return a boolean mask selecting the annotations which enclose the
+        span [start, end).
+
+        Args:
+            start (int):
+            end (int):
+
+        Returns:
+            np.ndarray:
+        """
+        return (self.starts <= start) & (self.ends >= end)
+
+    def overlap_mask(self, start: int, end: int) -> np.ndarray:
+        """
+        Return a boolean mask selecting the annotations which share at least
+        one character with the span [start, end). Annotations which merely
+        touch the span, e.g. one ending where the span starts, do not overlap.
+
+        Args:
+            start (int):
+            end (int):
+
+        Returns:
+            np.ndarray:
+        """
+        return (self.starts < end) & (self.ends > start)
+
+    def get_enclosed(self, ann: Annotation) -> 'AnnotationSet':
+        """
+        Vectorized Annotation.get_enclosed(): return the annotations in this
+        set enclosed by the given annotation.
+
+        Args:
+            ann (Annotation):
+
+        Returns:
+            AnnotationSet:
+        """
+        return self.take(self.enclosed_mask(ann.start_offset, ann.end_offset))
+
+    def get_overlapping(self, ann: Annotation) -> 'AnnotationSet':
+        """
+        Return the annotations in this set which overlap the given annotation.
+
+        Args:
+            ann (Annotation):
+
+        Returns:
+            AnnotationSet:
+        """
+        return self.take(self.overlap_mask(ann.start_offset, ann.end_offset))
+
+    def get_enclosed_pairs(self, containers: 'AnnotationSet') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized Annotation.get_enclosed_pairs(): find every annotation in
+        this set enclosed by each annotation in containers.
+
+        This set must be sorted (see sort()); containers may be in any order.
+
+        Args:
+            containers (AnnotationSet): the candidate enclosing annotations.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: two parallel index arrays, the
+                first into containers and the second into this set, one
+                element per (container, enclosed) pair. Pairs are grouped by
+                container, in containers order.
+        """
+        # Annotations starting inside a container form a contiguous run of
+        # this (sorted) set; locate each run with a binary search and then
+        # keep only those annotations which also end inside the container.
+        run_starts = np.searchsorted(self.starts, containers.starts, side='left')
+        run_ends = np.searchsorted(self.starts, containers.ends, side='right')
+        run_lengths = np.maximum(run_ends - run_starts, 0)
+
+        container_idx = np.repeat(np.arange(len(containers)), run_lengths)
+        offsets_in_run = np.arange(int(run_lengths.sum())) - \
+            np.repeat(np.cumsum(run_lengths) - run_lengths, run_lengths)
+        ann_idx = np.repeat(run_starts, run_lengths) + offsets_in_run
+
+        keep = self.ends[ann_idx] <= containers.ends[container_idx]
+        return container_idx[keep], ann_idx[keep]
+
+
+if __name__ == '__main__':
+    pass
@@ -3,12 +3,21 @@ Abstract base class for relation extraction--i.e., building
 relations between previously-identified entities.
 """
 import re
+import time
 from abc import ABCMeta
-from typing import Dict, List, Optional
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple, Union
 
+from text_to_relations.relation_extraction import RegexAnalyzer
+from text_to_relations.relation_extraction import StringUtils
+from text_to_relations.relation_extraction import SymbolView
+from text_to_relations.relation_extraction import TypeRegistry
 from text_to_relations.relation_extraction.TokenAnn import TokenAnn
 from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.MatchBudget import BudgetExceededError, MatchBudget
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
 from text_to_relations.relation_extraction.RegexString import RegexString
+from text_to_relations.relation_extraction.TokenPhraseMatcher import TokenPhraseMatcher
 
 
 def _annotation_to_dict(ann: Annotation) -> Dict:
@@ -50,6 +59,40 @@ class ChainLink:
         self.end_type = end_type
         self.end_property = end_property
 
+    def to_tuple(self) -> Tuple[str, str, int, int, str, str]:
+        """
+        Return the constructor arguments of this link, in order.
+
+        Returns:
+            Tuple[str, str, int, int, str, str]:
+        """
+        return (self.start_type, self.start_property, self.min_distance,
+                self.max_distance, self.end_type, self.end_property)
+
+    def get_fingerprint(self) -> str:
+        """
+        Return a stable hex digest of this link's definition.
+
+        Returns:
+            str:
+        """
+        return StringUtils.fingerprint(list(self.to_tuple()))
+
+    def __reduce__(self):
+        # Pickle as a constructor call, which is compact and validates again.
+        return ChainLink, self.to_tuple()
+
+    def __eq__(self, other):
+        if type(self) != type(other):
+            return False
+        return self.to_tuple() == other.to_tuple()
+
+    def __hash__(self):
+        return hash(self.to_tuple())
+
+    def __repr__(self):
+        return f"ChainLink{self.to_tuple()!r}"
+
 
 class ExtractionPhaseABC(metaclass=ABCMeta):
     """
@@ -63,6 +106,8 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
        two nodes sharing a property name).
     """
     regexWhitespace = re.compile(r'\s+', re.IGNORECASE | re.DOTALL | re.MULTILINE)
+    # Annotation views the chain can be matched against; see run_chained_loops().
+    ANNOTATION_VIEWS = ('text', 'symbols')
 
     def __init_subclass__(cls, **kwargs):
         """
@@ -87,9 +132,31 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
 
         # Subclasses must assign all three of the following in their __init__.
         self.relation_name: Optional[str] = None
-        self.regex_patterns: Optional[Dict[str, RegexString]] = None
+        self.regex_patterns: Optional[Dict[str, Union[RegexString, TokenPhraseMatcher]]] = None
         self.chain: Optional[List[ChainLink]] = None
 
+        # Optional. How to resolve overlapping annotations before matching;
+        # see Annotation.resolve_overlaps(). None leaves them unresolved.
+        self.overlap_strategy: Optional[str] = None
+        self.type_priority: Optional[List[str]] = None
+        # Optional. How to handle the properties of duplicate annotations when
+        # removing them before matching; see Annotation.deduplicate(). None
+        # keeps duplicates.
+        self.deduplicate: Optional[str] = None
+        # Optional. The highest backtracking degree (see
+        # RegexAnalyzer.estimate_backtracking_degree()) allowed for the
+        # phase's regexes; None disables the check.
+        self.max_backtracking_degree: Optional[float] = None
+        # Optional. Time and step limits on matching each document; see
+        # MatchBudget. None means no limits.
+        self.match_budget: Optional[MatchBudget] = None
+        # Optional. Records the time spent by each pattern and chain link;
+        # see PhaseProfiler. None disables profiling.
+        self.profiler: Optional[PhaseProfiler] = None
+        # Optional. The annotation view the chain is matched against, one of
+        # ANNOTATION_VIEWS; see run_chained_loops().
+        self.annotation_view: str = 'text'
+
     def _validate(self):
         """
         Verify that the subclass satisfies all three requirements documented
@@ -129,13 +196,149 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
                 )
             seen.add(prop)
 
+        if self.overlap_strategy is not None:
+            if self.overlap_strategy not in Annotation.OVERLAP_STRATEGIES:
+                raise ValueError(
+                    f"{type(self).__name__}: unknown overlap_strategy {self.overlap_strategy!r}; "
+                    f"expected one of {Annotation.OVERLAP_STRATEGIES}"
+                )
+            if self.overlap_strategy == 'priority' and not self.type_priority:
+                raise ValueError(
+                    f"{type(self).__name__}: overlap_strategy 'priority' requires type_priority"
+                )
+
+        if self.deduplicate is not None and self.deduplicate not in Annotation.DEDUPLICATE_MODES:
+            raise ValueError(
+                f"{type(self).__name__}: unknown deduplicate mode {self.deduplicate!r}; "
+                f"expected one of {Annotation.DEDUPLICATE_MODES}"
+            )
+
+        if self.annotation_view not in ExtractionPhaseABC.ANNOTATION_VIEWS:
+            raise ValueError(
+                f"{type(self).__name__}: unknown annotation_view {self.annotation_view!r}; "
+                f"expected one of {ExtractionPhaseABC.ANNOTATION_VIEWS}"
+            )
+
+        if self.match_budget is not None and not isinstance(self.match_budget, MatchBudget):
+            raise ValueError(
+                f"{type(self).__name__}: match_budget must be a MatchBudget, "
+                f"not {type(self.match_budget).__name__}"
+            )
+
+        if self.max_backtracking_degree is not None:
+            for name, risks in self.get_backtracking_risks().items():
+                too_risky = [risk for risk in risks if risk.degree > self.max_backtracking_degree]
+                if too_risky:
+                    raise ValueError(
+                        f"{type(self).__name__}: regex {name!r} exceeds max_backtracking_degree "
+                        f"{self.max_backtracking_degree}: {too_risky[0].description}"
+                    )
+
+    def get_fingerprint(self) -> str:
+        """
+        Return a stable hex digest of everything which determines the
+        relations the phase finds: its class, relation_name, the fingerprint
+        of each pattern in regex_patterns, the chain, and the overlap and
+        deduplication options. It is the same in every process for equal
+        definitions and changes whenever one of these does, so it can key
+        caches of find_match() results. verbose, max_backtracking_degree,
+        match_budget, profiler and annotation_view are left out.
+
+        Returns:
+            str:
+        """
+        assert self.regex_patterns is not None
+        assert self.chain is not None
+
+        return StringUtils.fingerprint({
+            'class': f'{type(self).__module__}.{type(self).__qualname__}',
+            'relation_name': self.relation_name,
+            'regex_patterns': {ann_type: regex_str.get_fingerprint()
+                               for ann_type, regex_str in self.regex_patterns.items()},
+            'chain': [list(link.to_tuple()) for link in self.chain],
+            'overlap_strategy': self.overlap_strategy,
+            'type_priority': self.type_priority,
+            'deduplicate': self.deduplicate,
+        })
+
+    def get_backtracking_risks(self) -> Dict[str, List[RegexAnalyzer.BacktrackingRisk]]:
+        """
+        Statically analyze every regex the phase runs for the patterns which
+        cause catastrophic backtracking; see
+        RegexAnalyzer.find_backtracking_risks().
+
+        Returns:
+            Dict[str, List[RegexAnalyzer.BacktrackingRisk]]: the risks of each
+                pattern in regex_patterns, keyed by annotation type, and
+                of the annotation distance regex of each chain link, keyed
+                'chain[i]'. Regexes without risks are omitted.
+        """
+        assert self.regex_patterns is not None
+        assert self.chain is not None
+
+        result = {}
+        for ann_type, regex_str in self.regex_patterns.items():
+            risks = regex_str.get_backtracking_risks()
+            if risks:
+                result[ann_type] = risks
+        for i, link in enumerate(self.chain):
+            regex = TokenAnn.build_annotation_distance_regex(
+                link.start_type, (link.min_distance, link.max_distance), None, link.end_type)
+            risks = RegexAnalyzer.find_backtracking_risks(regex)
+            if risks:
+                result[f'chain[{i}]'] = risks
+        return result
+
+    def could_match(self, text: str,
+                    entity_annotations: Optional[List[Dict]] = None) -> bool:
+        """
+        A cheap prefilter for find_match(): return False if the text cannot
+        produce a relation because, for some annotation type in the chain,
+        none of the RegexStrings which can produce it can match the text
+        (see RegexString.could_match()).
+
+        Like the chain regexes, which match <'Unit[^>]*>, a chain type is
+        produced by every type whose name starts with it, e.g. 'Unit' by
+        both 'Unit' and 'UnitLong'. Chain types which no key of
+        regex_patterns starts with, or which some type supplied by
+        entity_annotations (or 'Token') starts with, impose no condition.
+        A True result does not guarantee a match.
+
+        Args:
+            text: a single document entry.
+            entity_annotations: the annotations that would be passed to
+                find_match(), if any.
+
+        Returns:
+            bool:
+        """
+        assert self.regex_patterns is not None
+        assert self.chain is not None
+
+        chain_types = []
+        if self.chain:
+            chain_types = [self.chain[0].start_type] + [link.end_type for link in self.chain]
+        # Tokens are always part of the annotation view.
+        given_types = {d['type'] for d in entity_annotations} if entity_annotations else set()
+        given_types.add('Token')
+        for chain_type in chain_types:
+            if any(given_type.startswith(chain_type) for given_type in given_types):
+                continue
+            patterns = [pattern for ann_type, pattern in self.regex_patterns.items()
+                        if ann_type.startswith(chain_type)]
+            if patterns and not any(pattern.could_match(text) for pattern in patterns):
+                return False
+        return True
+
     def find_match(self, text: str,
                    entity_annotations: Optional[List[Dict]] = None) -> List[Dict]:
         """
         Process text input and return any extracted relation annotations.
 
         Uses self.relation_name, self.regex_patterns, and self.chain, which
-        subclasses set in their __init__.
+        subclasses set in their __init__. Texts rejected by could_match() are
+        not tokenized or annotated at all. If profiler is set, the call is
+        counted as one document and its stages are timed.
 
         Args:
             text: a single document entry to process.
@@ -152,17 +355,29 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
         assert self.regex_patterns is not None
         assert self.chain is not None
 
-        ann_list: Optional[List[Annotation]] = None
-        if entity_annotations is not None:
-            ann_list = [Annotation(d['type'], d['text'], d['start'], d['end'])
-                        for d in entity_annotations]
-
-        results = self.run_chained_loops(text, self.regex_patterns, self.chain,
-                                         entity_annotations=ann_list)
-        return [_annotation_to_dict(ann) for ann in results]
+        profiler = self.profiler
+        start_time = time.perf_counter() if profiler is not None else 0.0
+        try:
+            could_match = self.could_match(text, entity_annotations)
+            if profiler is not None:
+                profiler.record(PhaseProfiler.PREFILTER, time.perf_counter() - start_time, int(could_match))
+            if not could_match:
+                return []
+
+            ann_list: Optional[List[Annotation]] = None
+            if entity_annotations is not None:
+                ann_list = [Annotation(d['type'], d['text'], d['start'], d['end'])
+                            for d in entity_annotations]
+
+            results = self.run_chained_loops(text, self.regex_patterns, self.chain,
+                                             entity_annotations=ann_list)
+            return [_annotation_to_dict(ann) for ann in results]
+        finally:
+            if profiler is not None:
+                profiler.record_document(time.perf_counter() - start_time)
 
     def run_chained_loops(self, text: str,
-                          regex_patterns: Dict[str, RegexString],
+                          regex_patterns: Dict[str, Union[RegexString, TokenPhraseMatcher]],
                           chain: List[ChainLink],
                           entity_annotations: Optional[List[Annotation]] = None
                           ) -> List[Annotation]:
@@ -172,25 +387,44 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
 
         Args:
             text: the document entry to process.
-            regex_patterns: dict mapping annotation type name to RegexString.
+            regex_patterns: dict mapping annotation type name to RegexString
+                or TokenPhraseMatcher.
             chain: list of ChainLinks defining the proximity constraints between
                 consecutive annotation types.
             entity_annotations: annotations produced by external tools before
                 relation extraction begins, to be incorporated alongside those
                 produced by regex_patterns.
 
+        If some of regex_patterns are TokenPhraseMatchers, the document is
+        tokenized before they run, and the tokens are reused for the
+        annotation view rather than tokenizing the document twice.
+
+        The chain is matched against the annotation view named by
+        annotation_view. 'text' is the view of build_merged_representation(),
+        in which every annotation is written out in full. 'symbols' is the
+        compact view of build_symbol_representation(), one code point per
+        annotation, against which the chain regexes have far less text to
+        scan; the relations found are the same, provided that the chain's
+        type names contain no regex metacharacters (in the 'text' view they
+        are inserted into the regexes unescaped).
+
+        If match_budget is set, the document is matched within it, and a
+        document exceeding it yields what its outcome says: no relations,
+        the relations completed so far, or BudgetExceededError.
+
+        Raises:
+            BudgetExceededError: if the document exceeds match_budget and its
+                outcome is 'error'.
+
         Returns:
             List[Annotation]: newly created relation annotations.
         """
         # Imported here rather than at the top of the file to avoid a circular import:
         # extraction_loop imports ExtractionPhaseABC, so a top-level import would create a cycle.
         from text_to_relations.relation_extraction.extraction_loop import (
-            ExtractionLoop, run_loop, get_sorted_annotations_for_matching)
+            ExtractionLoop, run_loop, run_symbol_loop, get_sorted_annotations_for_matching)
 
         given_anns = list(entity_annotations) if entity_annotations else []
-        anns = get_sorted_annotations_for_matching(
-            text=text, regex_strs=regex_patterns, given_anns=given_anns)
-        annotation_view_str = ExtractionPhaseABC.build_merged_representation(text, anns)
 
         def _determine_properties(match_triples):
             # For each link i, the matched segment (triple[0]) contains the
@@ -204,40 +438,108 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
             for i, triple in enumerate(match_triples):
                 non_token_anns = [a for a in
                                   ExtractionPhaseABC.merged_representation_to_annotations(triple[0])
-                                  if a.type != 'Token']
+                                  if a.type_id != TypeRegistry.TOKEN_TYPE_ID]
                 if non_token_anns:
                     properties[chain[i].start_property] = non_token_anns[0].text
                     properties[chain[i].end_property] = non_token_anns[-1].text
             return properties
 
-        loops = []
-        for i, link in enumerate(chain):
-            is_last = i == len(chain) - 1
-            regex = TokenAnn.build_annotation_distance_regex(
-                link.start_type, (link.min_distance, link.max_distance), None, link.end_type)
-            loop = ExtractionLoop(
-                regex_str=regex,
-                last_ann_str=link.end_type,
-                determine_new_annotation_properties=_determine_properties if is_last else None,
-                start_ann_str=link.start_type,
-                min_distance=link.min_distance,
-                max_distance=link.max_distance,
-                verbose=self.verbose
-            )
-            loops.append(loop)
+        def _build_loops(symbols):
+            loops = []
+            for i, link in enumerate(chain):
+                is_last = i == len(chain) - 1
+                if symbols:
+                    regex = SymbolView.build_annotation_distance_regex(
+                        link.start_type, (link.min_distance, link.max_distance), link.end_type)
+                else:
+                    regex = TokenAnn.build_annotation_distance_regex(
+                        link.start_type, (link.min_distance, link.max_distance), None, link.end_type)
+                loop = ExtractionLoop(
+                    regex_str=regex,
+                    last_ann_str=link.end_type,
+                    determine_new_annotation_properties=_determine_properties if is_last else None,
+                    start_ann_str=link.start_type,
+                    min_distance=link.min_distance,
+                    max_distance=link.max_distance,
+                    verbose=self.verbose
+                )
+                loops.append(loop)
+            return loops
 
         assert self.relation_name is not None
-        result = run_loop(
-            annotation_view_str=annotation_view_str,
-            doc=text,
-            relation_name=self.relation_name,
-            curr_loop=loops[0],
-            loop_idx=0,
-            loop_list=loops,
-            match_triples_list=[],
-            new_annotations=[],
-            verbose=self.verbose
-        )
+        symbols = self.annotation_view == 'symbols'
+        if not symbols:
+            loops = _build_loops(False)
+        budget = self.match_budget
+        profiler = self.profiler
+        # run_loop() adds relations here as it completes them, so that they
+        # survive a BudgetExceededError.
+        new_annotations: List[Annotation] = []
+        try:
+            with budget.document() if budget is not None else nullcontext():
+                token_objs = None
+                if any(isinstance(pattern, TokenPhraseMatcher) for pattern in regex_patterns.values()):
+                    if profiler is not None:
+                        start_time = time.perf_counter()
+                    token_objs = TokenAnn.get_token_objects(text.rstrip(), 0)
+                    if profiler is not None:
+                        profiler.record(PhaseProfiler.TOKENIZATION, time.perf_counter() - start_time,
+                                        len(token_objs))
+                anns = get_sorted_annotations_for_matching(
+                    text=text, regex_strs=regex_patterns, given_anns=given_anns,
+                    overlap_strategy=self.overlap_strategy, type_priority=self.type_priority,
+                    deduplicate=self.deduplicate, budget=budget, profiler=profiler,
+                    tokens=token_objs)
+                if profiler is not None:
+                    start_time = time.perf_counter()
+                if symbols:
+                    symbol_view_str, view_anns = ExtractionPhaseABC.build_symbol_representation(
+                        text, anns, token_objs=token_objs)
+                else:
+                    annotation_view_str = ExtractionPhaseABC.build_merged_representation(
+                        text, anns, token_objs=token_objs)
+                if profiler is not None:
+                    profiler.record(PhaseProfiler.TOKENIZATION, time.perf_counter() - start_time, len(anns))
+                if symbols:
+                    # Built only now, so that the symbols of all the view's
+                    # annotation types are known.
+                    loops = _build_loops(True)
+                    result = run_symbol_loop(
+                        symbol_view_str=symbol_view_str,
+                        view_anns=view_anns,
+                        view_pos=0,
+                        doc=text,
+                        relation_name=self.relation_name,
+                        curr_loop=loops[0],
+                        loop_idx=0,
+                        loop_list=loops,
+                        match_triples_list=[],
+                        new_annotations=new_annotations,
+                        verbose=self.verbose,
+                        budget=budget,
+                        profiler=profiler
+                    )
+                else:
+                    result = run_loop(
+                        annotation_view_str=annotation_view_str,
+                        doc=text,
+                        relation_name=self.relation_name,
+                        curr_loop=loops[0],
+                        loop_idx=0,
+                        loop_list=loops,
+                        match_triples_list=[],
+                        new_annotations=new_annotations,
+                        verbose=self.verbose,
+                        budget=budget,
+                        profiler=profiler
+                    )
+        except BudgetExceededError:
+            assert budget is not None
+            if self.verbose:
+                print(f"{type(self).__name__}: match budget exceeded; outcome {budget.outcome!r}")
+            if budget.outcome == 'error':
+                raise
+            return new_annotations if budget.outcome == 'partial' else []
         # run_loop() is recursive and its return type is Union[List[Annotation], Annotation, None]
         # to accommodate intermediate recursion levels. At the top-level call (loop_idx=0) it
         # always returns a list, so this assert narrows the type for mypy.
@@ -247,7 +549,8 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
     @staticmethod
     def build_merged_representation(doc_contents: str,
                                     anns: List[Annotation],
-                                    verbose: bool=False) -> str:
+                                    verbose: bool=False,
+                                    token_objs: Optional[List[TokenAnn]] = None) -> str:
         """
         Create an Annotation-only representation of the document by
         merging the given bespoke annotations on it into a TokenAnn list
@@ -258,6 +561,10 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
             anns (List[Annotation]): a list of bespoke annotations you want
                 to appear merged into the doc
             verbose (bool, optional): Defaults to False.
+            token_objs (List[TokenAnn], optional): the tokens of the doc, if
+                already computed with TokenAnn.get_token_objects(
+                doc_contents.rstrip(), 0). Defaults to None, meaning the doc
+                is tokenized here.
 
         Raises:
             ValueError: If the process fails to insert any of the provided
@@ -267,19 +574,74 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
             str: a string representing all the annotations in the document,
                 sorted by offset
         """
+        merged = ExtractionPhaseABC.merge_annotations_with_tokens(doc_contents, anns, verbose, token_objs)
+        return ''.join([str(ann) for ann in merged])
+
+    @staticmethod
+    def build_symbol_representation(doc_contents: str,
+                                    anns: List[Annotation],
+                                    verbose: bool=False,
+                                    token_objs: Optional[List[TokenAnn]] = None
+                                    ) -> Tuple[str, List[Annotation]]:
+        """
+        Like build_merged_representation(), but return the compact symbol
+        view of the merged annotations (see SymbolView), one code point per
+        annotation, together with the annotations themselves.
+
+        Args:
+            doc_contents (str):
+            anns (List[Annotation]):
+            verbose (bool, optional): Defaults to False.
+            token_objs (List[TokenAnn], optional): Defaults to None.
+
+        Raises:
+            ValueError: If the process fails to insert any of the provided
+                bespoke annotations into the final result
+
+        Returns:
+            Tuple[str, List[Annotation]]: the symbol view, and the
+                annotation at each of its positions.
+        """
+        merged = ExtractionPhaseABC.merge_annotations_with_tokens(doc_contents, anns, verbose, token_objs)
+        return SymbolView.build_symbol_view(merged), merged
+
+    @staticmethod
+    def merge_annotations_with_tokens(doc_contents: str,
+                                      anns: List[Annotation],
+                                      verbose: bool=False,
+                                      token_objs: Optional[List[TokenAnn]] = None) -> List[Annotation]:
+        """
+        Return the annotations of an annotation view in order: the given
+        bespoke annotations, and a TokenAnn for every token of the doc
+        which they do not cover. See build_merged_representation().
+
+        Args:
+            doc_contents (str):
+            anns (List[Annotation]): sorted by offset.
+            verbose (bool, optional): Defaults to False.
+            token_objs (List[TokenAnn], optional): Defaults to None.
+
+        Raises:
+            ValueError: If the process fails to insert any of the provided
+                bespoke annotations into the final result
+
+        Returns:
+            List[Annotation]:
+        """
         contents = doc_contents.rstrip()
 
         # If this is empty after the process, something may be wrong.
         unconsumed_annotations = anns
 
-        result = ""
+        result: List[Annotation] = []
         last_pos = 0
 
         # Strategy: Tokenize the doc and iterate through all the tokens. If a token
         # is covered by an annotation, write that annotation to the output and advance
         # last_pos to the end of the annotation; otherwise, write the token to output
         # and continue.
-        token_objs = TokenAnn.get_token_objects(contents, 0)
+        if token_objs is None:
+            token_objs = TokenAnn.get_token_objects(contents, 0)
 
         for token_obj in token_objs:
 
@@ -292,7 +654,7 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
                 if ann.start_offset <= token_obj.start_offset:
                     # Write the annotation and remove it from the unconsumed_annotations.
                     unconsumed_annotations = unconsumed_annotations[1:]
-                    result += str(ann)
+                    result.append(ann)
                     if verbose:
                         print(str(ann))
                     last_pos = ann.end_offset
@@ -305,7 +667,7 @@ class ExtractionPhaseABC(metaclass=ABCMeta):
 
             # This token occurs in the document before the next unconsumed annotation. Write it to
             # output.
-            result += str(token_obj)
+            result.append(token_obj)
 
             last_pos = token_obj.end_offset
 
@@ -371,18 +733,59 @@ class SimpleExtractionPhase(ExtractionPhaseABC):
     """
 
     def __init__(self, relation_name: str, regex_patterns: Dict, chain: List[ChainLink],
-                 verbose: bool = False):
+                 verbose: bool = False,
+                 overlap_strategy: Optional[str] = None,
+                 type_priority: Optional[List[str]] = None,
+                 deduplicate: Optional[str] = None,
+                 max_backtracking_degree: Optional[float] = None,
+                 match_budget: Optional[MatchBudget] = None,
+                 profiler: Optional[PhaseProfiler] = None,
+                 annotation_view: str = 'text'):
         """
         Args:
             relation_name (str): type name assigned to each extracted relation
                 Annotation (e.g. 'MinMax', 'StampDescription').
-            regex_patterns (Dict[str, RegexString]): dict mapping annotation
-                type name to RegexString, defining the entities to find.
+            regex_patterns (Dict[str, Union[RegexString, TokenPhraseMatcher]]):
+                dict mapping annotation type name to RegexString, or to
+                TokenPhraseMatcher for long phrase lists, defining the
+                entities to find.
             chain (List[ChainLink]): proximity constraints between consecutive
                 annotation types.
             verbose (bool): if True, print internal state at each step.
+            overlap_strategy (str, optional): how to resolve overlapping
+                annotations before matching: 'longest', 'priority' or
+                'leftmost'. See Annotation.resolve_overlaps(). Defaults to
+                None, meaning overlaps are not resolved.
+            type_priority (List[str], optional): annotation type names,
+                highest priority first, for the 'priority' strategy.
+            deduplicate (str, optional): remove duplicate annotations (same
+                type and span) before matching, handling their properties
+                as 'first', 'merge' or 'distinct'. See
+                Annotation.deduplicate(). Defaults to None, meaning
+                duplicates are kept.
+            max_backtracking_degree (float, optional): refuse to build the
+                phase if any of its regexes can backtrack to a higher degree
+                than this; see get_backtracking_risks(). Use 1 to reject
+                every risk found. Defaults to None, meaning no check.
+            match_budget (MatchBudget, optional): time and step limits on
+                matching each document, and what to return for documents
+                exceeding them. See run_chained_loops(). Defaults to None,
+                meaning no limits.
+            profiler (PhaseProfiler, optional): record the time spent and
+                matches found by each pattern and chain link across
+                find_match() calls. Defaults to None, meaning no profiling.
+            annotation_view (str, optional): the annotation view the chain is
+                matched against: 'text' or the compact 'symbols'. See
+                run_chained_loops(). Defaults to 'text'.
         """
         super().__init__(verbose=verbose)
         self.relation_name = relation_name
         self.regex_patterns = regex_patterns
         self.chain = chain
+        self.overlap_strategy = overlap_strategy
+        self.type_priority = type_priority
+        self.deduplicate = deduplicate
+        self.max_backtracking_degree = max_backtracking_degree
+        self.match_budget = match_budget
+        self.profiler = profiler
+        self.annotation_view = annotation_view
@@ -0,0 +1,165 @@
+"""
+Gazetteer: build RegexStrings from word-list files, caching the built
+matcher on local disk so that later processes load it instead of building it.
+"""
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from typing import Dict, List, Optional, Union
+
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+# Bump when the cached form of a RegexString changes incompatibly.
+_CACHE_VERSION = 1
+_CACHE_SUFFIX = '.pickle'
+
+# Matchers already loaded by this process, keyed like the cache files.
+_loaded: Dict[str, RegexString] = {}
+_lock = threading.Lock()
+
+
+def get_default_cache_dir() -> str:
+    """
+    Return the directory where load_gazetteer() caches matchers by default:
+    'text_to_relations/gazetteers' under $XDG_CACHE_HOME, or under
+    ~/.cache if that is not set.
+
+    Returns:
+        str:
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'text_to_relations', 'gazetteers')
+
+
+def read_gazetteer(path: Union[str, 'os.PathLike[str]']) -> List[str]:
+    """
+    Read a gazetteer file: UTF-8 text with one entry per line. Surrounding
+    whitespace is stripped and blank lines are skipped.
+
+    Args:
+        path (str or PathLike):
+
+    Returns:
+        List[str]: the entries, in file order.
+    """
+    with open(path, 'rb') as fp:
+        return _parse_entries(fp.read())
+
+
+def load_gazetteer(path: Union[str, 'os.PathLike[str]'],
+                   cache_dir: Optional[Union[str, 'os.PathLike[str]']] = None,
+                   use_cache: bool = True,
+                   **kwargs) -> RegexString:
+    """
+    Build a RegexString matching the entries of a gazetteer file (see
+    read_gazetteer()), or load it from the cache.
+
+    Building sorts, escapes and joins every entry and, for the
+    'aho_corasick' backend, builds the automaton. The result is pickled to
+    cache_dir under a key made of the SHA-256 of the file's contents and of
+    the RegexString options, so a process loading the same file with the
+    same options later skips all of that; editing the file or changing an
+    option builds a new matcher. Cache files are written atomically, so
+    concurrent workers never read a partial file. A regex is still compiled
+    on first use after loading, which for very large lists is much slower
+    than unpickling an automaton: prefer backend='aho_corasick' when
+    start-up time matters.
+
+    Within one process, loading the same file with the same options again
+    returns the same RegexString object. Loading gazetteers before forking
+    worker processes lets the workers share its memory read-only.
+
+    Args:
+        path (str or PathLike): the gazetteer file.
+        cache_dir (str or PathLike, optional): where to store built
+            matchers. Defaults to None, meaning get_default_cache_dir().
+        use_cache (bool, optional): if False, neither read nor write the
+            cache. Defaults to True.
+        **kwargs: RegexString constructor arguments other than match_strs,
+            e.g. whole_word=True or backend='aho_corasick'.
+
+    Raises:
+        ValueError: if match_strs is passed, or the file has no entries.
+
+    Returns:
+        RegexString:
+    """
+    if 'match_strs' in kwargs:
+        raise ValueError("load_gazetteer() takes the match_strs from the file.")
+    with open(path, 'rb') as fp:
+        contents = fp.read()
+    key = _cache_key(contents, kwargs)
+
+    if use_cache:
+        with _lock:
+            regex_str = _loaded.get(key)
+        if regex_str is not None:
+            return regex_str
+        cache_path = os.path.join(cache_dir if cache_dir is not None else get_default_cache_dir(),
+                                  key + _CACHE_SUFFIX)
+        regex_str = _read_cache(cache_path)
+        if regex_str is not None:
+            with _lock:
+                return _loaded.setdefault(key, regex_str)
+
+    entries = _parse_entries(contents)
+    if not entries:
+        raise ValueError(f"Gazetteer file has no entries: {os.fspath(path)}")
+    regex_str = RegexString(entries, **kwargs)
+    if regex_str.backend == 'aho_corasick':
+        # Build the automaton now, so that it is cached too.
+        regex_str.get_match_triples('')
+
+    if use_cache:
+        _write_cache(cache_path, regex_str)
+        with _lock:
+            regex_str = _loaded.setdefault(key, regex_str)
+    return regex_str
+
+
+def _parse_entries(contents: bytes) -> List[str]:
+    return [entry for entry in (line.strip() for line in contents.decode('utf-8').splitlines()) if entry]
+
+
+def _cache_key(contents: bytes, kwargs: Dict) -> str:
+    digest = hashlib.sha256(contents)
+    options = json.dumps({'cache_version': _CACHE_VERSION, 'options': kwargs}, sort_keys=True, default=repr)
+    digest.update(options.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: str) -> Optional[RegexString]:
+    """Return the cached RegexString, or None if there is none or it cannot be read."""
+    try:
+        with open(cache_path, 'rb') as fp:
+            regex_str = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception:  # pylint: disable=broad-except
+        # A cache written by an incompatible version, or damaged: rebuild.
+        return None
+    return regex_str if isinstance(regex_str, RegexString) else None
+
+
+def _write_cache(cache_path: str, regex_str: RegexString):
+    """Write the cache file atomically. Failing to write the cache is not an error."""
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump(regex_str, fp, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        pass
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,178 @@
+"""
+MatchBudget: per-document time and step limits on pattern and chain matching.
+"""
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class BudgetExceededError(TimeoutError):
+    """Raised when a document uses up its MatchBudget."""
+
+
+class MatchBudget:
+    """
+    Limits on the work spent matching one document, so that a single
+    pathological document cannot hold up a worker for minutes.
+
+    Matching a document runs inside document(). Two limits can be set:
+
+    - seconds: wall-clock time. It is checked cooperatively between matches
+      (see check()) and, in the main thread of a process where SIGALRM is
+      available, also by a timer signal, which interrupts the regex engine
+      even in the middle of a single catastrophically backtracking match.
+      In other threads only the cooperative checks apply.
+    - max_steps: the number of checks, i.e. roughly the number of pattern
+      matches found plus chain matches tried. Unlike time, it does not
+      depend on the machine or its load.
+
+    The outcome says what a phase does with a document which exceeds the
+    budget: 'skip' returns no relations, 'partial' returns those completed
+    before the budget ran out, and 'error' raises BudgetExceededError. The
+    counters nbr_documents and nbr_exceeded count the documents matched
+    and those which exceeded the budget.
+
+    A MatchBudget may be shared by phases and threads: the document in
+    progress is tracked per thread.
+    """
+
+    # What a phase does with a document exceeding its budget.
+    OUTCOMES = ('skip', 'partial', 'error')
+
+    def __init__(self, seconds: Optional[float] = None, max_steps: Optional[int] = None,
+                 outcome: str = 'skip', use_alarm: bool = True):
+        """
+        Args:
+            seconds (float, optional): time allowed per document. Defaults to
+                None, meaning no time limit.
+            max_steps (int, optional): checks allowed per document. Defaults
+                to None, meaning no step limit.
+            outcome (str, optional): one of OUTCOMES. Defaults to 'skip'.
+            use_alarm (bool, optional): if False, never use SIGALRM, e.g.
+                because the application uses it itself; only cooperative
+                checks then enforce the time limit. Defaults to True.
+
+        Raises:
+            ValueError: if neither limit is set, a limit is not positive, or
+                outcome is unknown.
+        """
+        if seconds is None and max_steps is None:
+            raise ValueError("A MatchBudget needs seconds, max_steps or both.")
+        if (seconds is not None and seconds <= 0) or (max_steps is not None and max_steps <= 0):
+            raise ValueError("MatchBudget limits must be positive.")
+        if outcome not in MatchBudget.OUTCOMES:
+            raise ValueError(f"Unknown outcome: {outcome!r}. Expected one of {MatchBudget.OUTCOMES}.")
+        self.seconds = seconds
+        self.max_steps = max_steps
+        self.outcome = outcome
+        self.use_alarm = use_alarm
+        self.nbr_documents = 0
+        self.nbr_exceeded = 0
+        self._init_state()
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+        # The deadline and steps left of the document in progress, per thread.
+        self._current = threading.local()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        del state['_current']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def __repr__(self):
+        return (f"MatchBudget(seconds={self.seconds}, max_steps={self.max_steps}, "
+                f"outcome={self.outcome!r}, nbr_documents={self.nbr_documents}, "
+                f"nbr_exceeded={self.nbr_exceeded})")
+
+    def reset_counters(self):
+        """Set nbr_documents and nbr_exceeded back to 0."""
+        with self._lock:
+            self.nbr_documents = 0
+            self.nbr_exceeded = 0
+
+    @contextmanager
+    def document(self) -> Iterator['MatchBudget']:
+        """
+        Enforce the budget on the matching done inside the with block, and
+        count the document. BudgetExceededError propagates out of the block;
+        deciding on the outcome is up to the caller. Nested blocks in the
+        same thread share the outer block's budget.
+
+        Raises:
+            BudgetExceededError:
+
+        Returns:
+            Iterator[MatchBudget]: this budget.
+        """
+        if getattr(self._current, 'active', False):
+            yield self
+            return
+
+        with self._lock:
+            self.nbr_documents += 1
+        self._current.active = True
+        self._current.deadline = None if self.seconds is None else time.monotonic() + self.seconds
+        self._current.steps_left = self.max_steps
+        previous_handler = self._start_alarm()
+        try:
+            yield self
+        except BudgetExceededError:
+            with self._lock:
+                self.nbr_exceeded += 1
+            raise
+        finally:
+            self._current.active = False
+            if previous_handler is not None:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous_handler)
+
+    def check(self):
+        """
+        Raise BudgetExceededError if the document in progress has used up
+        its budget. Each call counts as one step. Does nothing outside
+        document().
+
+        Raises:
+            BudgetExceededError:
+        """
+        current = self._current
+        if not getattr(current, 'active', False):
+            return
+        if current.steps_left is not None:
+            current.steps_left -= 1
+            if current.steps_left < 0:
+                raise BudgetExceededError(f"Document exceeded its budget of {self.max_steps} steps.")
+        if current.deadline is not None and time.monotonic() > current.deadline:
+            raise BudgetExceededError(f"Document exceeded its budget of {self.seconds} seconds.")
+
+    def _start_alarm(self):
+        """
+        Start the SIGALRM timer if the time limit can be enforced with it,
+        returning the signal handler to restore afterwards, else None.
+        """
+        if self.seconds is None or not self.use_alarm or not hasattr(signal, 'setitimer') or \
+                threading.current_thread() is not threading.main_thread():
+            return None
+
+        current = self._current
+
+        def on_alarm(signum, frame):
+            if getattr(current, 'active', False):
+                raise BudgetExceededError(f"Document exceeded its budget of {self.seconds} seconds.")
+
+        previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        # signal.signal() returns None for handlers not installed from Python.
+        return previous_handler if previous_handler is not None else signal.SIG_DFL
+
+
+if __name__ == '__main__':
+    pass
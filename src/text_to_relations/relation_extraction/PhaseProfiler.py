@@ -0,0 +1,183 @@
+"""
+PhaseProfiler: time spent and matches found per pattern and chain link of a phase.
+"""
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar
+
+T = TypeVar('T')
+
+
+class PhaseProfiler:
+    """
+    Accumulates, over any number of find_match() calls, the time spent and
+    the matches found by each stage of a phase:
+
+    - 'prefilter': ExtractionPhaseABC.could_match(); its matches are the
+      documents it lets through.
+    - 'tokenization': building the annotation view (see
+      ExtractionPhaseABC.build_merged_representation()), and tokenizing the
+      document for TokenPhraseMatchers, if the phase has any.
+    - each key of regex_patterns, e.g. "regex_patterns['Number']": finding
+      that RegexString's matches.
+    - each chain link, e.g. 'chain[0] Number->Unit': running the link's
+      annotation distance regex.
+    - 'other': the rest: turning matches into annotations, deduplicating
+      them and resolving overlaps, and assembling relations.
+
+    Set a phase's profiler attribute (or pass profiler= to
+    SimpleExtractionPhase) to enable it, then call print_report().
+
+        profiler = PhaseProfiler()
+        phase.profiler = profiler
+        for doc in docs:
+            phase.find_match(doc)
+        profiler.print_report()
+
+    Timing adds a small cost to every match, so leave the profiler unset
+    in production.
+    """
+
+    # Names of the stages which are not patterns or chain links.
+    PREFILTER = 'prefilter'
+    TOKENIZATION = 'tokenization'
+    # The report row for time not recorded under any stage.
+    OTHER = 'other'
+
+    def __init__(self):
+        self._init_state()
+        self.reset()
+
+    def _init_state(self):
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_state()
+
+    def reset(self):
+        """Discard everything recorded so far."""
+        with self._lock:
+            self.nbr_documents = 0
+            self.total_seconds = 0.0
+            # Per stage name: [seconds, calls, matches].
+            self._stats: Dict[str, List] = {}
+
+    @staticmethod
+    def pattern_stage(ann_type: str) -> str:
+        """Return the stage name of the regex_patterns entry for ann_type."""
+        return f"regex_patterns[{ann_type!r}]"
+
+    @staticmethod
+    def chain_stage(idx: int, start_type: str, end_type: str) -> str:
+        """Return the stage name of the chain link at index idx."""
+        return f"chain[{idx}] {start_type}->{end_type}"
+
+    def record(self, name: str, seconds: float, nbr_matches: int = 0):
+        """
+        Add one call of the named stage.
+
+        Args:
+            name (str):
+            seconds (float): time taken by the call.
+            nbr_matches (int, optional): matches found by the call.
+                Defaults to 0.
+        """
+        with self._lock:
+            stat = self._stats.get(name)
+            if stat is None:
+                self._stats[name] = [seconds, 1, nbr_matches]
+            else:
+                stat[0] += seconds
+                stat[1] += 1
+                stat[2] += nbr_matches
+
+    def record_document(self, seconds: float):
+        """
+        Add one document, which took seconds in all.
+
+        Args:
+            seconds (float):
+        """
+        with self._lock:
+            self.nbr_documents += 1
+            self.total_seconds += seconds
+
+    def iter_timed(self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """
+        Yield the items of a lazily computed iterable, recording the time
+        spent computing them, and their number as matches, under name.
+
+        Args:
+            name (str):
+            items (Iterable[T]):
+
+        Returns:
+            Iterator[T]:
+        """
+        iterator = iter(items)
+        seconds = 0.0
+        nbr_matches = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    return
+                seconds += time.perf_counter() - start
+                nbr_matches += 1
+                yield item
+        finally:
+            self.record(name, seconds, nbr_matches)
+
+    def get_report(self) -> List[Tuple[str, float, int, int]]:
+        """
+        Return the recorded stages, most time-consuming first, followed by
+        'other', the part of the documents' total time not recorded by any
+        stage.
+
+        Returns:
+            List[Tuple[str, float, int, int]]: (name, seconds, calls,
+                matches) tuples.
+        """
+        with self._lock:
+            rows = [(name, stat[0], stat[1], stat[2]) for name, stat in self._stats.items()]
+            other = self.total_seconds - sum(row[1] for row in rows)
+            nbr_documents = self.nbr_documents
+        rows.sort(key=lambda row: row[1], reverse=True)
+        rows.append((PhaseProfiler.OTHER, max(other, 0.0), nbr_documents, 0))
+        return rows
+
+    def format_report(self) -> str:
+        """
+        Return get_report() as a table, with each stage's share of the total
+        time and its time per document.
+
+        Returns:
+            str:
+        """
+        rows = self.get_report()
+        nbr_documents = max(self.nbr_documents, 1)
+        total = self.total_seconds or sum(row[1] for row in rows) or 1.0
+        width = max([len(row[0]) for row in rows] + [5])
+        lines = [f"{self.nbr_documents:,} documents, {self.total_seconds:.3f} s",
+                 f"{'stage':<{width}} {'seconds':>9} {'share':>6} {'ms/doc':>8} {'calls':>9} {'matches':>9}"]
+        for name, seconds, calls, matches in rows:
+            lines.append(f"{name:<{width}} {seconds:9.3f} {seconds / total:6.1%} "
+                         f"{seconds * 1000 / nbr_documents:8.3f} {calls:9,} {matches:9,}")
+        return '\n'.join(lines)
+
+    def print_report(self):
+        """Print format_report()."""
+        print(self.format_report())
+
+
+if __name__ == '__main__':
+    pass
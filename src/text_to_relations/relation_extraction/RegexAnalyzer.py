@@ -0,0 +1,687 @@
+"""
+RegexAnalyzer: static analysis of regular expressions, based on the parse
+trees produced by the parser of the re module.
+
+The parser and its opcodes are private to CPython (re._parser and
+re._constants from Python 3.11, sre_parse and sre_constants before), so the
+analyses here may need updating for new Python versions.
+"""
+import math
+import re
+import string
+import sys
+from typing import FrozenSet, Iterator, List, Optional, Set, Tuple
+
+if sys.version_info >= (3, 11):
+    from re import _constants as sre_constants  # type: ignore[attr-defined]
+    from re import _parser as sre_parse  # type: ignore[attr-defined]
+else:
+    import sre_constants
+    import sre_parse
+
+_REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, 'POSSESSIVE_REPEAT'):
+    _REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+_ATOMIC_GROUP = getattr(sre_constants, 'ATOMIC_GROUP', None)
+
+_MAXREPEAT = sre_constants.MAXREPEAT
+_POSSESSIVE_REPEAT = getattr(sre_constants, 'POSSESSIVE_REPEAT', None)
+
+_CATEGORY_REGEXES = {
+    'CATEGORY_DIGIT': r'\d', 'CATEGORY_NOT_DIGIT': r'\D',
+    'CATEGORY_SPACE': r'\s', 'CATEGORY_NOT_SPACE': r'\S',
+    'CATEGORY_WORD': r'\w', 'CATEGORY_NOT_WORD': r'\W',
+}
+
+# The characters against which character sets are compared: ASCII plus a
+# few non-ASCII letters, digits and spaces. The literals of each regex
+# analyzed are added to them.
+_PROBE_CHARS = string.printable + '\u00a0\u00e9\u0416\u0663\u2003'
+
+_WORD_BOUNDARIES = (sre_constants.AT_BOUNDARY, sre_constants.AT_NON_BOUNDARY,
+                    sre_constants.AT_UNI_BOUNDARY, sre_constants.AT_UNI_NON_BOUNDARY)
+_SPACE_CATEGORIES = {'CATEGORY_SPACE', 'CATEGORY_NOT_SPACE',
+                     'CATEGORY_UNI_SPACE', 'CATEGORY_UNI_NOT_SPACE'}
+# The non-ASCII characters which re.IGNORECASE equates with ASCII letters:
+# dotted capital I, dotless i, long s and the Kelvin sign.
+_FOLDS_TO_ASCII = {'\u0130', '\u0131', '\u017f', '\u212a'}
+
+# Clauses with more alternatives than this are dropped from the result of
+# get_required_literals(): checking them would cost more than it saves.
+MAX_CLAUSE_ALTERNATIVES = 32
+
+
+def fold_case(text: str) -> str:
+    """
+    Fold text for case-insensitive substring tests, such that whenever a
+    literal matches part of a text under re.IGNORECASE, the folded literal
+    is a substring of the folded text.
+
+    Args:
+        text (str):
+
+    Returns:
+        str:
+    """
+    # re.IGNORECASE also equates the dotless and dotted i's with 'i' and
+    # 'I', which casefold() does not.
+    return text.casefold().replace('\u0131', 'i').replace('i\u0307', 'i')
+
+
+def get_min_width(regex_str: str, flags: int = 0) -> int:
+    """
+    Return the length of the shortest string the regex can match.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        int:
+    """
+    return sre_parse.parse(regex_str, flags).getwidth()[0]
+
+
+def has_context_assertions(regex_str: str, flags: int = 0) -> bool:
+    """
+    Does the regex use anchors ('^', '$', '\\A', '\\Z') or lookarounds,
+    whose result at the edges of a text depends on whether anything
+    precedes or follows it? Word boundaries ('\\b', '\\B') do not count:
+    they behave the same at an edge and next to a non-word character.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        bool:
+    """
+    for op, av in _walk(sre_parse.parse(regex_str, flags)):
+        if op is sre_constants.AT and av not in _WORD_BOUNDARIES:
+            return True
+        if op is sre_constants.ASSERT or op is sre_constants.ASSERT_NOT:
+            return True
+    return False
+
+
+def is_ascii_compatible(regex_str: str, flags: int = 0) -> bool:
+    """
+    Does the regex find the same matches in ASCII text when compiled with
+    re.ASCII, which makes '\\w', '\\b', '\\d' and '\\s' faster to evaluate?
+
+    On ASCII text, the ASCII and Unicode meanings of these classes differ
+    only in that Unicode '\\s' also matches '\\x1c' to '\\x1f'; see
+    uses_space_class(). Otherwise a regex is compatible unless it cannot be
+    compiled with re.ASCII, or it has one of the few non-ASCII characters
+    which re.IGNORECASE equates with ASCII letters.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        bool:
+    """
+    parsed = sre_parse.parse(regex_str, flags)
+    try:
+        re.compile(regex_str, flags | re.ASCII)
+    except (re.error, ValueError):
+        # E.g. an inline (?u) flag.
+        return False
+
+    for op, av in _walk(parsed):
+        if op is sre_constants.IN:
+            for in_op, in_av in av:
+                if in_op is sre_constants.LITERAL and chr(in_av) in _FOLDS_TO_ASCII:
+                    return False
+                if isinstance(in_av, tuple) and len(in_av) == 2 and \
+                        any(in_av[0] <= ord(char) <= in_av[1] for char in _FOLDS_TO_ASCII):
+                    return False
+        elif op is sre_constants.LITERAL or op is sre_constants.NOT_LITERAL:
+            if chr(av) in _FOLDS_TO_ASCII:
+                return False
+    return True
+
+
+def uses_unicode_classes(regex_str: str, flags: int = 0) -> bool:
+    """
+    Does the regex use any of the constructs whose meaning re.ASCII
+    changes: the classes '\\w', '\\d' and '\\s', their negations, word
+    boundaries, or case-insensitive matching? If not, re.ASCII makes no
+    difference to it.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        bool:
+    """
+    parsed = sre_parse.parse(regex_str, flags)
+    if parsed.state.flags & re.IGNORECASE:
+        return True
+    for op, av in _walk(parsed):
+        if op is sre_constants.AT and av in _WORD_BOUNDARIES:
+            return True
+        if op is sre_constants.IN and any(in_op is sre_constants.CATEGORY for in_op, _ in av):
+            return True
+        if op is sre_constants.SUBPATTERN and av[1] & re.IGNORECASE:
+            return True
+    return False
+
+
+def uses_space_class(regex_str: str, flags: int = 0) -> bool:
+    """
+    Does the regex use '\\s' or '\\S'?
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        bool:
+    """
+    for op, av in _walk(sre_parse.parse(regex_str, flags)):
+        if op is sre_constants.IN and any(
+                in_op is sre_constants.CATEGORY and str(in_av) in _SPACE_CATEGORIES
+                for in_op, in_av in av):
+            return True
+    return False
+
+
+def _walk(items) -> Iterator[Tuple]:
+    """Yield every (op, av) item of a parsed regex, nested ones included."""
+    for op, av in items:
+        yield op, av
+        if op is sre_constants.SUBPATTERN:
+            yield from _walk(av[3])
+        elif op is _ATOMIC_GROUP:
+            yield from _walk(av)
+        elif op in _REPEAT_OPS:
+            yield from _walk(av[2])
+        elif op is sre_constants.BRANCH:
+            for alternative in av[1]:
+                yield from _walk(alternative)
+        elif op is sre_constants.ASSERT or op is sre_constants.ASSERT_NOT:
+            yield from _walk(av[1])
+        elif op is sre_constants.GROUPREF_EXISTS:
+            for alternative in av[1:]:
+                if alternative is not None:
+                    yield from _walk(alternative)
+
+
+def get_required_literals(regex_str: str, flags: int = 0) -> List[List[str]]:
+    """
+    Derive literal substrings which any text must contain for the regex to
+    match it, as clauses: for each clause, at least one of its literals must
+    occur in the text.
+
+    For instance, every match of '(?:between|from)\\s\\d+ (?:kg|lbs)' contains
+    'between' or 'from', and ' kg' or ' lbs', so the result is
+    [['between', 'from'], [' kg', ' lbs']].
+
+    The clauses are necessary but not sufficient conditions: a text may
+    contain them and still not match. The analysis is conservative--parts of
+    the regex it cannot reason about, such as character classes, lookarounds
+    and optional or case-insensitive groups, contribute no clause--so a
+    regex may yield no clauses at all.
+
+    If the regex is case-insensitive as a whole, the literals are folded with
+    fold_case() and must be looked for in text folded the same way.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        List[List[str]]: the clauses, each sorted, without duplicates.
+    """
+    parsed = sre_parse.parse(regex_str, flags)
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    clauses = _sequence_clauses(parsed, ignore_case)
+
+    result = []
+    seen = set()
+    for clause in clauses:
+        if ignore_case:
+            clause = {fold_case(literal) for literal in clause}
+        if len(clause) > MAX_CLAUSE_ALTERNATIVES or '' in clause:
+            continue
+        key = frozenset(clause)
+        if key not in seen:
+            seen.add(key)
+            result.append(sorted(clause))
+    return result
+
+
+def _sequence_clauses(items, ignore_case: bool) -> List[Set[str]]:
+    """Return the clauses of a sequence of parsed regex items."""
+    clauses: List[Set[str]] = []
+    run: List[str] = []
+
+    def flush():
+        if run:
+            clauses.append({''.join(run)})
+            run.clear()
+
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, _, item = av
+            # A group turning on case-insensitivity only for itself is skipped.
+            if not ignore_case and add_flags & re.IGNORECASE:
+                continue
+            clauses.extend(_sequence_clauses(item, ignore_case))
+        elif op is _ATOMIC_GROUP:
+            clauses.extend(_sequence_clauses(av, ignore_case))
+        elif op in _REPEAT_OPS:
+            min_count, _, item = av
+            if min_count >= 1:
+                clauses.extend(_sequence_clauses(item, ignore_case))
+        elif op is sre_constants.BRANCH:
+            clause = _branch_clause(av[1], ignore_case)
+            if clause is not None:
+                clauses.append(clause)
+    flush()
+    return clauses
+
+
+def _branch_clause(alternatives, ignore_case: bool) -> Optional[Set[str]]:
+    """
+    Return a single clause satisfied by every alternative of a branch: the
+    union of one clause from each. None if some alternative has no clause.
+    """
+    result: Set[str] = set()
+    for alternative in alternatives:
+        clauses = _sequence_clauses(alternative, ignore_case)
+        if not clauses:
+            return None
+        # Prefer the clause whose shortest literal is longest, then the one
+        # with the fewest literals.
+        best = max(clauses, key=lambda clause: (min(len(literal) for literal in clause), -len(clause)))
+        result.update(best)
+    return result
+
+
+class BacktrackingRisk:
+    """
+    A part of a regex which can make the regex engine backtrack
+    excessively, found by find_backtracking_risks().
+
+    Attributes:
+        kind: 'nested' for a repeated group whose body can match the same
+            text in more than one way, 'adjacent' for a sequence of
+            quantifiers which can trade the same characters.
+        degree: for each starting position, the number of ways the engine
+            may try to match grows as n ** degree with the length n of the
+            text; math.inf for exponential growth.
+        description: a human-readable explanation.
+    """
+
+    def __init__(self, kind: str, degree: float, description: str):
+        self.kind = kind
+        self.degree = degree
+        self.description = description
+
+    def __repr__(self):
+        return f"BacktrackingRisk({self.kind!r}, {self.degree!r}, {self.description!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, BacktrackingRisk):
+            return NotImplemented
+        return (self.kind, self.degree, self.description) == \
+            (other.kind, other.degree, other.description)
+
+
+def find_backtracking_risks(regex_str: str, flags: int = 0) -> List[BacktrackingRisk]:
+    """
+    Statically look for the patterns which cause catastrophic backtracking:
+
+    - a repeated group whose body can match the same text in more than one
+      way, e.g. '(a+)+', '(\\w+\\s?)*' or, with alternatives which overlap,
+      '(?:a|aa)*', which backtracks exponentially if unbounded and
+      polynomially, to the degree of its maximum count, if not;
+    - quantifiers in sequence which can consume the same characters, e.g.
+      '.*x.*' or '\\S+(?:\\b\\S+)?', whose degree is the number of such
+      quantifiers.
+
+    The analysis is a heuristic over the parse tree: quantifiers overlap if
+    the characters one can consume include those the next can start with,
+    as sampled on ASCII and a few other characters. It may report risks the
+    engine avoids in practice; possessive quantifiers and atomic groups are
+    not considered ambiguous.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        List[BacktrackingRisk]:
+    """
+    parsed = sre_parse.parse(regex_str, flags)
+    analyzer = _BacktrackingAnalyzer(parsed, parsed.state.flags)
+    analyzer.scan(list(parsed.data))
+    return analyzer.risks
+
+
+def estimate_backtracking_degree(regex_str: str, flags: int = 0) -> float:
+    """
+    Estimate the worst-case cost of matching the regex at one position of
+    a text of length n as n ** degree.
+
+    Args:
+        regex_str (str):
+        flags (int, optional): re module flags. Defaults to 0.
+
+    Raises:
+        re.error: if regex_str is not a valid regex.
+
+    Returns:
+        float: the highest degree of find_backtracking_risks(), 1 if there
+            are none, and math.inf if backtracking can be exponential.
+    """
+    return max([1] + [risk.degree for risk in find_backtracking_risks(regex_str, flags)])
+
+
+class _NodeInfo:
+    """What a parsed regex item can match, for the backtracking analysis."""
+    __slots__ = ('first', 'tail', 'min_width', 'max_width')
+
+    def __init__(self, first: FrozenSet[str], tail: FrozenSet[str],
+                 min_width: float, max_width: float):
+        # The characters a match can start with.
+        self.first = first
+        # The characters a match can give back at its end, when backtracking,
+        # for what follows to match: empty for fixed strings, possessive
+        # quantifiers and atomic groups.
+        self.tail = tail
+        self.min_width = min_width
+        self.max_width = max_width
+
+
+_EMPTY: FrozenSet[str] = frozenset()
+
+# Items which match exactly one character.
+_SINGLE_CHAR_OPS = (sre_constants.LITERAL, sre_constants.NOT_LITERAL, sre_constants.ANY, sre_constants.IN)
+
+
+class _BacktrackingAnalyzer:
+
+    def __init__(self, parsed, flags: int):
+        self.ignore_case = bool(flags & re.IGNORECASE)
+        self.dot_all = bool(flags & re.DOTALL)
+        self.risks: List[BacktrackingRisk] = []
+        probes = set(_PROBE_CHARS)
+        self._collect_literals(list(parsed), probes)
+        self.probes = frozenset(probes)
+
+    def _collect_literals(self, items, probes: Set[str]):
+        for op, av in items:
+            if op is sre_constants.LITERAL or op is sre_constants.NOT_LITERAL:
+                probes.add(chr(av))
+            elif op is sre_constants.SUBPATTERN:
+                self._collect_literals(av[3], probes)
+            elif op is _ATOMIC_GROUP:
+                self._collect_literals(av, probes)
+            elif op in _REPEAT_OPS:
+                self._collect_literals(av[2], probes)
+            elif op is sre_constants.BRANCH:
+                for alternative in av[1]:
+                    self._collect_literals(alternative, probes)
+            elif op is sre_constants.IN:
+                for in_op, in_av in av:
+                    if in_op is sre_constants.LITERAL:
+                        probes.add(chr(in_av))
+
+    def _fold(self, chars: Set[str]) -> FrozenSet[str]:
+        if not self.ignore_case:
+            return frozenset(chars)
+        lowered = {char.lower() for char in chars}
+        return frozenset(char for char in self.probes if char.lower() in lowered)
+
+    def _class_chars(self, av) -> FrozenSet[str]:
+        chars: Set[str] = set()
+        negate = False
+        for op, item in av:
+            if op is sre_constants.NEGATE:
+                negate = True
+            elif op is sre_constants.LITERAL:
+                chars.add(chr(item))
+            elif op is sre_constants.CATEGORY:
+                category = re.compile(_CATEGORY_REGEXES.get(str(item), r'[\s\S]'))
+                chars.update(char for char in self.probes if category.fullmatch(char))
+            elif isinstance(item, tuple) and len(item) == 2:
+                # RANGE and its case-insensitive variants.
+                chars.update(char for char in self.probes if item[0] <= ord(char) <= item[1])
+            else:
+                chars.update(self.probes)
+        folded = self._fold(chars)
+        return self.probes - folded if negate else folded
+
+    def scan(self, items, record: bool = True) -> Tuple[_NodeInfo, float]:
+        """
+        Analyze a sequence of items, recording the risks found in it unless
+        record is False.
+
+        Returns:
+            Tuple[_NodeInfo, float]: what the sequence can match, and the
+                highest degree of the quantifiers in sequence in it.
+        """
+        # What the quantifiers which can still give back characters to what
+        # follows can give back, with the number of overlapping quantifiers
+        # they end.
+        open_quantifiers: List[Tuple[FrozenSet[str], int]] = []
+        max_degree = 1
+        first: Set[str] = set()
+        min_width = max_width = 0.0
+        nullable_prefix = True
+
+        for op, av in items:
+            info = self.info(op, av)
+            if nullable_prefix:
+                first.update(info.first)
+                nullable_prefix = info.min_width == 0
+            min_width += info.min_width
+            max_width += info.max_width
+
+            overlapping = [(tail & info.first, degree) for tail, degree in open_quantifiers
+                           if tail & info.first]
+            degree = 1
+            if info.tail and overlapping:
+                degree = 1 + max(degree for _, degree in overlapping)
+                max_degree = max(max_degree, degree)
+                if record:
+                    sample = min(set().union(*(shared for shared, _ in overlapping)))
+                    self.risks.append(BacktrackingRisk(
+                        'adjacent', degree,
+                        f"{degree} quantifiers in sequence can consume the same characters, "
+                        f"e.g. {sample!r}"))
+            if info.min_width > 0:
+                # A required item ends the quantifiers which cannot give it
+                # characters.
+                open_quantifiers = [(tail, degree) for tail, degree in open_quantifiers
+                                    if tail & info.first]
+            if info.tail:
+                open_quantifiers.append((info.tail, degree))
+
+        tail = frozenset().union(*(tail for tail, _ in open_quantifiers))
+        return _NodeInfo(frozenset(first), tail, min_width, max_width), max_degree
+
+    def info(self, op, av) -> _NodeInfo:
+        """Return what one parsed item can match, recording its risks."""
+        if op is sre_constants.LITERAL:
+            return _NodeInfo(self._fold({chr(av)}), _EMPTY, 1, 1)
+        if op is sre_constants.NOT_LITERAL:
+            return _NodeInfo(self.probes - self._fold({chr(av)}), _EMPTY, 1, 1)
+        if op is sre_constants.ANY:
+            return _NodeInfo(self.probes if self.dot_all else self.probes - {'\n'}, _EMPTY, 1, 1)
+        if op is sre_constants.IN:
+            return _NodeInfo(self._class_chars(av), _EMPTY, 1, 1)
+        if op is sre_constants.SUBPATTERN:
+            return self.scan(av[3])[0]
+        if op is _ATOMIC_GROUP:
+            info = self.scan(av)[0]
+            info.tail = _EMPTY
+            return info
+        if op is sre_constants.BRANCH:
+            infos = [self.scan(alternative)[0] for alternative in av[1]]
+            return _NodeInfo(frozenset().union(*(info.first for info in infos)),
+                             frozenset().union(*(info.tail for info in infos)),
+                             min(info.min_width for info in infos),
+                             max(info.max_width for info in infos))
+        if op in _REPEAT_OPS:
+            return self._repeat_info(op, av)
+        if op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            return _NodeInfo(_EMPTY, _EMPTY, 0, 0)
+        # Backreferences, conditionals and anything else: assume the worst.
+        return _NodeInfo(self.probes, self.probes, 0, math.inf)
+
+    def _repeat_info(self, op, av) -> _NodeInfo:
+        min_count, max_count, body = av
+        body_info, body_degree = self.scan(body)
+        if max_count == _MAXREPEAT:
+            max_count = math.inf
+        if body_info.max_width == 0 or max_count == 0:
+            return _NodeInfo(_EMPTY, _EMPTY, 0, 0)
+
+        if max_count > 1 and op is not _POSSESSIVE_REPEAT:
+            degree = max_count
+            growth = 'exponential' if degree == math.inf else f'degree {degree}'
+            # Can one iteration end where the next begins in more than one
+            # way? Scan two copies of the body.
+            _, twice_degree = self.scan(list(body) + list(body), record=False)
+            if twice_degree > body_degree:
+                self.risks.append(BacktrackingRisk(
+                    'nested', degree,
+                    f"a repeated group whose body can match the same text in more than one way "
+                    f"({growth} backtracking)"))
+            elif self._has_ambiguous_branch(body, body_info.first):
+                self.risks.append(BacktrackingRisk(
+                    'nested', degree,
+                    f"a repeated group whose alternatives can match the same text "
+                    f"({growth} backtracking)"))
+
+        tail = body_info.tail
+        if min_count != max_count:
+            # The repeat can give back whole iterations.
+            tail = tail | body_info.first
+        if op is _POSSESSIVE_REPEAT:
+            tail = _EMPTY
+        return _NodeInfo(body_info.first, tail, min_count * body_info.min_width,
+                         max_count * body_info.max_width)
+
+    def _first(self, items) -> Tuple[FrozenSet[str], bool]:
+        """
+        Return the characters a match of a sequence of items can start
+        with, and whether the match can be empty, without recording risks.
+        """
+        first: Set[str] = set()
+        for op, av in items:
+            if op in _SINGLE_CHAR_OPS:
+                first.update(self.info(op, av).first)
+                return frozenset(first), False
+            if op is sre_constants.SUBPATTERN:
+                item_first, nullable = self._first(av[3])
+            elif op is _ATOMIC_GROUP:
+                item_first, nullable = self._first(av)
+            elif op in _REPEAT_OPS:
+                item_first, nullable = self._first(av[2])
+                nullable = nullable or av[0] == 0
+            elif op is sre_constants.BRANCH:
+                alternatives = [self._first(alternative) for alternative in av[1]]
+                item_first = frozenset().union(*(alt_first for alt_first, _ in alternatives))
+                nullable = any(alt_nullable for _, alt_nullable in alternatives)
+            elif op in (sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+                continue
+            else:
+                return self.probes, True
+            first.update(item_first)
+            if not nullable:
+                return frozenset(first), False
+        return frozenset(first), True
+
+    def _has_ambiguous_branch(self, items, follow: FrozenSet[str]) -> bool:
+        """
+        Does the sequence contain an alternation, outside possessive
+        quantifiers and atomic groups, two of whose alternatives can match
+        the same text? follow holds the characters which can come after
+        the sequence.
+
+        Two alternatives overlap if both can be empty, if their first
+        characters intersect (unless a later character of their leading
+        single-character items tells them apart), or if one can be empty
+        and the other can start with a character that can follow the
+        alternation, as in '(?:a|aa)*', which the parser turns into
+        'a(?:|a)'.
+        """
+        # The characters which can follow each item, computed backwards.
+        follows = []
+        for op, av in reversed(items):
+            follows.append(follow)
+            item_first, nullable = self._first([(op, av)])
+            follow = item_first | follow if nullable else item_first
+        follows.reverse()
+
+        for (op, av), item_follow in zip(items, follows):
+            if op is sre_constants.SUBPATTERN:
+                if self._has_ambiguous_branch(av[3], item_follow):
+                    return True
+            elif op in _REPEAT_OPS and op is not _POSSESSIVE_REPEAT:
+                body_first, _ = self._first(av[2])
+                if self._has_ambiguous_branch(av[2], item_follow | body_first):
+                    return True
+            elif op is sre_constants.BRANCH:
+                alternatives = av[1]
+                firsts = [self._first(alternative) for alternative in alternatives]
+                for i, (first_i, nullable_i) in enumerate(firsts):
+                    for j in range(i + 1, len(firsts)):
+                        first_j, nullable_j = firsts[j]
+                        if nullable_i and nullable_j or \
+                                nullable_i and first_j & item_follow or \
+                                nullable_j and first_i & item_follow or \
+                                first_i & first_j and \
+                                not self._prefixes_disjoint(alternatives[i], alternatives[j]):
+                            return True
+                if any(self._has_ambiguous_branch(alternative, item_follow) for alternative in alternatives):
+                    return True
+        return False
+
+    def _prefixes_disjoint(self, items1, items2) -> bool:
+        """
+        Do the leading single-character items of two sequences, compared
+        position by position, show that they cannot match the same text?
+        """
+        for (op1, av1), (op2, av2) in zip(items1, items2):
+            if op1 not in _SINGLE_CHAR_OPS or op2 not in _SINGLE_CHAR_OPS:
+                return False
+            if not self.info(op1, av1).first & self.info(op2, av2).first:
+                return True
+        return False
+
+
+if __name__ == '__main__':
+    pass
@@ -2,23 +2,62 @@
 RegexString: a wrapper around regular expressions for building and combining patterns.
 """
 import re
+import sys
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Pattern, Sequence, Set, Tuple, Union, cast
+
+from text_to_relations.relation_extraction import RegexAnalyzer
+from text_to_relations.relation_extraction import StringUtils
+from text_to_relations.relation_extraction.AhoCorasick import AhoCorasick, ignorecase_fold
+
+# Joins the documents of RegexString.get_batch_match_triples(). Any non-word
+# character would do: matches which consume it are detected by offset.
+_BATCH_SEPARATOR = '\x00'
+
+# The ASCII characters which Unicode '\s' matches but ASCII '\s' does not.
+_UNICODE_ONLY_SPACES = ('\x1c', '\x1d', '\x1e', '\x1f')
+
+# Whether the re module supports atomic groups and possessive quantifiers.
+_ATOMIC_GROUPS = sys.version_info >= (3, 11)
+
+
+class _TrieNode:
+    """A node of the prefix tree built by RegexString._build_trie_regex()."""
+    __slots__ = ('children', 'is_end', 'depth')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        # Does an item end at this node?
+        self.is_end = False
+        # The length of the longest item continuing below this node.
+        self.depth = 0
 
-from typing import List, Tuple, Union, cast
 
 class RegexString:
     """
     A class wrapped around a regular expression, offering functionality
     to create, concatenate and construct complex regex strings via an
     easy-to-use set of functions.
+
+    Each RegexString compiles its regex once per combination of flags and
+    keeps the compiled pattern (see get_compiled()), so that matching it
+    repeatedly over a corpus does not depend on the small global cache of
+    the re module. Assigning regex_str discards the compiled patterns.
     """
 
+    # Matching backends accepted by __init__().
+    BACKENDS = ('regex', 'aho_corasick')
+
     def __init__(self, match_strs: List[str],
                  whole_word: bool=False,
                  optional: bool=False,
                  non_capturing: bool=True,
                  prepend: str='',
                  append: str='',
-                 escape: bool=True):
+                 escape: bool=True,
+                 trie: bool=False,
+                 backend: str='regex',
+                 ascii_input: Optional[bool]=None):
         """
 
         Args:
@@ -51,12 +90,48 @@ class RegexString:
                 treated as literals. Set to False to use regex syntax directly
                 in match_strs items (e.g. r'\\d+', r'[A-Z]+'). Defaults to
                 True.
+            trie (bool, optional): if True, factor the common prefixes of
+                match_strs out of the alternation, building a regex shaped
+                like a trie ('ab(?:cd?|x)' rather than '(?:abcd|abc|abx)').
+                The regex matches exactly what the flat alternation would,
+                longest item first, but the regex engine no longer tries
+                every item in turn at each position, which makes compiling
+                and matching lists of thousands of items much faster.
+                Requires escape=True. Defaults to False.
+            backend (str, optional): how get_match_triples() finds matches.
+                'regex' (the default) runs the regex. 'aho_corasick' finds
+                the match_strs with an Aho-Corasick automaton instead, which
+                returns the same triples, honouring whole_word and the
+                longest-match rule, in time linear in the text whatever the
+                number of match_strs. It requires plain literal lists:
+                escape=True, no empty items, optional=False and no prepend
+                or append. The regex is still built, for use in concat()
+                and elsewhere.
+            ascii_input (bool, optional): whether texts to match are pure
+                ASCII, in which case the regex is compiled with re.ASCII,
+                which evaluates '\\w', '\\b', '\\d' and '\\s' faster and finds
+                the same matches on such texts (see
+                RegexAnalyzer.is_ascii_compatible()). None (the default)
+                checks each text; True skips the check, and the caller
+                guarantees ASCII input without the control characters
+                '\\x1c' to '\\x1f'; False never uses re.ASCII.
         """
         # If match_strs is a string, the user has made an error.
         if isinstance(match_strs, str):
             raise ValueError("match_strs parameter must be a list. You passed in a string.")
 
         self.escape = escape
+        if trie and not escape:
+            raise ValueError("trie=True requires escape=True: only literal match_strs can be factored.")
+        self.trie = trie
+        if backend not in RegexString.BACKENDS:
+            raise ValueError(f"Unknown backend: {backend!r}. Expected one of {RegexString.BACKENDS}.")
+        if backend == 'aho_corasick' and (not escape or optional or prepend or append or
+                                          any(item == '' for item in match_strs)):
+            raise ValueError("The 'aho_corasick' backend requires literal, non-empty match_strs: "
+                             "escape=True, optional=False and no prepend or append.")
+        self.backend = backend
+        self.ascii_input = ascii_input
 
         # The regex engine takes the first matching alternative in an alternation,
         # even if a longer match is possible. E.g. if `text` contains "18" and we call
@@ -92,9 +167,35 @@ class RegexString:
                 raise ValueError(msg)
 
         self.regex_str = self.set_regex()
-
-
-    def set_regex(self):
+        # The backend only applies while regex_str is the one built here.
+        self._built_regex_str = self.regex_str
+        # Aho-Corasick automata keyed by case sensitivity; filled in by
+        # get_match_triples() for the 'aho_corasick' backend.
+        self._automata: Dict[bool, AhoCorasick] = {}
+
+    @property
+    def regex_str(self) -> str:
+        """The regular expression string. See also get_regex_str()."""
+        return self._regex_str
+
+    @regex_str.setter
+    def regex_str(self, value: str):
+        self._regex_str = value
+        # Compiled patterns keyed by flags; filled in by get_compiled().
+        self._compiled: Dict[int, Pattern[str]] = {}
+        # Whether the regex can be compiled with re.ASCII, and whether texts
+        # must then be checked for '\x1c' to '\x1f', keyed by flags; filled
+        # in by _ascii_flag().
+        self._ascii_compatible: Dict[int, Tuple[bool, bool]] = {}
+        # Required literals keyed by case sensitivity; filled in by
+        # get_required_literals().
+        self._required_literals: Dict[bool, Tuple[List[List[str]], bool]] = {}
+        # An equivalent regex using possessive quantifiers, compiled instead
+        # of regex_str where the re module supports them; set by
+        # concat_with_word_distances() and concat().
+        self._atomic_regex_str: Optional[str] = None
+
+    def set_regex(self, fold_case: bool=False):
         """
         Build and return the regex string from this object's properties.
 
@@ -102,6 +203,15 @@ class RegexString:
         prepend, and append into a single regex pattern string. Called once
         during __init__; result is stored in self.regex_str.
 
+        Args:
+            fold_case (bool, optional): if True and trie is True, build the
+                trie from match_strs folded as re.IGNORECASE folds them (see
+                AhoCorasick.ignorecase_fold()), for case-insensitive
+                matching: otherwise items which re.IGNORECASE treats as
+                equal, such as 'Type' and 'type' or 'ſun' and 'sun', would
+                fall into different branches and the trie would no longer
+                try the longest item first. Defaults to False.
+
         Returns:
             str: the compiled regex pattern string.
         """
@@ -116,10 +226,13 @@ class RegexString:
             if self.non_capturing:
                 result += '?:'
 
-            for item in self.match_strs:
-                result += (item if not self.escape else re.escape(item)) + '|'
-            # Remove last pipe.
-            result = result[0:-1]
+            if self.trie:
+                result += RegexString._build_trie_regex(self.match_strs, fold_case)
+            else:
+                for item in self.match_strs:
+                    result += (item if not self.escape else re.escape(item)) + '|'
+                # Remove last pipe.
+                result = result[0:-1]
 
             result += ')'
 
@@ -149,6 +262,87 @@ class RegexString:
 
         return result
 
+    @staticmethod
+    def _build_trie_regex(items: List[str], fold_case: bool=False) -> str:
+        """
+        Build an alternation of the escaped items, with common prefixes
+        factored out, for use inside a group. See the trie parameter of
+        __init__().
+
+        Within a trie node, children begin with different characters, so
+        at most one of them can match at a given position; the order in
+        which they are tried does not change what is matched. Along a
+        single path, longer items are tried before their prefixes, as in
+        the length-sorted flat alternation.
+
+        Args:
+            items (List[str]): literal strings, not escaped
+            fold_case (bool, optional): if True, fold the items first with
+                ignorecase_fold(). Defaults to False.
+
+        Returns:
+            str:
+        """
+        if fold_case:
+            items = [ignorecase_fold(item) for item in items]
+        root = _TrieNode()
+        for item in items:
+            node = root
+            node.depth = max(node.depth, len(item))
+            for idx, char in enumerate(item):
+                child = node.children.get(char)
+                if child is None:
+                    child = _TrieNode()
+                    node.children[char] = child
+                node = child
+                node.depth = max(node.depth, len(item) - idx - 1)
+            node.is_end = True
+
+        body = '|'.join(RegexString._trie_node_parts(root))
+        if root.is_end:
+            # The empty string is one of the items.
+            return '(?:' + body + ')?' if body else ''
+        return body
+
+    @staticmethod
+    def _trie_node_parts(node: '_TrieNode') -> List[str]:
+        """
+        Return the regex alternatives matching the continuations of node,
+        deepest first.
+        """
+        parts = []
+        # Single characters which end an item and have no continuation are
+        # collected into one character class.
+        leaf_chars = []
+        for char, child in sorted(node.children.items(), key=lambda pair: -pair[1].depth):
+            if not child.children:
+                leaf_chars.append(char)
+                continue
+            # Follow chains of single-child nodes without recursing.
+            path = char
+            while len(child.children) == 1 and not child.is_end:
+                (next_char, child), = child.children.items()
+                path += next_char
+            part = re.escape(path)
+            if child.children:
+                child_parts = RegexString._trie_node_parts(child)
+                if len(child_parts) == 1 and (len(child_parts[0]) == 1 or
+                                              child_parts[0].startswith('[') and
+                                              child_parts[0].endswith(']') and
+                                              child_parts[0].count('[') == 1):
+                    continuation = child_parts[0]
+                else:
+                    continuation = '(?:' + '|'.join(child_parts) + ')'
+                # If child also ends an item, the continuation is optional,
+                # and greedy, so that longer items are tried first.
+                part += continuation + ('?' if child.is_end else '')
+            parts.append(part)
+        if len(leaf_chars) == 1:
+            parts.append(re.escape(leaf_chars[0]))
+        elif leaf_chars:
+            parts.append('[' + ''.join(re.escape(char) for char in leaf_chars) + ']')
+        return parts
+
     def get_regex_str(self):
         """
         Return the regular expression for this object's properties.
@@ -156,9 +350,120 @@ class RegexString:
         """
         return self.regex_str
 
+    def get_fingerprint(self, case_insensitive: bool = False) -> str:
+        """
+        Return a stable hex digest of the regex and the flags it is matched
+        with: equal in every process for RegexStrings which find the same
+        matches in the same way, and different once regex_str changes. The
+        backend and ascii_input, which change how matches are found but not
+        which, are left out.
+
+        Args:
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            str:
+        """
+        flags = re.IGNORECASE if case_insensitive else 0
+        return StringUtils.fingerprint({'regex_str': self._regex_str, 'flags': flags})
+
+    def get_compiled(self, flags: int = 0) -> Pattern[str]:
+        """
+        Return this object's regex compiled with the given flags. The
+        pattern is compiled on the first call for each combination of flags
+        and cached on this object until regex_str is reassigned.
+
+        For a RegexString built with trie=True, a case-insensitive pattern is
+        compiled from a trie of the lowercased match_strs; see set_regex().
+
+        Args:
+            flags (int, optional): re module flags, e.g. re.IGNORECASE.
+                Defaults to 0.
+
+        Returns:
+            Pattern[str]:
+        """
+        compiled = self._compiled.get(flags)
+        if compiled is None:
+            regex_str = self._regex_str
+            if self._atomic_regex_str is not None and _ATOMIC_GROUPS:
+                regex_str = self._atomic_regex_str
+            elif self.trie and flags & re.IGNORECASE and regex_str == self.set_regex():
+                regex_str = self.set_regex(fold_case=True)
+            compiled = re.compile(regex_str, flags)
+            self._compiled[flags] = compiled
+        return compiled
+
+    def get_required_literals(self, case_insensitive: bool = False) -> List[List[str]]:
+        """
+        Return the literal substrings a text must contain for this regex to
+        match it, derived from the regex (and so from match_strs, prepend
+        and append) by RegexAnalyzer.get_required_literals(). Each clause is
+        a list of alternatives, at least one of which must occur in the text.
+
+        The result is computed once and cached until regex_str is reassigned.
+        If matching is case-insensitive, the literals are folded with
+        RegexAnalyzer.fold_case().
+
+        Args:
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            List[List[str]]: the clauses; empty if nothing can be derived,
+                e.g. because match_strs are optional.
+        """
+        return self._get_required_literals(case_insensitive)[0]
+
+    def _get_required_literals(self, case_insensitive: bool) -> Tuple[List[List[str]], bool]:
+        """Return the required literals and whether they are case-folded."""
+        result = self._required_literals.get(case_insensitive)
+        if result is None:
+            flags = re.IGNORECASE if case_insensitive else 0
+            folded = bool(self.get_compiled(flags).flags & re.IGNORECASE)
+            result = (RegexAnalyzer.get_required_literals(self._regex_str, flags), folded)
+            self._required_literals[case_insensitive] = result
+        return result
+
+    def get_backtracking_risks(self, case_insensitive: bool = False) -> List['RegexAnalyzer.BacktrackingRisk']:
+        """
+        Return the parts of this regex which can make the regex engine
+        backtrack excessively; see RegexAnalyzer.find_backtracking_risks().
+
+        Args:
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            List[RegexAnalyzer.BacktrackingRisk]:
+        """
+        flags = re.IGNORECASE if case_insensitive else 0
+        return RegexAnalyzer.find_backtracking_risks(self._regex_str, flags)
+
+    def could_match(self, text: str, case_insensitive: bool = False) -> bool:
+        """
+        A cheap prefilter for get_match_triples(): return False if text
+        lacks the literals of some clause of get_required_literals(), in
+        which case this regex cannot match anywhere in it. A True result
+        does not guarantee a match.
+
+        Args:
+            text (str):
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            bool:
+        """
+        clauses, folded = self._get_required_literals(case_insensitive)
+        if not clauses:
+            return True
+        if folded:
+            text = RegexAnalyzer.fold_case(text)
+        return all(any(literal in text for literal in clause) for clause in clauses)
+
     def get_match_triples(self, text: str, case_insensitive: bool = False) -> List[Tuple]:
         """
-        Run re.finditer() on this regex.
+        Run finditer() on this regex, compiled once and cached (see
+        get_compiled()), or the Aho-Corasick automaton if this object was
+        built with backend='aho_corasick'.
         Note that this function is likely to fail if you have created any
         RegexString objects where non-group capturing is False.
 
@@ -171,11 +476,147 @@ class RegexString:
             List[Tuple]: a list of (text-matched, start-offset, end-offset)
             triples.
         """
+        automaton = self._get_automaton(case_insensitive)
+        if automaton is not None:
+            return automaton.find_longest(text, self.whole_word)
+
         flags = re.IGNORECASE if case_insensitive else 0
+        flags |= self._ascii_flag(text, flags)
         match_triples = [(m.group(), m.start(), m.end())
-                         for m in re.finditer(self.get_regex_str(), text, flags)]
+                         for m in self.get_compiled(flags).finditer(text)]
         return match_triples
 
+    def iter_match_triples(self, text: str, case_insensitive: bool = False,
+                           start: int = 0, end: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Lazily yield the triples of get_match_triples(), so that matches on
+        a large text can be streamed without holding them all in memory.
+
+        The search can be limited to text[start:end]. As with the pos and
+        endpos arguments of re.Pattern.finditer(), offsets remain relative
+        to text, '\\b' and lookbehinds at start see the characters before it,
+        but '^' does not match at start unless start is 0.
+
+        Args:
+            text (str):
+            case_insensitive (bool, optional): Defaults to False.
+            start (int, optional): Defaults to 0.
+            end (int, optional): Defaults to None, meaning len(text).
+
+        Returns:
+            Iterator[Tuple]: (text-matched, start-offset, end-offset) triples.
+        """
+        if end is None:
+            end = len(text)
+        automaton = self._get_automaton(case_insensitive)
+        if automaton is not None:
+            yield from automaton.iter_longest(text, self.whole_word, start, end)
+            return
+
+        flags = re.IGNORECASE if case_insensitive else 0
+        flags |= self._ascii_flag(text, flags)
+        for m in self.get_compiled(flags).finditer(text, start, end):
+            yield m.group(), m.start(), m.end()
+
+    def _ascii_flag(self, text: str, flags: int) -> int:
+        """
+        Return re.ASCII if this regex can be compiled with it to match text
+        (see the ascii_input argument of __init__()), else 0.
+        """
+        if self.ascii_input is False:
+            return 0
+        compatible = self._ascii_compatible.get(flags)
+        if compatible is None:
+            # re.ASCII is only worth a second compiled pattern if it changes
+            # how the regex is evaluated.
+            compatible = (RegexAnalyzer.uses_unicode_classes(self._regex_str, flags) and
+                          RegexAnalyzer.is_ascii_compatible(self._regex_str, flags),
+                          RegexAnalyzer.uses_space_class(self._regex_str, flags))
+            self._ascii_compatible[flags] = compatible
+        is_compatible, check_spaces = compatible
+        if not is_compatible:
+            return 0
+        if self.ascii_input is None and \
+                (not text.isascii() or check_spaces and any(char in text for char in _UNICODE_ONLY_SPACES)):
+            return 0
+        return re.ASCII
+
+    def _get_automaton(self, case_insensitive: bool) -> Optional[AhoCorasick]:
+        """
+        Return the Aho-Corasick automaton to match with, or None if the
+        regex is to be used.
+        """
+        if self.backend != 'aho_corasick' or self._regex_str is not self._built_regex_str:
+            return None
+        automaton = self._automata.get(case_insensitive)
+        if automaton is None:
+            automaton = AhoCorasick(self.match_strs, case_insensitive)
+            self._automata[case_insensitive] = automaton
+        return automaton
+
+    def get_batch_match_triples(self, texts: Sequence[str],
+                                case_insensitive: bool = False) -> List[List[Tuple]]:
+        """
+        Return the result of get_match_triples() for each of many texts,
+        matching them all in a single engine call: the texts are joined with
+        a separator and the matches are split back by offset. This saves
+        the per-call overhead of get_match_triples() when the texts are
+        short and numerous.
+
+        A text is matched on its own instead if a match in the joined string
+        runs across its boundary, and all texts are matched one at a time if
+        the regex uses anchors or lookarounds, whose results at the edges of
+        a text would change (see RegexAnalyzer.has_context_assertions()).
+
+        Args:
+            texts (Sequence[str]):
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            List[List[Tuple]]: for each text, its (text-matched, start-offset,
+                end-offset) triples, with offsets relative to that text.
+        """
+        flags = re.IGNORECASE if case_insensitive else 0
+        uses_automaton = self._get_automaton(case_insensitive) is not None
+        if len(texts) < 2 or \
+                not uses_automaton and RegexAnalyzer.has_context_assertions(self._regex_str, flags):
+            return [self.get_match_triples(text, case_insensitive) for text in texts]
+
+        text_starts = []
+        pos = 0
+        for text in texts:
+            text_starts.append(pos)
+            pos += len(text) + 1
+        joined = _BATCH_SEPARATOR.join(texts)
+
+        if uses_automaton:
+            matches = iter(self.get_match_triples(joined, case_insensitive))
+        else:
+            flags |= self._ascii_flag(joined, flags)
+            matches = ((m.group(), m.start(), m.end()) for m in self.get_compiled(flags).finditer(joined))
+
+        result: List[List[Tuple]] = [[] for _ in texts]
+        rematch: Set[int] = set()
+        last_idx = len(texts) - 1
+        idx = 0
+        text_start = 0
+        text_end = len(texts[0])
+        for matched, start, end in matches:
+            while idx < last_idx and text_starts[idx + 1] <= start:
+                idx += 1
+                text_start = text_starts[idx]
+                text_end = text_start + len(texts[idx])
+            if end <= text_end:
+                result[idx].append((matched, start - text_start, end - text_start))
+            else:
+                # The match runs into the following texts, and the scan
+                # resumes part-way through one of them.
+                rematch.update(range(idx, bisect_right(text_starts, end)))
+
+        for idx in rematch:
+            result[idx] = self.get_match_triples(texts[idx], case_insensitive)
+        return result
+
     @staticmethod
     def concat(rs1: 'RegexString',
                rs2: 'RegexString',
@@ -210,6 +651,9 @@ class RegexString:
         # its regex_str property.
         result_regex_string = RegexString([''])
         result_regex_string.regex_str = rs1.regex_str + join_str_regex + rs2.regex_str
+        if rs1._atomic_regex_str is not None or rs2._atomic_regex_str is not None:
+            result_regex_string._atomic_regex_str = \
+                rs1._get_atomic_regex_str() + join_str_regex + rs2._get_atomic_regex_str()
 
         if rs2.optional:
             result_regex_string.optional = True
@@ -250,13 +694,6 @@ class RegexString:
         Returns:
             RegexString: the new RegexString
         """
-        # Constants.
-        word_regex = r'\s\S+'
-        ready_for_distance_range_word_regex = r'(?:' + word_regex + ')'
-
-        intervening_punc = r'(?:\b\S+)?'
-        intervening_punc_and_space = intervening_punc + r'\s'
-
         # Check input parameters.
         if not isinstance(rs1, RegexString):
             raise ValueError("rs1 parameter must be a RegexString object.")
@@ -266,6 +703,40 @@ class RegexString:
         if min_nbr_words > max_nbr_words:
             raise ValueError("min_nbr_words cannot be greater than max_nbr_words.")
 
+        # Create an empty/invalid RegexString object, and make it valid by editing
+        # its regex_str property.
+        result_regex_string = RegexString([''])
+        result_regex_string.regex_str = RegexString._join_with_word_distances(
+            rs1, rs1.regex_str, rs2.regex_str, min_nbr_words, max_nbr_words, possessive=False)
+        # Every '\S+' here is followed by '\s', so giving back characters
+        # never helps the match and possessive quantifiers find the same
+        # matches with less backtracking.
+        result_regex_string._atomic_regex_str = RegexString._join_with_word_distances(
+            rs1, rs1._get_atomic_regex_str(), rs2._get_atomic_regex_str(),
+            min_nbr_words, max_nbr_words, possessive=True)
+
+        if rs2.optional:
+            result_regex_string.optional = True
+        else:
+            result_regex_string.optional = False
+
+        return result_regex_string
+
+    @staticmethod
+    def _join_with_word_distances(rs1: 'RegexString', rs1_regex_str: str, rs2_regex_str: str,
+                                  min_nbr_words: int, max_nbr_words: int, possessive: bool) -> str:
+        """
+        Build the regex of concat_with_word_distances() from the regexes of
+        rs1 and rs2, optionally with possessive quantifiers, which only
+        Python 3.11+ supports.
+        """
+        # Constants.
+        word_regex = r'\s\S++' if possessive else r'\s\S+'
+        ready_for_distance_range_word_regex = r'(?:' + word_regex + ')'
+
+        intervening_punc = r'(?:\b\S++)?+' if possessive else r'(?:\b\S+)?'
+        intervening_punc_and_space = intervening_punc + r'\s'
+
         # Set min/max word distance.
         word_distance_regex = '{' + str(min_nbr_words) + ',' + str(max_nbr_words) + '}'
 
@@ -279,39 +750,32 @@ class RegexString:
 
             # (Assuming that it ends in '?'.)
             # Find the left parens which the last '?' pertains to
-            left_paren_idx = rs1.get_regex_str().rfind('(')
+            left_paren_idx = rs1_regex_str.rfind('(')
 
             if min_nbr_words == 0 and max_nbr_words == 0:
-                first_part = rs1.get_regex_str()[0:left_paren_idx] + \
-                            '(?:' + rs1.get_regex_str()[left_paren_idx : ending_paren_pos] + \
+                first_part = rs1_regex_str[0:left_paren_idx] + \
+                            '(?:' + rs1_regex_str[left_paren_idx : ending_paren_pos] + \
                             intervening_punc_and_space + \
                             ')?'
                 join_str_regex = ''
             else:
-                first_part = rs1.get_regex_str()[0:left_paren_idx] + \
-                            '(?:' + rs1.get_regex_str()[left_paren_idx:ending_paren_pos] + \
+                first_part = rs1_regex_str[0:left_paren_idx] + \
+                            '(?:' + rs1_regex_str[left_paren_idx:ending_paren_pos] + \
                             intervening_punc + ')?'
                 join_str_regex = ready_for_distance_range_word_regex + word_distance_regex + r'\s'
         else:
-            first_part = rs1.get_regex_str() + intervening_punc
+            first_part = rs1_regex_str + intervening_punc
 
             if min_nbr_words == 0 and max_nbr_words == 0:
                 join_str_regex = r'\s'
             else:
                 join_str_regex = ready_for_distance_range_word_regex + word_distance_regex + r'\s'
 
+        return first_part + join_str_regex + rs2_regex_str
 
-        # Create an empty/invalid RegexString object, and make it valid by editing
-        # its regex_str property.
-        result_regex_string = RegexString([''])
-        result_regex_string.regex_str = first_part + join_str_regex + rs2.regex_str
-
-        if rs2.optional:
-            result_regex_string.optional = True
-        else:
-            result_regex_string.optional = False
-
-        return result_regex_string
+    def _get_atomic_regex_str(self) -> str:
+        """Return the possessive form of regex_str if there is one, else regex_str."""
+        return self._atomic_regex_str if self._atomic_regex_str is not None else self._regex_str
 
 
     @staticmethod
@@ -397,6 +861,16 @@ class RegexString:
         return final_regex_str
 
 
+    def __getstate__(self):
+        # Pickled patterns would be recompiled when loaded, whether or not
+        # they are used, and the analysis caches are cheap to refill: leave
+        # them out to keep the pickle small. Aho-Corasick automata are kept,
+        # since rebuilding them is what loading a pickle saves.
+        state = self.__dict__.copy()
+        for cache in ('_compiled', '_ascii_compatible', '_required_literals'):
+            state[cache] = {}
+        return state
+
     def __repr__(self):
         return self.regex_str
 
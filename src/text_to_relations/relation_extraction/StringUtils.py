@@ -1,3 +1,5 @@
+import hashlib
+import json
 import re
 
 import unicodedata
@@ -36,3 +38,13 @@ def is_all_word_chars(input_str: str) -> bool:
     if re.match(regex_word_char, input_str):
         return True
     return False
+
+
+def fingerprint(data) -> str:
+    """
+    Return a stable hex digest of JSON-serializable data: the SHA-256 of its
+    JSON form with sorted keys, so equal data gives the same fingerprint in
+    every process and Python version.
+    """
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,98 @@
+"""
+SymbolView: a compact annotation view in which each annotation is a single
+code point, and the chain regexes which match it.
+
+In the annotation view built by ExtractionPhaseABC.build_merged_representation(),
+every annotation is written out in full, e.g.
+<'Token'(text='to', start='95', end='97', kind='word')>, and chain regexes
+scan all of it although they only test annotation types. In a symbol view,
+each annotation is instead the code point of its type (see type_symbol()),
+and a parallel list holds the annotations themselves, so that position i of
+the view stands for the i-th annotation.
+"""
+import re
+from typing import Sequence, Tuple
+
+from text_to_relations.relation_extraction import TypeRegistry
+from text_to_relations.relation_extraction.Annotation import Annotation
+
+# The symbol of type id 0. Symbols start in the Private Use Area, so that
+# they are never surrogates and never special to the regex parser.
+SYMBOL_BASE = 0xE000
+
+
+def type_symbol(type_id: int) -> str:
+    """
+    Return the code point standing for annotations of the given type id
+    (see TypeRegistry) in a symbol view.
+
+    Args:
+        type_id (int):
+
+    Returns:
+        str:
+    """
+    return chr(SYMBOL_BASE + type_id)
+
+
+def build_symbol_view(anns: Sequence[Annotation]) -> str:
+    """
+    Return the symbol view of annotations already merged in document order,
+    e.g. by ExtractionPhaseABC.build_symbol_representation().
+
+    Args:
+        anns (Sequence[Annotation]):
+
+    Returns:
+        str: one code point per annotation.
+    """
+    return ''.join([chr(SYMBOL_BASE + ann.type_id) for ann in anns])
+
+
+def build_type_class(type_name: str) -> str:
+    """
+    Return a regex matching the symbol of every registered type whose name
+    starts with type_name, as the pattern <'type_name[^>]*> of an
+    annotation distance regex does in the full annotation view.
+
+    Args:
+        type_name (str):
+
+    Returns:
+        str: a regex matching one symbol.
+    """
+    symbols = [re.escape(type_symbol(type_id)) for type_id, name in enumerate(TypeRegistry.get_type_names())
+               if name.startswith(type_name)]
+    if not symbols:
+        return '(?!)'
+    if len(symbols) == 1:
+        return symbols[0]
+    return '[' + ''.join(symbols) + ']'
+
+
+def build_annotation_distance_regex(first_type: str, word_distance_range: Tuple[int, int],
+                                    second_type: str) -> str:
+    """
+    The symbol-view counterpart of TokenAnn.build_annotation_distance_regex()
+    with any annotation type allowed in the gap: a symbol of first_type,
+    then as few annotations as the distance range allows, then a symbol of
+    second_type. Because the types are resolved to symbols when the regex
+    is built, build it after the annotations to be matched have been
+    created.
+
+    Args:
+        first_type (str):
+        word_distance_range (Tuple[int, int]): minimum and maximum number
+            of annotations between the two.
+        second_type (str):
+
+    Returns:
+        str: a regular expression
+    """
+    min_ts, max_ts = word_distance_range
+    return (f"(?s){build_type_class(first_type)}.{{{min_ts},{max_ts}}}?"
+            f"{build_type_class(second_type)}")
+
+
+if __name__ == '__main__':
+    pass
@@ -0,0 +1,239 @@
+"""
+TokenPhraseMatcher: matches lists of phrases token by token, as an
+alternative to RegexString in a phase's regex_patterns.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from text_to_relations.relation_extraction import RegexAnalyzer
+from text_to_relations.relation_extraction import SpacyUtils
+from text_to_relations.relation_extraction import StringUtils
+from text_to_relations.relation_extraction.TokenAnn import TokenAnn
+
+# Key marking the end of a phrase in a trie node, and id of the tokens which
+# occur in no phrase; the ids of the other tokens are never negative.
+_END = -1
+_UNKNOWN = -2
+
+
+class TokenPhraseMatcher:
+    """
+    Finds phrases, e.g. 'within the range of', as sequences of whole tokens
+    rather than as characters.
+
+    The phrases are tokenized once, with the tokenizer used for documents,
+    and stored in a trie keyed on token ids interned by this matcher. A
+    document's tokens are looked up in the vocabulary once each, and the
+    trie is then walked from each token position, so the cost of matching
+    depends on the number of tokens, not on the number of phrases. In a
+    phase, the tokens are those already produced for the annotation view
+    (see ExtractionPhaseABC.run_chained_loops()), so matching does not
+    tokenize the document again.
+
+    Matches follow the same rules as RegexString.get_match_triples() with an
+    alternation of the phrases sorted longest first: scanning left to
+    right, the longest phrase starting at each token wins, and matches do
+    not overlap. Because tokens are compared, a phrase matches only whole
+    tokens, whatever whitespace separates them in the document.
+
+    A TokenPhraseMatcher can be used as a value of a phase's regex_patterns
+    wherever a RegexString can, except in concat() and the other RegexString
+    combinators.
+    """
+
+    def __init__(self, phrases: List[str], case_insensitive: bool = False):
+        """
+        Args:
+            phrases (List[str]): the phrases to find.
+            case_insensitive (bool, optional): if True, tokens are compared
+                after lowercasing. Defaults to False.
+
+        Raises:
+            ValueError: if phrases is a string, or a phrase has no tokens.
+        """
+        # If phrases is a string, the user has made an error.
+        if isinstance(phrases, str):
+            raise ValueError("phrases parameter must be a list. You passed in a string.")
+        self.phrases = list(phrases)
+        self.case_insensitive = case_insensitive
+
+        # Token text to token id.
+        self._vocab: Dict[str, int] = {}
+        self._trie: Dict[int, Dict] = {}
+        self._token_phrases: List[Tuple[str, ...]] = []
+        for phrase in self.phrases:
+            tokens = tuple(self._normalize(token) for token in SpacyUtils.tokenize(phrase))
+            if not tokens:
+                raise ValueError(f"Phrase has no tokens: {phrase!r}")
+            self._token_phrases.append(tokens)
+            node = self._trie
+            for token in tokens:
+                token_id = self._vocab.setdefault(token, len(self._vocab))
+                node = node.setdefault(token_id, {})
+            node[_END] = {}
+
+    def _normalize(self, token: str) -> str:
+        return token.lower() if self.case_insensitive else token
+
+    def __repr__(self):
+        return f"TokenPhraseMatcher({self.phrases!r}, case_insensitive={self.case_insensitive})"
+
+    def __eq__(self, other):
+        if type(self) != type(other):
+            return False
+        return self.case_insensitive == other.case_insensitive and \
+            sorted(self._token_phrases) == sorted(other._token_phrases)
+
+    def get_token_ids(self, tokens: Sequence[TokenAnn]) -> List[int]:
+        """
+        Return the id of each token in this matcher's vocabulary, or a
+        negative id for tokens which occur in no phrase.
+
+        Args:
+            tokens (Sequence[TokenAnn]):
+
+        Returns:
+            List[int]:
+        """
+        vocab = self._vocab
+        if self.case_insensitive:
+            return [vocab.get(token.text.lower(), _UNKNOWN) for token in tokens]
+        return [vocab.get(token.text, _UNKNOWN) for token in tokens]
+
+    def iter_token_matches(self, tokens: Sequence[TokenAnn]) -> Iterator[Tuple[int, int]]:
+        """
+        Yield the (first, last + 1) token indexes of each match in tokens.
+
+        Args:
+            tokens (Sequence[TokenAnn]): a document's tokens, in order.
+
+        Returns:
+            Iterator[Tuple[int, int]]:
+        """
+        token_ids = self.get_token_ids(tokens)
+        trie = self._trie
+        nbr_tokens = len(token_ids)
+        # Only the positions of tokens starting some phrase need the trie.
+        last_end = 0
+        for idx in [idx for idx, token_id in enumerate(token_ids) if token_id in trie]:
+            if idx < last_end:
+                continue
+            node = trie[token_ids[idx]]
+            match_end = -1
+            pos = idx + 1
+            while True:
+                if _END in node:
+                    match_end = pos
+                if pos == nbr_tokens:
+                    break
+                next_node = node.get(token_ids[pos])
+                if next_node is None:
+                    break
+                node = next_node
+                pos += 1
+            if match_end > 0:
+                yield idx, match_end
+                last_end = match_end
+
+    def get_match_triples(self, text: str, case_insensitive: bool = False,
+                          tokens: Optional[Sequence[TokenAnn]] = None) -> List[Tuple]:
+        """
+        Return the matches in text, like RegexString.get_match_triples().
+
+        Args:
+            text (str):
+            case_insensitive (bool, optional): must match the
+                case_insensitive setting of this matcher, which is fixed
+                when the phrases are indexed. Defaults to False.
+            tokens (Sequence[TokenAnn], optional): the tokens of text, as
+                produced by TokenAnn.get_token_objects(text, 0). Defaults to
+                None, meaning text is tokenized here.
+
+        Raises:
+            ValueError: if case_insensitive is True but this matcher is
+                case-sensitive.
+
+        Returns:
+            List[Tuple]: (text-matched, start-offset, end-offset) triples.
+        """
+        return list(self.iter_match_triples(text, case_insensitive, tokens=tokens))
+
+    def iter_match_triples(self, text: str, case_insensitive: bool = False,
+                           start: int = 0, end: Optional[int] = None,
+                           tokens: Optional[Sequence[TokenAnn]] = None) -> Iterator[Tuple]:
+        """
+        Lazily yield the triples of get_match_triples(), optionally only
+        for the matches lying entirely within text[start:end].
+
+        Args:
+            text (str):
+            case_insensitive (bool, optional): Defaults to False.
+            start (int, optional): Defaults to 0.
+            end (int, optional): Defaults to None, meaning len(text).
+            tokens (Sequence[TokenAnn], optional): Defaults to None.
+
+        Raises:
+            ValueError: if case_insensitive is True but this matcher is
+                case-sensitive.
+
+        Returns:
+            Iterator[Tuple]:
+        """
+        if case_insensitive and not self.case_insensitive:
+            raise ValueError("This TokenPhraseMatcher is case-sensitive; "
+                             "build it with case_insensitive=True instead.")
+        if tokens is None:
+            tokens = TokenAnn.get_token_objects(text.rstrip(), 0)
+        if end is None:
+            end = len(text)
+        if start > 0 or end < len(text):
+            tokens = [token for token in tokens if token.start_offset >= start and token.end_offset <= end]
+        for first, last in self.iter_token_matches(tokens):
+            match_start = tokens[first].start_offset
+            match_end = tokens[last - 1].end_offset
+            yield text[match_start:match_end], match_start, match_end
+
+    def could_match(self, text: str, case_insensitive: bool = False) -> bool:
+        """
+        A cheap prefilter, like RegexString.could_match(): return False if
+        text contains none of the phrases' first tokens.
+
+        Args:
+            text (str):
+            case_insensitive (bool, optional): Defaults to False.
+
+        Returns:
+            bool:
+        """
+        if self.case_insensitive or case_insensitive:
+            text = RegexAnalyzer.fold_case(text)
+            return any(RegexAnalyzer.fold_case(tokens[0]) in text for tokens in self._token_phrases)
+        return any(tokens[0] in text for tokens in self._token_phrases)
+
+    def get_backtracking_risks(self, case_insensitive: bool = False) -> List[RegexAnalyzer.BacktrackingRisk]:
+        """
+        Return [], for compatibility with RegexString: no regex is run.
+
+        Args:
+            case_insensitive (bool, optional): unused; accepted so that the
+                signature matches RegexString.get_backtracking_risks().
+                Defaults to False.
+
+        Returns:
+            List[RegexAnalyzer.BacktrackingRisk]:
+        """
+        return []
+
+    def get_fingerprint(self, case_insensitive: bool = False) -> str:
+        """
+        Return a stable hex digest of the tokenized phrases and the case
+        sensitivity, like RegexString.get_fingerprint().
+
+        Returns:
+            str:
+        """
+        return StringUtils.fingerprint({'token_phrases': sorted(list(tokens) for tokens in self._token_phrases),
+                                        'case_insensitive': self.case_insensitive or case_insensitive})
+
+
+if __name__ == '__main__':
+    pass
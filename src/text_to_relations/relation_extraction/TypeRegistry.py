@@ -0,0 +1,104 @@
+"""
+Process-wide registry mapping annotation type names ('Token', 'Number',
+'StampID', ...) to small integer ids.
+
+Annotations compare type ids rather than type name strings, columnar
+structures such as AnnotationSet store them compactly, and the symbol view
+(see SymbolView) encodes them as code points. Chain regexes over the full
+annotation view still match type names, by prefix. Type names remain the
+public interface: ids are assigned in order of first use and are only
+meaningful within one process, so anything persisted or sent to another
+process must carry type names.
+"""
+import sys
+import threading
+from typing import Dict, List, Optional
+
+_ids_by_name: Dict[str, int] = {}
+_names: List[str] = []
+_lock = threading.Lock()
+
+
+def get_type_id(type_name: str) -> int:
+    """
+    Return the id for the given annotation type name, registering the
+    name if it has not been seen before.
+
+    Args:
+        type_name (str):
+
+    Returns:
+        int:
+    """
+    type_id = _ids_by_name.get(type_name)
+    if type_id is None:
+        with _lock:
+            type_id = _ids_by_name.get(type_name)
+            if type_id is None:
+                type_id = len(_names)
+                interned_name = sys.intern(type_name)
+                _names.append(interned_name)
+                _ids_by_name[interned_name] = type_id
+    return type_id
+
+
+def lookup_type_id(type_name: str) -> Optional[int]:
+    """
+    Return the id for the given annotation type name, or None if no
+    annotation of that type has been created. Unlike get_type_id(), this
+    never registers a new name.
+
+    Args:
+        type_name (str):
+
+    Returns:
+        Optional[int]:
+    """
+    return _ids_by_name.get(type_name)
+
+
+def get_type_name(type_id: int) -> str:
+    """
+    Return the annotation type name registered under the given id.
+
+    Args:
+        type_id (int):
+
+    Raises:
+        ValueError: if no type name has been registered under type_id.
+
+    Returns:
+        str:
+    """
+    if type_id < 0 or type_id >= len(_names):
+        raise ValueError(f"Unknown annotation type id: {type_id}")
+    return _names[type_id]
+
+
+def get_nbr_types() -> int:
+    """
+    Return the number of registered type names: type ids run from 0 up to,
+    but excluding, this number.
+
+    Returns:
+        int:
+    """
+    return len(_names)
+
+
+def get_type_names() -> List[str]:
+    """
+    Return all registered type names, indexed by type id.
+
+    Returns:
+        List[str]:
+    """
+    return list(_names)
+
+
+# The type of the annotations created for every token of a document.
+TOKEN_TYPE_ID = get_type_id('Token')
+
+
+if __name__ == '__main__':
+    pass
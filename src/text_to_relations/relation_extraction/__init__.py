@@ -1,13 +1,18 @@
 """Public API for the relation_extraction subpackage."""
 from text_to_relations.relation_extraction.RegexString import RegexString
 from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.AnnotationSet import AnnotationSet
 from text_to_relations.relation_extraction.TokenAnn import TokenAnn
+from text_to_relations.relation_extraction.TokenPhraseMatcher import TokenPhraseMatcher
 from text_to_relations.relation_extraction.SentenceAnn import SentenceAnn
 from text_to_relations.relation_extraction.ExtractionPhaseABC import (
     ExtractionPhaseABC, SimpleExtractionPhase, ChainLink
 )
+from text_to_relations.relation_extraction.MatchBudget import MatchBudget, BudgetExceededError
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
 
 __all__ = [
-    "RegexString", "Annotation", "TokenAnn", "SentenceAnn",
+    "RegexString", "TokenPhraseMatcher", "Annotation", "AnnotationSet", "TokenAnn", "SentenceAnn",
     "ExtractionPhaseABC", "SimpleExtractionPhase", "ChainLink",
+    "MatchBudget", "BudgetExceededError", "PhaseProfiler",
 ]
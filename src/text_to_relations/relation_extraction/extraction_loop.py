@@ -8,11 +8,18 @@ an annotation-view string to produce relation Annotations.
 Most callers should use ExtractionPhaseABC and its run_chained_loops()
 method rather than calling these directly.
 """
+import heapq
 import re
-from typing import List, Union, Tuple, Dict, Callable, Optional
+import time
+from operator import attrgetter
+from typing import List, Union, Tuple, Dict, Callable, Iterable, Iterator, Optional
 from text_to_relations.relation_extraction.RegexString import RegexString
 from text_to_relations.relation_extraction.Annotation import Annotation
 from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC
+from text_to_relations.relation_extraction.MatchBudget import MatchBudget
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
+from text_to_relations.relation_extraction.TokenAnn import TokenAnn
+from text_to_relations.relation_extraction.TokenPhraseMatcher import TokenPhraseMatcher
 
 
 class ExtractionLoop():
@@ -70,6 +77,27 @@ class ExtractionLoop():
         self.verbose = verbose  # Currently unused.
 
 
+def _check_loop_list(loop_list: List[ExtractionLoop]):
+    # Check loop_list to verify that only the last item has a non-None
+    # determine_new_annotation_properties function.
+    last_idx = len(loop_list) - 1
+    for idx, loop in enumerate(loop_list):
+        if loop.determine_new_annotation_properties:
+            if idx < last_idx:
+                msg = "Only last element of loop_list parameter can have "
+                msg += "a non-None determine_new_annotation_properties "
+                msg += f"attribute. Loop at index {idx} has "
+                msg += f"{loop.determine_new_annotation_properties}() function."
+                raise ValueError(msg)
+        else:
+            if idx == last_idx:
+                msg = "The last element of loop_list parameter must have "
+                msg += "a non-None determine_new_annotation_properties "
+                msg += f"attribute. Loop at index {idx} has "
+                msg += f"{loop.determine_new_annotation_properties}() function."
+                raise ValueError(msg)
+
+
 def run_loop(annotation_view_str: str,
              doc: str,
              relation_name: str,
@@ -78,7 +106,9 @@ def run_loop(annotation_view_str: str,
              loop_list: List[ExtractionLoop],
              match_triples_list: List[Tuple],
              new_annotations: List[Annotation],
-             verbose: bool=False) -> Union[List[Annotation], Annotation, None]:
+             verbose: bool=False,
+             budget: Optional[MatchBudget]=None,
+             profiler: Optional[PhaseProfiler]=None) -> Union[List[Annotation], Annotation, None]:
     """
     Recursively execute a chain of ExtractionLoop objects against the
     annotation-view string, accumulating result Annotations.
@@ -106,9 +136,17 @@ def run_loop(annotation_view_str: str,
             loop's search, the annotation types found, matches attempted,
             backtracking steps, and final outcome. See DEVELOPING.md for a
             guide to reading the trace. Defaults to False.
+        budget (MatchBudget, optional): checked before each loop's search
+            and each match tried (see MatchBudget.check()). Relations
+            completed before the budget runs out are in new_annotations.
+            Defaults to None.
+        profiler (PhaseProfiler, optional): records the time spent and
+            matches found by each loop's regex, under
+            PhaseProfiler.chain_stage(). Defaults to None.
 
     Raises:
         ValueError: For invalid input or unexpected results.
+        BudgetExceededError: if budget runs out.
     Returns:
         Union[List[Annotation], Annotation, None]: A new match found or [] or None.
     """
@@ -124,24 +162,7 @@ def run_loop(annotation_view_str: str,
             header = f"→{curr_loop.last_ann_str}"
         print(f"\n{indent}Loop {loop_idx} [{header}] — {types_str}")
 
-    # Check loop_list to verify that only the last item has a non-None
-    # determine_new_annotation_properties function.
-    last_idx = len(loop_list) - 1
-    for idx, loop in enumerate(loop_list):
-        if loop.determine_new_annotation_properties:
-            if idx < last_idx:
-                msg = "Only last element of loop_list parameter can have "
-                msg += "a non-None determine_new_annotation_properties "
-                msg += f"attribute. Loop at index {idx} has "
-                msg += f"{loop.determine_new_annotation_properties}() function."
-                raise ValueError(msg)
-        else:
-            if idx == last_idx:
-                msg = "The last element of loop_list parameter must have "
-                msg += "a non-None determine_new_annotation_properties "
-                msg += f"attribute. Loop at index {idx} has "
-                msg += f"{loop.determine_new_annotation_properties}() function."
-                raise ValueError(msg)
+    _check_loop_list(loop_list)
 
     # Recursive functionality begins here.
 
@@ -151,14 +172,23 @@ def run_loop(annotation_view_str: str,
     # annotation where the previous loop ended. Requiring m.start() == 0 ensures
     # the next loop's match begins at that same annotation, not a later one of the
     # same type that happens to be closer to the chain's final target.
+    if budget is not None:
+        budget.check()
+    if profiler is not None:
+        start_time = time.perf_counter()
     all_matches = re.finditer(curr_loop.regex_str, annotation_view_str)
     if loop_idx == 0:
         match_triples = [(m.group(), m.start(), m.end()) for m in all_matches]
     else:
         match_triples = [(m.group(), m.start(), m.end()) for m in all_matches
                          if m.start() == 0]
+    if profiler is not None:
+        profiler.record(PhaseProfiler.chain_stage(loop_idx, str(curr_loop.start_ann_str), curr_loop.last_ann_str),
+                        time.perf_counter() - start_time, len(match_triples))
 
     for triple in match_triples:
+        if budget is not None:
+            budget.check()
         match_triples_list.append(triple)
         if verbose:
             match_types = re.findall(r"<'([^']+)", triple[0])
@@ -171,9 +201,8 @@ def run_loop(annotation_view_str: str,
             m_last_anns = ExtractionPhaseABC.merged_representation_to_annotations(
                 match_triples_list[-1][0])
             end = m_last_anns[-1].end_offset
-            substr = doc[start:end]
             properties = curr_loop.determine_new_annotation_properties(match_triples_list)
-            result = Annotation(relation_name, substr, start, end, properties)
+            result = Annotation.from_doc(relation_name, doc, start, end, properties)
             if verbose:
                 print(f"{indent}  SUCCESS → {result}")
             return result
@@ -194,7 +223,9 @@ def run_loop(annotation_view_str: str,
                             loop_list=loop_list,
                             match_triples_list=match_triples_list,
                             new_annotations=new_annotations,
-                            verbose=verbose)
+                            verbose=verbose,
+                            budget=budget,
+                            profiler=profiler)
         if recursive_result is None or recursive_result == []:
             if verbose:
                 print(f"{indent}  ^ backtracking")
@@ -219,34 +250,261 @@ def run_loop(annotation_view_str: str,
         print(f"{indent}  NO MATCH")
     return new_annotations if loop_idx == 0 else []
 
+
+def run_symbol_loop(symbol_view_str: str,
+                    view_anns: List[Annotation],
+                    view_pos: int,
+                    doc: str,
+                    relation_name: str,
+                    curr_loop: ExtractionLoop,
+                    loop_idx: int,
+                    loop_list: List[ExtractionLoop],
+                    match_triples_list: List[Tuple],
+                    new_annotations: List[Annotation],
+                    verbose: bool=False,
+                    budget: Optional[MatchBudget]=None,
+                    profiler: Optional[PhaseProfiler]=None) -> Union[List[Annotation], Annotation, None]:
+    """
+    run_loop() for the symbol view of a document (see SymbolView), whose
+    loops' regexes were built with SymbolView.build_annotation_distance_regex().
+    It finds the same relations as run_loop() on the full annotation view.
+
+    Rather than slicing the view, each recursive call matches its loop's
+    regex at view_pos, the position of the annotation where the previous
+    loop ended. The match triples hold view positions; those passed to
+    determine_new_annotation_properties() hold the matched annotations
+    written out as in the full annotation view, as run_loop() passes them.
+
+    Args:
+        symbol_view_str (str): symbol view of the input document, as produced
+            by ExtractionPhaseABC.build_symbol_representation().
+        view_anns (List[Annotation]): the annotation at each position of
+            symbol_view_str.
+        view_pos (int): position in symbol_view_str where matching starts.
+        doc (str): the text as an ordinary string.
+        relation_name (str): See run_loop().
+        curr_loop (ExtractionLoop): loop being processed
+        loop_idx (int): index into loop_list indicating which loop is currently being processed
+        loop_list (List[ExtractionLoop]): all the loops which have been set up
+        match_triples_list (List[Tuple]): matches found thus far for the loops processed
+            thus far
+        new_annotations (List[Tuple]): matches successfully found thus far
+        verbose (bool, optional): See run_loop(). Defaults to False.
+        budget (MatchBudget, optional): See run_loop(). Defaults to None.
+        profiler (PhaseProfiler, optional): See run_loop(). Defaults to None.
+
+    Raises:
+        ValueError: For invalid input or unexpected results.
+        BudgetExceededError: if budget runs out.
+    Returns:
+        Union[List[Annotation], Annotation, None]: A new match found or [] or None.
+    """
+    indent = "  " * loop_idx
+
+    if verbose:
+        types = [ann.type for ann in view_anns[view_pos:view_pos + 21]]
+        types_str = "[" + ", ".join(types[:20]) + (", ..." if len(types) > 20 else "") + "]"
+        header = (f"{curr_loop.start_ann_str}→{curr_loop.last_ann_str}, "
+                  f"tokens={curr_loop.min_distance}..{curr_loop.max_distance}")
+        print(f"\n{indent}Loop {loop_idx} [{header}] — {types_str}")
+
+    _check_loop_list(loop_list)
+
+    if budget is not None:
+        budget.check()
+    if profiler is not None:
+        start_time = time.perf_counter()
+    pattern = re.compile(curr_loop.regex_str)
+    if loop_idx == 0:
+        match_triples = [(m.group(), m.start(), m.end()) for m in pattern.finditer(symbol_view_str)]
+    else:
+        # The match must begin at the annotation where the previous loop
+        # ended; see run_loop().
+        match = pattern.match(symbol_view_str, view_pos)
+        match_triples = [] if match is None else [(match.group(), match.start(), match.end())]
+    if profiler is not None:
+        profiler.record(PhaseProfiler.chain_stage(loop_idx, str(curr_loop.start_ann_str), curr_loop.last_ann_str),
+                        time.perf_counter() - start_time, len(match_triples))
+
+    for triple in match_triples:
+        if budget is not None:
+            budget.check()
+        match_triples_list.append(triple)
+        if verbose:
+            match_types = [ann.type for ann in view_anns[triple[1]:triple[2]]]
+            print(f"{indent}  match: {match_types}")
+
+        if curr_loop.determine_new_annotation_properties:
+            start = view_anns[match_triples_list[0][1]].start_offset
+            end = view_anns[match_triples_list[-1][2] - 1].end_offset
+            rendered_triples = [(''.join([str(ann) for ann in view_anns[m_start:m_end]]), m_start, m_end)
+                                for _, m_start, m_end in match_triples_list]
+            properties = curr_loop.determine_new_annotation_properties(rendered_triples)
+            result = Annotation.from_doc(relation_name, doc, start, end, properties)
+            if verbose:
+                print(f"{indent}  SUCCESS → {result}")
+            return result
+
+        new_idx = loop_idx + 1
+        next_loop = loop_list[new_idx]
+
+        # The regex ends with the annotation of type last_ann_str.
+        recursive_result = run_symbol_loop(symbol_view_str=symbol_view_str,
+                                           view_anns=view_anns,
+                                           view_pos=triple[2] - 1,
+                                           doc=doc,
+                                           relation_name=relation_name,
+                                           curr_loop=next_loop,
+                                           loop_idx=new_idx,
+                                           loop_list=loop_list,
+                                           match_triples_list=match_triples_list,
+                                           new_annotations=new_annotations,
+                                           verbose=verbose,
+                                           budget=budget,
+                                           profiler=profiler)
+        if recursive_result is None or recursive_result == []:
+            if verbose:
+                print(f"{indent}  ^ backtracking")
+            del match_triples_list[-1]
+            continue
+        if isinstance(recursive_result, Annotation):
+            if loop_idx == 0:
+                new_annotations.append(recursive_result)
+                # As in run_loop(): the next relation starts a new list.
+                match_triples_list = []
+                continue
+            return recursive_result
+        raise ValueError(f"Unexpected result: {recursive_result}")
+
+    if verbose and (loop_idx > 0 or not new_annotations):
+        print(f"{indent}  NO MATCH")
+    return new_annotations if loop_idx == 0 else []
+
+# Sort key shared with Annotation.sort(): starting offset, then ending offset.
+_annotation_offsets = attrgetter('start_offset', 'end_offset')
+
+
+def _triples_to_annotations(ann_type: str, triples: Iterable[Tuple], text: str,
+                            budget: Optional[MatchBudget] = None) -> Iterator[Annotation]:
+    for triple in triples:
+        if budget is not None:
+            budget.check()
+        yield Annotation.from_doc(ann_type, text, triple[1], triple[2])
+
+
+def iter_sorted_annotations_for_matching(text: str,
+                                         regex_strs: Dict[str, Union[RegexString, TokenPhraseMatcher]],
+                                         given_anns: List[Annotation],
+                                         budget: Optional[MatchBudget] = None,
+                                         profiler: Optional[PhaseProfiler] = None,
+                                         tokens: Optional[List[TokenAnn]] = None) -> Iterator[Annotation]:
+    """
+    Lazily yield the annotations for the next matching phase in offset order.
+
+    Each RegexString's matches are already in offset order, so rather than
+    concatenating and re-sorting everything, the per-pattern streams (see
+    RegexString.iter_match_triples()) and the given annotations are combined
+    with a k-way heap merge: O(n log k) for n
+    annotations from k sources. Ties are broken in the same order as
+    Annotation.sort() would break them on given_anns followed by each
+    pattern's matches in regex_strs order.
+
+    Args:
+        text (str): the text being processed
+        regex_strs (Dict[str, Union[RegexString, TokenPhraseMatcher]]): Dict
+            whose key is the name of an annotation and whose value is a new
+            RegexString or TokenPhraseMatcher needed for the next phase of
+            matching.
+        given_anns (List[Annotation]): List of annotations created before this
+            phase began but needed by the phase. Need not be sorted, but
+            sorting is O(n) when it already is. The list is not modified.
+        budget (MatchBudget, optional): checked once per pattern match
+            (see MatchBudget.check()). Defaults to None.
+        profiler (PhaseProfiler, optional): records the time spent finding
+            each RegexString's matches, under PhaseProfiler.pattern_stage().
+            Defaults to None.
+        tokens (List[TokenAnn], optional): the tokens of text, as produced by
+            TokenAnn.get_token_objects(text.rstrip(), 0), for the
+            TokenPhraseMatchers to match. Defaults to None, meaning each
+            TokenPhraseMatcher tokenizes text itself.
+
+    Raises:
+        BudgetExceededError: if budget runs out.
+
+    Returns:
+        Iterator[Annotation]:
+    """
+    def _iter_triples(key):
+        pattern = regex_strs[key]
+        if isinstance(pattern, TokenPhraseMatcher):
+            triples = pattern.iter_match_triples(text, tokens=tokens)
+        else:
+            triples = pattern.iter_match_triples(text)
+        if profiler is not None:
+            return profiler.iter_timed(PhaseProfiler.pattern_stage(key), triples)
+        return triples
+
+    streams: List[Iterable[Annotation]] = [Annotation.sort(given_anns)]
+    for key in regex_strs:
+        streams.append(_triples_to_annotations(key, _iter_triples(key), text, budget))
+
+    return heapq.merge(*streams, key=_annotation_offsets)
+
+
 def get_sorted_annotations_for_matching(text: str,
-                                        regex_strs: Dict[str, RegexString],
-                                        given_anns: List[Annotation]) -> List[Annotation]:
+                                        regex_strs: Dict[str, Union[RegexString, TokenPhraseMatcher]],
+                                        given_anns: List[Annotation],
+                                        overlap_strategy: Optional[str] = None,
+                                        type_priority: Optional[List[str]] = None,
+                                        deduplicate: Optional[str] = None,
+                                        budget: Optional[MatchBudget] = None,
+                                        profiler: Optional[PhaseProfiler] = None,
+                                        tokens: Optional[List[TokenAnn]] = None
+                                        ) -> List[Annotation]:
     """
     Return a sorted list of annotations for the next matching phase.
+    See iter_sorted_annotations_for_matching() for how the list is built.
+
+    Overlapping annotations, e.g. from two patterns matching the same words
+    or from a pattern and an external NER tool, cannot all be merged into
+    the annotation view. If overlap_strategy is given, they are resolved here
+    with Annotation.resolve_overlaps(); otherwise they are returned as is.
+    Likewise, if deduplicate is given, annotations of the same type on the
+    same span are first reduced to one with Annotation.deduplicate().
 
     Args:
         text (str): the text being processed
-        regex_strs (Dict[str, RegexString]): Dict whose key is the name of an
-            annotation and whose value is a new RegexString needed for
-            the next phase of matching. The RegexStrings create new annotations
-            needed for this phase only.
+        regex_strs (Dict[str, Union[RegexString, TokenPhraseMatcher]]): Dict
+            whose key is the name of an annotation and whose value is a new
+            RegexString or TokenPhraseMatcher needed for the next phase of
+            matching. They create new annotations needed for this phase only.
         given_anns (List[Annotation]): List of annotations created before this
-            phase began but needed by the phase.
+            phase began but needed by the phase. The list is not modified.
+        overlap_strategy (str, optional): one of Annotation.OVERLAP_STRATEGIES.
+            Defaults to None, meaning overlaps are not resolved.
+        type_priority (List[str], optional): annotation type names, highest
+            priority first, for the 'priority' overlap strategy.
+        deduplicate (str, optional): one of Annotation.DEDUPLICATE_MODES,
+            determining how the properties of duplicates are handled.
+            Defaults to None, meaning duplicates are kept.
+        budget (MatchBudget, optional): See
+            iter_sorted_annotations_for_matching(). Defaults to None.
+        profiler (PhaseProfiler, optional): See
+            iter_sorted_annotations_for_matching(). Defaults to None.
+        tokens (List[TokenAnn], optional): See
+            iter_sorted_annotations_for_matching(). Defaults to None.
+
+    Raises:
+        BudgetExceededError: if budget runs out.
 
     Returns:
         List[Annotation]: List of all the annotations needed for this phase, sorted
             by offset.
     """
-    anns = given_anns
-
-    for key in regex_strs.keys():
-        regex_str = regex_strs[key]
-        triples = regex_str.get_match_triples(text)
-        for triple in triples:
-            ann = Annotation(key, triple[0], triple[1], triple[2])
-            anns.append(ann)
-
-    anns = Annotation.sort(anns)
-
+    anns = list(iter_sorted_annotations_for_matching(text, regex_strs, given_anns, budget,
+                                                     profiler, tokens))
+    if deduplicate is not None:
+        anns = Annotation.deduplicate(anns, deduplicate)
+    if overlap_strategy is not None:
+        anns = Annotation.resolve_overlaps(anns, overlap_strategy, type_priority)
     return anns
@@ -0,0 +1,44 @@
+import re
+import unittest
+
+from text_to_relations.relation_extraction.AhoCorasick import AhoCorasick
+
+
+class TestAhoCorasick(unittest.TestCase):
+
+    def testFindAll(self):
+        automaton = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual([(1, 4), (2, 4), (2, 6)], automaton.find_all('ushers'))
+        self.assertEqual([], automaton.find_all(''))
+        self.assertEqual([], automaton.find_all('xyz'))
+
+    def testFindLongest(self):
+        automaton = AhoCorasick(['New', 'New York', 'York', 'ork'])
+        self.assertEqual([('New York', 0, 8), ('York', 13, 17)],
+                         automaton.find_longest('New York and York'))
+        self.assertEqual([('New', 0, 3), ('ork', 5, 8)], automaton.find_longest('New Nork'))
+
+    def testWholeWord(self):
+        automaton = AhoCorasick(['red', 'red wine', 'wine'])
+        text = 'red wines and red wine, not bored'
+        self.assertEqual([('red', 0, 3), ('red wine', 14, 22)], automaton.find_longest(text, whole_word=True))
+        self.assertEqual([('red wine', 0, 8), ('red wine', 14, 22), ('red', 30, 33)],
+                         automaton.find_longest(text))
+
+    def testCaseInsensitive(self):
+        automaton = AhoCorasick(['Type', 'type I'], case_insensitive=True)
+        self.assertEqual([('TYPE I', 0, 6), ('type', 8, 12)], automaton.find_longest('TYPE I, type V'))
+        self.assertEqual([], AhoCorasick(['Type']).find_longest('TYPE'))
+
+    def testCaseInsensitiveLikeRegex(self):
+        # Case is folded as re.IGNORECASE folds it, not just lowercased.
+        terms = ['ς', 'sun', 'µm', 'İstanbul', 'Straße']
+        text = 'Σ σ ς ſun SUN ſUN μm ΜM istanbul İSTANBUL STRASSE straße'
+        regex = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.I)
+        expected = [(m.group(), m.start(), m.end()) for m in regex.finditer(text)]
+        self.assertEqual(expected, AhoCorasick(terms, case_insensitive=True).find_longest(text))
+        self.assertEqual(11, len(expected))
+
+    def testEmptyTerm(self):
+        with self.assertRaises(ValueError):
+            AhoCorasick(['a', ''])
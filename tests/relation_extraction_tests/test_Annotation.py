@@ -1,6 +1,10 @@
+import pickle
+import random
 import unittest
 
+from text_to_relations.relation_extraction import TypeRegistry
 from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC
 from text_to_relations.relation_extraction.SentenceAnn import SentenceAnn
 from text_to_relations.relation_extraction.TokenAnn import TokenAnn
 
@@ -62,7 +66,8 @@ class TestAnnotation(unittest.TestCase):
     def testAnnotationReprWithListProperty(self):
         features = {'items': ['a', 'b', 'c']}
         ann = Annotation('FreakyThing', 'freak out!', 0, 16, features)
-        expected = "<'FreakyThing'(text='freak out!', start='0', end='16', items='['a', 'b', 'c']')>"
+        expected = "<'FreakyThing'(text='freak out!', start='0', end='16', " \
+                   "items='[\\'a\\', \\'b\\', \\'c\\']')>"
         self.assertEqual(expected, str(ann))
 
     def testEncloses(self):
@@ -139,3 +144,245 @@ class TestAnnotation(unittest.TestCase):
                                         [myVultureAnn, sharesAnn, crossesSentenceBoundariesAnn, entireDocAnn])
         expected = []
         self.assertEqual(expected, actual)
+
+    def testGetEnclosedPairs(self):
+        sent1 = Annotation('Sentence', 'x' * 20, 0, 20)
+        sent2 = Annotation('Sentence', 'x' * 19, 21, 40)
+        crossesSentences = Annotation('MyAnn', 'x' * 6, 18, 24)
+        tok1 = Annotation('Token', 'xxxx', 0, 4)
+        tok2 = Annotation('Token', 'xxxx', 16, 20)
+        tok3 = Annotation('Token', 'xxxx', 21, 25)
+        tok4 = Annotation('Token', 'xxxx', 36, 40)
+
+        containers = Annotation.sort([sent2, sent1])
+        tokens = Annotation.sort([tok4, crossesSentences, tok3, tok2, tok1])
+
+        actual = Annotation.get_enclosed_pairs(containers, tokens)
+        expected = [(sent1, tok1), (sent1, tok2), (sent2, tok3), (sent2, tok4)]
+        self.assertEqual(expected, actual)
+
+        # Results agree with calling get_enclosed() once per container.
+        brute_force = [(container, ann) for container in containers
+                       for ann in Annotation.get_enclosed(container, tokens)]
+        self.assertEqual(sorted(brute_force, key=lambda p: (p[1].start_offset, p[0].start_offset)),
+                         actual)
+
+    def testGetEnclosedPairsNestedContainers(self):
+        outer = Annotation('Relation', 'x' * 30, 0, 30)
+        inner = Annotation('Phrase', 'x' * 10, 5, 15)
+        tok1 = Annotation('Token', 'xxx', 6, 9)
+        tok2 = Annotation('Token', 'xxx', 20, 23)
+
+        actual = Annotation.get_enclosed_pairs([outer, inner], [tok1, tok2])
+        expected = [(outer, tok1), (inner, tok1), (outer, tok2)]
+        self.assertEqual(expected, actual)
+
+        self.assertEqual([], Annotation.get_enclosed_pairs([], [tok1, tok2]))
+        self.assertEqual([], Annotation.get_enclosed_pairs([outer, inner], []))
+
+    def testStringToAnnotationQuoteSafe(self):
+        # Text containing quotes, backslashes and angle brackets round-trips through __repr__.
+        texts = ["it's", "'quoted'", '"double"', 'a\\b', 'x<y>z', "end\\", "\\'", "<'Token'(text='a')>"]
+        for text in texts:
+            ann = Annotation('Token', text, 0, len(text))
+            self.assertEqual(ann, Annotation.str_to_annotation(str(ann)))
+
+        ann = Annotation('Token', "it's", 0, 4, {'kind': 'other'})
+        self.assertEqual("<'Token'(text='it\\'s', start='0', end='4', kind='other')>", str(ann))
+        self.assertEqual(Annotation('Token', "it's", 0, 4), Annotation.str_to_annotation(str(ann)))
+
+        ann = Annotation('Token', '>', 7, 8)
+        self.assertEqual("<'Token'(text='\\x3e', start='7', end='8')>", str(ann))
+
+    def testStringToAnnotationPropertyValues(self):
+        # Property values containing quotes, backslashes and angle brackets are
+        # escaped too, so they neither break parsing nor the merged representation.
+        values = ["it's", 'x<y>z', "<'Token'(text='a')>", 'a\\b', ['a', "b'"]]
+        for value in values:
+            ann = Annotation('Thing', 'some text', 3, 12, {'prop': value, 'kind': 'word'})
+            rep = str(ann)
+            self.assertEqual(1, rep.count('<'))
+            self.assertEqual(1, rep.count('>'))
+            self.assertEqual(Annotation('Thing', 'some text', 3, 12), Annotation.str_to_annotation(rep))
+            # The escaped value decodes back to the original, as text does.
+            escaped = rep[rep.index("prop='") + len("prop='"):rep.index("', kind=")]
+            decoded = Annotation.str_to_annotation(f"<'Thing'(text='{escaped}', start='0', end='1')>")
+            self.assertEqual(str(value), decoded.text)
+
+            other = Annotation('Token', 'next', 13, 17)
+            anns = ExtractionPhaseABC.merged_representation_to_annotations(rep + str(other))
+            self.assertEqual([Annotation('Thing', 'some text', 3, 12), other], anns)
+
+    def testStringToAnnotationForms(self):
+        expected = Annotation('ShareQuantity', '15,000,000', 0, 10)
+
+        annStr = '<"ShareQuantity"(text="15,000,000", start="0", end="10")>'
+        self.assertEqual(expected, Annotation.str_to_annotation(annStr))
+
+        annStr = "<'ShareQuantity'(start='0', end='10', text='15,000,000')>"
+        self.assertEqual(expected, Annotation.str_to_annotation(annStr))
+
+        # Properties, even those containing quotes, are ignored.
+        annStr = "<'ShareQuantity'(text='15,000,000', start='0', end='10', items='['a', 'b']')>"
+        self.assertEqual(expected, Annotation.str_to_annotation(annStr))
+
+        for annStr in ['', 'ShareQuantity', "<'ShareQuantity'>", "<'ShareQuantity'(text='15,000,000')>",
+                       "<'ShareQuantity'(text='15,000,000, start='0', end='10')>"]:
+            with self.assertRaises(ValueError):
+                Annotation.str_to_annotation(annStr)
+
+    def testLazyText(self):
+        doc = "He weighed\n between   170 and 220 pounds. "
+        ann = Annotation.from_doc('Range', doc, 0, 42)
+        # The text is normalized exactly as for an eagerly-created annotation.
+        self.assertEqual(Annotation('Range', doc, 0, 42), ann)
+        self.assertEqual('He weighed between 170 and 220 pounds.', ann.text)
+        # Once computed, the text is cached and the document reference released.
+        self.assertIsNone(ann._doc)
+
+        ann = Annotation.from_doc('Number', doc, 22, 25, {'kind': 'int'})
+        self.assertEqual("<'Number'(text='170', start='22', end='25', kind='int')>", str(ann))
+
+        ann = Annotation.from_doc('Number', doc, 22, 25)
+        ann.text = 'one hundred seventy'
+        self.assertEqual('one hundred seventy', ann.text)
+
+    def testLazyTextInvalid(self):
+        with self.assertRaises(ValueError):
+            Annotation.from_doc('Number', 'abc', 1, 4)
+        with self.assertRaises(ValueError):
+            Annotation.from_doc('Number', 'abc', 2, 1)
+        with self.assertRaises(ValueError):
+            Annotation('Number', None, 0, 1)
+
+    def testLazyTextPickle(self):
+        doc = "x" * 10000 + " 170 "
+        ann = Annotation.from_doc('Number', doc, 10001, 10004)
+        data = pickle.dumps(ann)
+        # The document is not pickled along with the annotation.
+        self.assertLess(len(data), 1000)
+        self.assertEqual(ann, pickle.loads(data))
+
+    def testTypeId(self):
+        ann1 = Annotation('Number', '170', 26, 29)
+        ann2 = Annotation('Num' + 'ber', '170', 26, 29)
+        self.assertEqual(TypeRegistry.get_type_id('Number'), ann1.type_id)
+        self.assertEqual(ann1.type_id, ann2.type_id)
+        # Type names are interned.
+        self.assertIs(ann1.type, ann2.type)
+
+        ann2.type = 'Quantity'
+        self.assertEqual(TypeRegistry.get_type_id('Quantity'), ann2.type_id)
+        self.assertEqual('Quantity', ann2.type)
+        self.assertNotEqual(ann1, ann2)
+
+        self.assertEqual(TypeRegistry.TOKEN_TYPE_ID, TokenAnn(0, 4, 'word').type_id)
+
+    def testTypeIdPickle(self):
+        ann = Annotation('Number', '170', 26, 29)
+        data = pickle.dumps(ann)
+        # The type id is not pickled, only the type name.
+        self.assertNotIn(b'type_id', data)
+        actual = pickle.loads(data)
+        self.assertEqual(ann.type_id, actual.type_id)
+        self.assertEqual(ann, actual)
+
+    def testResolveOverlaps(self):
+        # 'fine gold' (Material) overlaps 'gold coin' (Item) and 'gold' (Metal).
+        fine_gold = Annotation('Material', 'fine gold', 0, 9)
+        gold = Annotation('Metal', 'gold', 5, 9)
+        gold_coin = Annotation('Item', 'gold coin', 5, 14)
+        fine_gold_coin = Annotation('Item', 'fine gold coin', 0, 14)
+        coin = Annotation('Item', 'coin', 10, 14)
+        pounds = Annotation('Unit', 'pounds', 15, 21)
+        anns = [pounds, gold_coin, gold, fine_gold, coin]
+
+        self.assertEqual([fine_gold, coin, pounds], Annotation.resolve_overlaps(anns, 'leftmost'))
+        # Equal lengths: the leftmost wins.
+        self.assertEqual([fine_gold, coin, pounds], Annotation.resolve_overlaps(anns, 'longest'))
+        self.assertEqual([fine_gold_coin, pounds],
+                         Annotation.resolve_overlaps(anns + [fine_gold_coin], 'longest'))
+        self.assertEqual([gold_coin, pounds],
+                         Annotation.resolve_overlaps(anns, 'priority', ['Item', 'Unit']))
+        # Unlisted types rank below listed ones.
+        self.assertEqual([fine_gold, coin, pounds],
+                         Annotation.resolve_overlaps(anns, 'priority', ['Material']))
+
+        # Annotations which only touch are all kept.
+        self.assertEqual([fine_gold, coin], Annotation.resolve_overlaps([coin, fine_gold], 'longest'))
+        # A zero-length annotation overlaps only annotations strictly enclosing it.
+        inside = Annotation('Marker', '', 7, 7)
+        boundary = Annotation('Marker', '', 9, 9)
+        for strategy in Annotation.OVERLAP_STRATEGIES:
+            self.assertEqual([fine_gold, boundary],
+                             Annotation.resolve_overlaps([inside, fine_gold, boundary], strategy, ['Material']))
+
+        # Of two annotations on the same span, the first one wins.
+        same_span = [Annotation('Metal', 'gold', 5, 9), Annotation('Color', 'gold', 5, 9)]
+        for strategy in ['longest', 'leftmost']:
+            self.assertEqual(['Metal'], [a.type for a in Annotation.resolve_overlaps(same_span, strategy)])
+
+        self.assertEqual([], Annotation.resolve_overlaps([], 'longest'))
+        with self.assertRaises(ValueError):
+            Annotation.resolve_overlaps(anns, 'shortest')
+        with self.assertRaises(ValueError):
+            Annotation.resolve_overlaps(anns, 'priority')
+
+    def testResolveOverlapsMatchesQuadraticGreedy(self):
+        rng = random.Random(7)
+        types = ['A', 'B', 'C']
+        anns = []
+        for _ in range(300):
+            start = rng.randrange(0, 500)
+            end = start + rng.randrange(0, 12)
+            anns.append(Annotation(rng.choice(types), 'x' * (end - start), start, end))
+
+        def overlaps(a, b):
+            if (a.start_offset, a.end_offset) == (b.start_offset, b.end_offset):
+                return True
+            return a.start_offset < b.end_offset and b.start_offset < a.end_offset
+
+        def greedy(ranked):
+            kept = []
+            for ann in ranked:
+                if not any(overlaps(ann, other) for other in kept):
+                    kept.append(ann)
+            return Annotation.sort(kept)
+
+        priority = {'C': 0, 'A': 1, 'B': 2}
+        rankings = {
+            'longest': lambda a: (a.start_offset - a.end_offset, a.start_offset),
+            'priority': lambda a: (priority[a.type], a.start_offset - a.end_offset, a.start_offset),
+            'leftmost': lambda a: (a.start_offset, -a.end_offset),
+        }
+        for strategy, ranking in rankings.items():
+            expected = greedy(sorted(anns, key=ranking))
+            actual = Annotation.resolve_overlaps(anns, strategy, ['C', 'A', 'B'])
+            self.assertEqual(expected, actual, strategy)
+
+    def testDeduplicate(self):
+        number = Annotation('Number', '170', 26, 29)
+        number_with_value = Annotation('Number', '170', 26, 29, {'value': 170})
+        number_with_source = Annotation('Number', '170', 26, 29, {'value': 0, 'source': 'ner'})
+        cardinal = Annotation('CARDINAL', '170', 26, 29)
+        unit = Annotation('Unit', 'pounds', 38, 44)
+        anns = [number, unit, cardinal, number_with_value, Annotation('Unit', 'pounds', 38, 44),
+                number_with_source]
+
+        self.assertEqual([number, unit, cardinal], Annotation.deduplicate(anns))
+        self.assertIs(number, Annotation.deduplicate(anns, 'first')[0])
+
+        self.assertEqual([number, unit, cardinal, number_with_value, number_with_source],
+                         Annotation.deduplicate(anns, 'distinct'))
+
+        merged = Annotation.deduplicate(anns, 'merge')
+        self.assertEqual([unit, cardinal], merged[1:])
+        self.assertEqual({'value': 170, 'source': 'ner'}, merged[0].properties)
+        self.assertEqual((26, 29, '170'), (merged[0].start_offset, merged[0].end_offset, merged[0].text))
+        # The input annotations are left untouched.
+        self.assertEqual({}, number.properties)
+        self.assertEqual({'value': 170}, number_with_value.properties)
+
+        self.assertEqual([], Annotation.deduplicate([]))
+        with self.assertRaises(ValueError):
+            Annotation.deduplicate(anns, 'last')
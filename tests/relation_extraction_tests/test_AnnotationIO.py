@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction import AnnotationIO
+
+
+class TestAnnotationIO(unittest.TestCase):
+
+    def setUp(self):
+        self.anns = [
+            Annotation('Range', 'between', 18, 25),
+            Annotation('Number', '170', 26, 29),
+            Annotation('Token', "'s", 30, 32, {'kind': 'word'}),
+            Annotation('Unit', 'Größe ¢', 38, 45),
+            Annotation('MinMax', 'between 170 and 220 pounds', 18, 44,
+                       {'range_phrase': 'between', 'min_number': '170', 'max_number': '220',
+                        'unit': 'pounds'}),
+            Annotation('Empty', '', 50, 50),
+        ]
+
+    def testBinaryRoundTrip(self):
+        data = AnnotationIO.annotations_to_bytes(self.anns)
+        actual = AnnotationIO.annotations_from_bytes(data)
+        self.assertEqual(self.anns, actual)
+
+        # Properties survive the round trip.
+        self.assertEqual(self.anns[4].properties, actual[4].properties)
+        self.assertEqual({}, actual[0].properties)
+
+    def testBinaryRoundTripWithoutProperties(self):
+        anns = [ann for ann in self.anns if not ann.properties]
+        data = AnnotationIO.annotations_to_bytes(anns)
+        self.assertEqual(anns, AnnotationIO.annotations_from_bytes(data))
+
+        data = AnnotationIO.annotations_to_bytes([])
+        self.assertEqual([], AnnotationIO.annotations_from_bytes(data))
+
+    def testBinaryInvalidData(self):
+        with self.assertRaises(ValueError):
+            AnnotationIO.annotations_from_bytes(b'T2R')
+        with self.assertRaises(ValueError):
+            AnnotationIO.annotations_from_bytes(b'XXXX' + bytes(20))
+
+        data = bytearray(AnnotationIO.annotations_to_bytes(self.anns))
+        data[4] = 99
+        with self.assertRaises(ValueError):
+            AnnotationIO.annotations_from_bytes(bytes(data))
+
+    def testJsonlRoundTrip(self):
+        buffer = io.StringIO()
+        count = AnnotationIO.write_jsonl(iter(self.anns), buffer)
+        self.assertEqual(len(self.anns), count)
+        self.assertEqual(len(self.anns), buffer.getvalue().count('\n'))
+
+        buffer.seek(0)
+        reader = AnnotationIO.read_jsonl(buffer)
+        self.assertEqual(self.anns[0], next(reader))
+        self.assertEqual(self.anns[1:], list(reader))
+
+    def testJsonlFormat(self):
+        buffer = io.StringIO()
+        AnnotationIO.write_jsonl(self.anns[1:3], buffer)
+        expected = '{"type":"Number","start":26,"end":29,"text":"170"}\n'
+        expected += '{"type":"Token","start":30,"end":32,"text":"\'s","properties":{"kind":"word"}}\n'
+        self.assertEqual(expected, buffer.getvalue())
+
+        # Blank lines are skipped.
+        buffer = io.StringIO('\n' + expected + '\n\n')
+        self.assertEqual(self.anns[1:3], list(AnnotationIO.read_jsonl(buffer)))
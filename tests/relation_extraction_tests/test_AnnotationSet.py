@@ -0,0 +1,96 @@
+import unittest
+
+import numpy as np
+
+from text_to_relations.relation_extraction import TypeRegistry
+from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.AnnotationSet import AnnotationSet
+
+
+class TestAnnotationSet(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = "His weight ranged between 170 and 220 pounds.\nHe visited the gym 3 to 5 times."
+        self.anns = [
+            Annotation('Number', '220', 34, 37),
+            Annotation('Range', 'between', 18, 25),
+            Annotation('Number', '170', 26, 29),
+            Annotation('Unit', 'pounds', 38, 44),
+            Annotation('Sentence', self.doc[0:45], 0, 45),
+            Annotation('Number', '3', 65, 66),
+            Annotation('Token', 'to', 67, 69, {'kind': 'word'}),
+            Annotation('Sentence', self.doc[46:], 46, 78),
+        ]
+
+    def testRoundTrip(self):
+        ann_set = AnnotationSet.from_annotations(self.anns, self.doc)
+        self.assertEqual(len(self.anns), len(ann_set))
+        self.assertEqual(self.anns, ann_set.to_annotations())
+        self.assertEqual(self.anns[6], ann_set[6])
+        self.assertEqual(['Number', 'Range', 'Number', 'Unit', 'Sentence', 'Number', 'Token', 'Sentence'],
+                         ann_set.get_types())
+        self.assertEqual('between', ann_set.get_text(1))
+        self.assertEqual(self.anns[7].text, ann_set.get_text(7))
+
+        empty = AnnotationSet.from_annotations([], self.doc)
+        self.assertEqual(0, len(empty))
+        self.assertEqual([], empty.to_annotations())
+
+    def testInvalidColumns(self):
+        number_id = TypeRegistry.get_type_id('Number')
+        with self.assertRaises(ValueError):
+            AnnotationSet(self.doc, [number_id, number_id], [1, 2], [3])
+        with self.assertRaises(ValueError):
+            AnnotationSet(self.doc, [number_id], [5], [3])
+        with self.assertRaises(ValueError):
+            AnnotationSet(self.doc, [TypeRegistry.get_nbr_types()], [0], [3])
+
+    def testSort(self):
+        ann_set = AnnotationSet.from_annotations(self.anns, self.doc)
+        self.assertFalse(ann_set.is_sorted())
+
+        sorted_set = ann_set.sort()
+        self.assertTrue(sorted_set.is_sorted())
+        self.assertEqual(Annotation.sort(self.anns), sorted_set.to_annotations())
+
+    def testFilterByType(self):
+        ann_set = AnnotationSet.from_annotations(self.anns, self.doc)
+
+        numbers = ann_set.filter_by_type('Number')
+        self.assertEqual([self.anns[0], self.anns[2], self.anns[5]], numbers.to_annotations())
+
+        numbers_and_units = ann_set.filter_by_type('Number', 'Unit')
+        self.assertEqual(4, len(numbers_and_units))
+
+        self.assertEqual(0, len(ann_set.filter_by_type('Nonexistent')))
+
+    def testContainmentAndOverlap(self):
+        ann_set = AnnotationSet.from_annotations(self.anns, self.doc).sort()
+        sentence1 = self.anns[4]
+
+        expected = Annotation.sort(Annotation.get_enclosed(sentence1, self.anns))
+        self.assertEqual(expected, ann_set.get_enclosed(sentence1).to_annotations())
+
+        between = self.anns[1]
+        enclosing = ann_set.take(ann_set.enclosing_mask(between.start_offset, between.end_offset))
+        self.assertEqual([sentence1, between], enclosing.to_annotations())
+
+        # A span covering 'between 1' overlaps the Range, the first Number and the sentence.
+        overlapping = ann_set.get_overlapping(Annotation('Span', 'between 1', 18, 27))
+        self.assertEqual([sentence1, between, self.anns[2]], overlapping.to_annotations())
+
+        # Touching is not overlapping.
+        touching = ann_set.overlap_mask(25, 26)
+        self.assertFalse(np.any(touching & ann_set.type_mask('Range', 'Number')))
+
+    def testGetEnclosedPairs(self):
+        ann_set = AnnotationSet.from_annotations(self.anns, self.doc).sort()
+        sentences = ann_set.filter_by_type('Sentence')
+        others = ann_set.take(~ann_set.type_mask('Sentence'))
+
+        container_idx, ann_idx = others.get_enclosed_pairs(sentences)
+        actual = [(sentences[int(c)], others[int(a)]) for c, a in zip(container_idx, ann_idx)]
+
+        expected = Annotation.get_enclosed_pairs(sentences.to_annotations(), others.to_annotations())
+        self.assertEqual(expected, actual)
+        self.assertEqual(6, len(actual))
@@ -0,0 +1,106 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from text_to_relations.relation_extraction import Gazetteer
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        self.path = os.path.join(self.tmp_dir.name, 'colors.txt')
+        self.write_entries(['red', '  dark green ', '', 'blue', 'red brown'])
+        self.text = "1875 5c Jefferson, red brown; 1861 10c Washington, dark green"
+        Gazetteer._loaded.clear()
+
+    def tearDown(self):
+        Gazetteer._loaded.clear()
+        self.tmp_dir.cleanup()
+
+    def write_entries(self, entries):
+        with open(self.path, 'w', encoding='utf-8') as fp:
+            fp.write('\n'.join(entries) + '\n')
+
+    def cache_files(self):
+        return sorted(os.listdir(self.cache_dir)) if os.path.isdir(self.cache_dir) else []
+
+    def testReadGazetteer(self):
+        self.assertEqual(['red', 'dark green', 'blue', 'red brown'], Gazetteer.read_gazetteer(self.path))
+
+    def testLoadGazetteer(self):
+        rs = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, whole_word=True)
+        expected = RegexString(['red', 'dark green', 'blue', 'red brown'], whole_word=True)
+        self.assertEqual(expected.get_regex_str(), rs.get_regex_str())
+        self.assertEqual([('red brown', 19, 28), ('dark green', 51, 61)], rs.get_match_triples(self.text))
+        self.assertEqual(1, len(self.cache_files()))
+
+        # The same process gets the same object back.
+        self.assertIs(rs, Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, whole_word=True))
+
+        # Another process loads the cached matcher.
+        Gazetteer._loaded.clear()
+        loaded = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, whole_word=True)
+        self.assertIsNot(rs, loaded)
+        self.assertEqual(rs.get_regex_str(), loaded.get_regex_str())
+        self.assertEqual(rs.get_match_triples(self.text), loaded.get_match_triples(self.text))
+
+        with self.assertRaises(ValueError):
+            Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, match_strs=['red'])
+
+    def testCacheKey(self):
+        Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir)
+        Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, whole_word=True)
+        self.assertEqual(2, len(self.cache_files()))
+
+        # Editing the file builds a new matcher.
+        self.write_entries(['orange'])
+        rs = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(['orange'], rs.match_strs)
+        self.assertEqual(3, len(self.cache_files()))
+
+        # Without the cache, nothing is read or written.
+        uncached = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, use_cache=False)
+        self.assertIsNot(rs, uncached)
+        self.assertEqual(3, len(self.cache_files()))
+
+        self.write_entries(['', '   '])
+        with self.assertRaises(ValueError):
+            Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir)
+
+    def testDamagedCache(self):
+        rs = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir)
+        cache_file = os.path.join(self.cache_dir, self.cache_files()[0])
+        with open(cache_file, 'wb') as fp:
+            fp.write(b'not a pickle')
+
+        Gazetteer._loaded.clear()
+        rebuilt = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir)
+        self.assertEqual(rs.get_regex_str(), rebuilt.get_regex_str())
+        with open(cache_file, 'rb') as fp:
+            self.assertEqual(rs.get_regex_str(), pickle.load(fp).get_regex_str())
+
+    def testAhoCorasickBackend(self):
+        rs = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, backend='aho_corasick')
+        Gazetteer._loaded.clear()
+        loaded = Gazetteer.load_gazetteer(self.path, cache_dir=self.cache_dir, backend='aho_corasick')
+        # The automaton was cached with the matcher.
+        self.assertIn(False, loaded._automata)
+        self.assertEqual(rs.get_match_triples(self.text), loaded.get_match_triples(self.text))
+        self.assertEqual([('red', 19, 22), ('dark green', 51, 61)],
+                         loaded.get_match_triples(self.text.replace('red brown', 'red-brown')))
+
+    def testPickleRegexString(self):
+        rs = RegexString(['red', 'blue'], whole_word=True)
+        rs.get_match_triples(self.text)
+        self.assertTrue(rs._compiled)
+        loaded = pickle.loads(pickle.dumps(rs))
+        self.assertEqual({}, loaded._compiled)
+        self.assertEqual(rs.get_match_triples(self.text), loaded.get_match_triples(self.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import pickle
+import re
+import signal
+import threading
+import time
+import unittest
+
+from text_to_relations.relation_extraction.ExtractionPhaseABC import SimpleExtractionPhase, ChainLink
+from text_to_relations.relation_extraction.MatchBudget import BudgetExceededError, MatchBudget
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+# Backtracks exponentially on a run of 'a's which is not at the end of the text.
+CATASTROPHIC_REGEX = r'(?:a+)+$'
+CATASTROPHIC_TEXT = 'a' * 40 + 'b'
+
+
+def make_phase(match_budget, number_regex=r'\d+'):
+    return SimpleExtractionPhase(
+        relation_name='Weight',
+        regex_patterns={'Verb': RegexString(['weighs']),
+                        'Number': RegexString([number_regex], escape=False),
+                        'Unit': RegexString(['kg', 'lbs'], whole_word=True)},
+        chain=[ChainLink('Verb', 'verb', 0, 2, 'Number', 'number'),
+               ChainLink('Number', 'number', 0, 3, 'Unit', 'unit')],
+        match_budget=match_budget)
+
+
+class TestMatchBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.text = 'It weighs 12 kg. It weighs 13 kg. It weighs 14 lbs.'
+
+    def testInvalidBudget(self):
+        with self.assertRaises(ValueError):
+            MatchBudget()
+        with self.assertRaises(ValueError):
+            MatchBudget(seconds=0)
+        with self.assertRaises(ValueError):
+            MatchBudget(max_steps=10, outcome='ignore')
+        with self.assertRaises(ValueError):
+            make_phase(match_budget=10)
+
+    def testSteps(self):
+        budget = MatchBudget(max_steps=3)
+        # Outside document(), check() does nothing.
+        for _ in range(5):
+            budget.check()
+        with budget.document():
+            for _ in range(3):
+                budget.check()
+        with self.assertRaises(BudgetExceededError):
+            with budget.document():
+                for _ in range(4):
+                    budget.check()
+        self.assertEqual(2, budget.nbr_documents)
+        self.assertEqual(1, budget.nbr_exceeded)
+
+        budget.reset_counters()
+        self.assertEqual((0, 0), (budget.nbr_documents, budget.nbr_exceeded))
+
+    def testSeconds(self):
+        budget = MatchBudget(seconds=0.05, use_alarm=False)
+        with self.assertRaises(BudgetExceededError):
+            with budget.document():
+                time.sleep(0.1)
+                budget.check()
+
+    @unittest.skipUnless(hasattr(signal, 'setitimer'), "SIGALRM timers are not available.")
+    def testAlarmInterruptsRegex(self):
+        budget = MatchBudget(seconds=0.1)
+        previous_handler = signal.getsignal(signal.SIGALRM)
+        start = time.perf_counter()
+        with self.assertRaises(BudgetExceededError):
+            with budget.document():
+                re.search(CATASTROPHIC_REGEX, CATASTROPHIC_TEXT)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(previous_handler, signal.getsignal(signal.SIGALRM))
+
+        # Outside the main thread only the cooperative checks apply.
+        outcome = []
+
+        def run():
+            with budget.document():
+                time.sleep(0.2)
+            outcome.append('finished')
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        thread.join()
+        self.assertEqual(['finished'], outcome)
+
+    def testPickle(self):
+        budget = MatchBudget(max_steps=5, outcome='partial')
+        with budget.document():
+            pass
+        loaded = pickle.loads(pickle.dumps(budget))
+        self.assertEqual((5, 'partial', 1), (loaded.max_steps, loaded.outcome, loaded.nbr_documents))
+        with loaded.document():
+            loaded.check()
+
+    def testPhaseOutcomes(self):
+        expected = make_phase(None).find_match(self.text)
+        self.assertEqual(3, len(expected))
+        self.assertEqual(expected, make_phase(MatchBudget(max_steps=1000)).find_match(self.text))
+
+        partial_lengths = set()
+        for max_steps in range(1, 30):
+            budget = MatchBudget(max_steps=max_steps, outcome='partial')
+            partial = make_phase(budget).find_match(self.text)
+            # Partial results are the relations completed before the budget ran out.
+            self.assertEqual(expected[:len(partial)], partial)
+            partial_lengths.add(len(partial))
+            self.assertEqual(int(len(partial) < 3), budget.nbr_exceeded)
+        self.assertEqual({0, 1, 2, 3}, partial_lengths)
+
+        budget = MatchBudget(max_steps=15, outcome='skip')
+        phase = make_phase(budget)
+        self.assertEqual([], phase.find_match(self.text))
+        self.assertEqual(expected[:1], phase.find_match('It weighs 12 kg.'))
+        self.assertEqual((2, 1), (budget.nbr_documents, budget.nbr_exceeded))
+
+        with self.assertRaises(BudgetExceededError):
+            make_phase(MatchBudget(max_steps=15, outcome='error')).find_match(self.text)
+
+    @unittest.skipUnless(hasattr(signal, 'setitimer'), "SIGALRM timers are not available.")
+    def testPhaseTimeBudget(self):
+        budget = MatchBudget(seconds=0.1)
+        phase = make_phase(budget, number_regex=CATASTROPHIC_REGEX)
+        start = time.perf_counter()
+        self.assertEqual([], phase.find_match(f'It weighs {CATASTROPHIC_TEXT} kg.'))
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(1, budget.nbr_exceeded)
+
+
+if __name__ == '__main__':
+    unittest.main()
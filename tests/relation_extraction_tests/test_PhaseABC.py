@@ -1,8 +1,12 @@
+import pickle
 import unittest
 
 from text_to_relations.relation_extraction.TokenAnn import TokenAnn
 from text_to_relations.relation_extraction.Annotation import Annotation
-from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC, ChainLink
+from text_to_relations.relation_extraction.ExtractionPhaseABC import (
+    ExtractionPhaseABC, SimpleExtractionPhase, ChainLink
+)
+from text_to_relations.relation_extraction.RegexString import RegexString
 
 
 class TestPhaseABC(unittest.TestCase):
@@ -99,6 +103,88 @@ class TestPhaseABC(unittest.TestCase):
         with self.assertRaises(ValueError):
             PhaseTest()
 
+    def testInvalidOverlapStrategy(self):
+        class PhaseTest(ExtractionPhaseABC):
+            def __init__(self, overlap_strategy, type_priority=None):
+                super().__init__()
+                self.relation_name = 'Test'
+                self.regex_patterns = {}
+                self.chain = []
+                self.overlap_strategy = overlap_strategy
+                self.type_priority = type_priority
+
+        PhaseTest('leftmost')
+        PhaseTest('priority', ['Number'])
+        with self.assertRaises(ValueError):
+            PhaseTest('shortest')
+        with self.assertRaises(ValueError):
+            PhaseTest('priority')
+
+    def testMaxBacktrackingDegree(self):
+        class PhaseTest(ExtractionPhaseABC):
+            def __init__(self, number_regex, max_backtracking_degree):
+                super().__init__()
+                self.relation_name = 'Test'
+                self.regex_patterns = {
+                    'Number': RegexString([number_regex], escape=False),
+                    'Unit': RegexString(['kg', 'lbs']),
+                }
+                self.chain = [ChainLink('Number', 'number', 0, 3, 'Unit', 'unit')]
+                self.max_backtracking_degree = max_backtracking_degree
+
+        phase = PhaseTest(r'\d+(?:,\d+)*', 1)
+        self.assertEqual({}, phase.get_backtracking_risks())
+
+        phase = PhaseTest(r'(?:\d+,?)+', None)
+        self.assertEqual(['Number'], list(phase.get_backtracking_risks()))
+        with self.assertRaises(ValueError):
+            PhaseTest(r'(?:\d+,?)+', 3)
+        with self.assertRaises(ValueError):
+            PhaseTest(r'\d+\.?\d*', 1)
+        PhaseTest(r'\d+\.?\d*', 2)
+
+    def testChainLinkPickleAndFingerprint(self):
+        link = ChainLink('Number', 'number', 0, 3, 'Unit', 'unit')
+        loaded = pickle.loads(pickle.dumps(link))
+        self.assertEqual(link, loaded)
+        self.assertEqual(link.get_fingerprint(), loaded.get_fingerprint())
+        self.assertEqual(hash(link), hash(loaded))
+        self.assertNotEqual(link, ChainLink('Number', 'number', 0, 4, 'Unit', 'unit'))
+        self.assertNotEqual(link.get_fingerprint(),
+                            ChainLink('Number', 'number', 0, 4, 'Unit', 'unit').get_fingerprint())
+
+    def testPhasePickleAndFingerprint(self):
+        def make_phase(units=('kg', 'lbs'), max_distance=3, **kwargs):
+            return SimpleExtractionPhase(
+                relation_name='Weight',
+                regex_patterns={'Verb': RegexString(['weighs']),
+                                'Number': RegexString([r'\d+'], escape=False),
+                                'Unit': RegexString(list(units), whole_word=True)},
+                chain=[ChainLink('Verb', 'verb', 0, 2, 'Number', 'number'),
+                       ChainLink('Number', 'number', 0, max_distance, 'Unit', 'unit')],
+                **kwargs)
+
+        phase = make_phase()
+        text = 'It weighs 12 kg.'
+        expected = phase.find_match(text)
+        self.assertEqual(1, len(expected))
+
+        loaded = pickle.loads(pickle.dumps(phase))
+        self.assertEqual(expected, loaded.find_match(text))
+        self.assertEqual(phase.get_fingerprint(), loaded.get_fingerprint())
+
+        # Equal definitions have equal fingerprints; any change to the
+        # relation name, a regex, the chain or the options changes it.
+        self.assertEqual(phase.get_fingerprint(), make_phase(verbose=True).get_fingerprint())
+        fingerprints = {phase.get_fingerprint(),
+                        make_phase(units=('kg', 'lb')).get_fingerprint(),
+                        make_phase(max_distance=2).get_fingerprint(),
+                        make_phase(deduplicate='first').get_fingerprint()}
+        renamed = make_phase()
+        renamed.relation_name = 'Mass'
+        fingerprints.add(renamed.get_fingerprint())
+        self.assertEqual(5, len(fingerprints))
+
     def testBuildMergedInput1(self):
         # All assertions expect the same output, except for sometimes the annotation offsets.
 
@@ -282,6 +368,20 @@ class TestPhaseABC(unittest.TestCase):
         self.assertEqual(expected, actual)
 
 
+    def testMergedRepresentationRoundTripWithSpecialChars(self):
+        # Tokens containing quotes and angle brackets survive the merged representation.
+        inputStr = "if x > 5 and y < 3 it's 'done'"
+        ann = Annotation('Number', '5', 7, 8)
+
+        rep = ExtractionPhaseABC.build_merged_representation(inputStr, [ann])
+        anns = ExtractionPhaseABC.merged_representation_to_annotations(rep)
+
+        expected = [Annotation(t.type, t.text, t.start_offset, t.end_offset)
+                    for t in TokenAnn.get_token_objects(inputStr, 0) if t.start_offset != 7]
+        expected.insert(3, ann)
+        self.assertEqual(expected, anns)
+
+
     def testGetTokenObjects1(self):
         docStr = "My friend (i.e., my best friend) has betrayed me."
 
@@ -0,0 +1,65 @@
+import pickle
+import unittest
+
+from text_to_relations.relation_extraction.ExtractionPhaseABC import SimpleExtractionPhase, ChainLink
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+
+class TestPhaseProfiler(unittest.TestCase):
+
+    def testReport(self):
+        profiler = PhaseProfiler()
+        profiler.record('a', 0.5, 3)
+        profiler.record('b', 2.0, 1)
+        profiler.record('a', 1.0, 2)
+        profiler.record_document(2.5)
+        profiler.record_document(1.5)
+
+        self.assertEqual([('b', 2.0, 1, 1), ('a', 1.5, 2, 5), ('other', 0.5, 2, 0)], profiler.get_report())
+        report = profiler.format_report()
+        self.assertIn('2 documents', report)
+        self.assertLess(report.index('\nb '), report.index('\na '))
+
+        loaded = pickle.loads(pickle.dumps(profiler))
+        self.assertEqual(profiler.get_report(), loaded.get_report())
+
+        profiler.reset()
+        self.assertEqual([('other', 0.0, 0, 0)], profiler.get_report())
+
+    def testIterTimed(self):
+        profiler = PhaseProfiler()
+        self.assertEqual([1, 2, 3], list(profiler.iter_timed('numbers', iter([1, 2, 3]))))
+        self.assertEqual([], list(profiler.iter_timed('numbers', [])))
+        name, _, calls, matches = profiler.get_report()[0]
+        self.assertEqual(('numbers', 2, 3), (name, calls, matches))
+
+    def testPhase(self):
+        profiler = PhaseProfiler()
+        phase = SimpleExtractionPhase(
+            relation_name='Weight',
+            regex_patterns={'Verb': RegexString(['weighs']),
+                            'Number': RegexString([r'\d+'], escape=False),
+                            'Unit': RegexString(['kg', 'lbs'], whole_word=True)},
+            chain=[ChainLink('Verb', 'verb', 0, 2, 'Number', 'number'),
+                   ChainLink('Number', 'number', 0, 3, 'Unit', 'unit')],
+            profiler=profiler)
+        texts = ['It weighs 12 kg. It weighs 13 kg. It weighs 14 lbs.', 'Nothing to see.', 'It weighs 7 lbs.']
+        results = [phase.find_match(text) for text in texts]
+        self.assertEqual([3, 0, 1], [len(result) for result in results])
+
+        rows = {row[0]: row[1:] for row in profiler.get_report()}
+        self.assertEqual(3, profiler.nbr_documents)
+        # The prefilter let two documents through.
+        self.assertEqual((3, 2), rows['prefilter'][1:])
+        self.assertEqual((2, 4), rows["regex_patterns['Verb']"][1:])
+        self.assertEqual((2, 4), rows["regex_patterns['Number']"][1:])
+        self.assertEqual(2, rows['tokenization'][1])
+        # Each Verb->Number match leads to one search for a Unit.
+        self.assertEqual((2, 4), rows['chain[0] Verb->Number'][1:])
+        self.assertEqual((4, 4), rows['chain[1] Number->Unit'][1:])
+        self.assertAlmostEqual(profiler.total_seconds, sum(row[0] for row in rows.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
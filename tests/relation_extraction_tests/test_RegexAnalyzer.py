@@ -0,0 +1,88 @@
+import math
+import re
+import sys
+import unittest
+
+from text_to_relations.relation_extraction import RegexAnalyzer
+
+
+class TestRegexAnalyzer(unittest.TestCase):
+
+    def testGetMinWidth(self):
+        self.assertEqual(0, RegexAnalyzer.get_min_width(r'x*'))
+        self.assertEqual(3, RegexAnalyzer.get_min_width(r'\d{2}(?:a|bc)'))
+
+    def testHasContextAssertions(self):
+        for regex in [r'^a', r'a$', r'\Aa', r'a\Z', r'(?<=a)b', r'a(?!b)', r'(?:x|(?:y$))+']:
+            self.assertTrue(RegexAnalyzer.has_context_assertions(regex), regex)
+        for regex in [r'\ba\b', r'\Ba', r'a|b', r'(a)\1']:
+            self.assertFalse(RegexAnalyzer.has_context_assertions(regex), regex)
+
+    def testAsciiCompatibility(self):
+        self.assertTrue(RegexAnalyzer.is_ascii_compatible(r'\bkg\b'))
+        self.assertTrue(RegexAnalyzer.is_ascii_compatible('\u00a2'))
+        self.assertFalse(RegexAnalyzer.is_ascii_compatible(r'(?u)\w'))
+        self.assertFalse(RegexAnalyzer.is_ascii_compatible('\u017f', re.IGNORECASE))
+        self.assertFalse(RegexAnalyzer.is_ascii_compatible('[a-\u0200]'))
+
+        self.assertTrue(RegexAnalyzer.uses_unicode_classes(r'\bkg'))
+        self.assertTrue(RegexAnalyzer.uses_unicode_classes(r'a(?i:b)'))
+        self.assertTrue(RegexAnalyzer.uses_unicode_classes(r'ab', re.IGNORECASE))
+        self.assertFalse(RegexAnalyzer.uses_unicode_classes(r'(?:ab|cd)[x-z]'))
+
+        self.assertTrue(RegexAnalyzer.uses_space_class(r'[^\S]'))
+        self.assertFalse(RegexAnalyzer.uses_space_class(r'\w \d'))
+
+    def testGetRequiredLiterals(self):
+        self.assertEqual([['between', 'from'], ['kg', 'lbs']],
+                         RegexAnalyzer.get_required_literals(r'(?:between|from)\s\d+\s(?:kg|lbs)'))
+        # Required repetitions count; optional ones do not.
+        self.assertEqual([['ab'], ['d']], RegexAnalyzer.get_required_literals(r'(ab)+c*d{2}'))
+        # A branch with an alternative that has no literal gives no clause.
+        self.assertEqual([['b']], RegexAnalyzer.get_required_literals(r'(a|)b'))
+        self.assertEqual([], RegexAnalyzer.get_required_literals(r'\d+[a-z]'))
+
+    def testGetRequiredLiteralsIgnoreCase(self):
+        self.assertEqual([['abc'], ['d']], RegexAnalyzer.get_required_literals(r'(?i)Abc(?-i:D)'))
+        self.assertEqual([['abc']], RegexAnalyzer.get_required_literals(r'ABC', re.IGNORECASE))
+        # A group which alone is case-insensitive gives no clause.
+        self.assertEqual([['x'], ['y']], RegexAnalyzer.get_required_literals(r'x(?i:ABC)y'))
+
+    def testFoldCase(self):
+        for literal, text in [('Straße', 'STRASSE'), ('k', 'K'), ('İ', 'ı'), ('i', 'İ')]:
+            self.assertTrue(re.search(re.escape(literal), text, re.IGNORECASE) is None or
+                            RegexAnalyzer.fold_case(literal) in RegexAnalyzer.fold_case(text))
+
+    def testFindBacktrackingRisks(self):
+        for regex in [r'(a+)+', r'(\w+\s?)*$', r'(.*,)*x']:
+            risks = RegexAnalyzer.find_backtracking_risks(regex)
+            self.assertEqual(['nested'], [risk.kind for risk in risks], regex)
+            self.assertEqual(math.inf, RegexAnalyzer.estimate_backtracking_degree(regex))
+
+        # Alternatives which can match the same text.
+        for regex in [r'(?:a|a)*', r'(?:a|aa)*$', r'(?:x(?:ab|a.))+', r'(?:\d\d|\w\w)*$']:
+            risks = RegexAnalyzer.find_backtracking_risks(regex)
+            self.assertEqual(['nested'], [risk.kind for risk in risks], regex)
+            self.assertEqual(math.inf, RegexAnalyzer.estimate_backtracking_degree(regex))
+
+        self.assertEqual(5, RegexAnalyzer.estimate_backtracking_degree(r'(a+){1,5}'))
+        self.assertEqual(3, RegexAnalyzer.estimate_backtracking_degree(r'.*x.*y.*'))
+        self.assertEqual(2, RegexAnalyzer.estimate_backtracking_degree(r'(?i)A+a+'))
+        self.assertEqual(2, RegexAnalyzer.estimate_backtracking_degree(r'\S+(?:\b\S+)?'))
+
+    def testNoBacktrackingRisks(self):
+        # Quantifiers separated by characters they cannot consume, and
+        # alternations of literals.
+        regexes = [r'\d+\s\d+', r'[a-z]+\d+[a-z]+', r'(?:\s\S+){1,3}', r'\s*\S*', r'<.*?>',
+                   r'(?:kg|lbs)(?:foo|ba)', r"<'Weight[^>]*>(?:<'[^>]*>){0,5}?<'Price[^>]*>",
+                   r'apple(?:\b\S+)?(?:\s\S+){1,3}\spie', r'(?:ab|ac)*', r'(?:ab|a)*', r'(?:\s(?:kg|k))*']
+        if sys.version_info >= (3, 11):
+            # Possessive quantifiers and atomic groups.
+            regexes += [r'a++a', r'(?>a+)+']
+        for regex in regexes:
+            self.assertEqual([], RegexAnalyzer.find_backtracking_risks(regex), regex)
+            self.assertEqual(1, RegexAnalyzer.estimate_backtracking_degree(regex))
+
+
+if __name__ == '__main__':
+    unittest.main()
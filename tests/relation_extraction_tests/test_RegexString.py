@@ -4,6 +4,8 @@ Some of the functionality tested here may no longer be very useful, now that
 concat() and concat_with_word_distances() have been implemented.
 """
 
+import pickle
+import random
 import re
 import unittest
 
@@ -266,6 +268,40 @@ class TestRegexString(unittest.TestCase):
         triples = rs_escape_false.get_match_triples('18')
         self.assertEqual([('18', 0, 2)], triples)
 
+    def test_compiled_pattern_cache(self):
+        rs = RegexString(['ab', 'cd'])
+        compiled = rs.get_compiled()
+        self.assertEqual(rs.get_regex_str(), compiled.pattern)
+        self.assertIs(compiled, rs.get_compiled())
+        self.assertIs(compiled, rs.get_compiled(0))
+
+        # One compiled pattern per combination of flags.
+        ignore_case = rs.get_compiled(re.IGNORECASE)
+        self.assertIsNot(compiled, ignore_case)
+        self.assertEqual(re.IGNORECASE, ignore_case.flags & re.IGNORECASE)
+        self.assertEqual([('AB', 0, 2), ('cd', 3, 5)], rs.get_match_triples('AB cd', case_insensitive=True))
+
+        # Repeated matching does not recompile.
+        nbr_compiled = len(rs._compiled)
+        for _ in range(3):
+            rs.get_match_triples('ab cd')
+        self.assertEqual(nbr_compiled, len(rs._compiled))
+
+    def test_compiled_pattern_invalidated(self):
+        rs1 = RegexString(['ab'])
+        rs2 = RegexString(['cd'])
+        concatenated = RegexString.concat(rs1, rs2)
+        # The placeholder pattern compiled for the empty RegexString built by
+        # concat() is not reused.
+        self.assertEqual('abcd', concatenated.get_compiled().pattern)
+        self.assertEqual([('abcd', 2, 6)], concatenated.get_match_triples('x abcd'))
+
+        rs = RegexString.from_regex(r'\d+')
+        self.assertEqual([('12', 0, 2)], rs.get_match_triples('12 ab'))
+        rs.regex_str = r'[a-z]+'
+        self.assertEqual(r'[a-z]+', rs.get_compiled().pattern)
+        self.assertEqual([('ab', 3, 5)], rs.get_match_triples('12 ab'))
+
 
 class TestEscapeFalse(unittest.TestCase):
     """Tests for escape=False, which allows regex metacharacters in match_strs."""
@@ -330,3 +366,267 @@ class TestEscapeFalse(unittest.TestCase):
         rs = RegexString([r'\d', r'\d{2}'], escape=False)
         self.assertEqual(r'(?:\d{2}|\d)', rs.get_regex_str())
 
+
+
+class TestTrie(unittest.TestCase):
+    """Tests for RegexString(..., trie=True)."""
+
+    def test_trie_regex_str(self):
+        rs = RegexString(['abcd', 'abc', 'abx', 'b'], trie=True)
+        self.assertEqual('(?:ab(?:cd?|x)|b)', rs.get_regex_str())
+
+        # Single characters become a character class; escaping is preserved.
+        rs = RegexString(['a', 'b', '-', 'the', 'then', 'a.b'], trie=True)
+        self.assertEqual(r'(?:then?|a(?:\.b)?|[b\-])', rs.get_regex_str())
+
+        # A single item is unaffected.
+        self.assertEqual('abc', RegexString(['abc'], trie=True).get_regex_str())
+
+    def test_trie_requires_escape(self):
+        with self.assertRaises(ValueError):
+            RegexString([r'\d+', 'abc'], escape=False, trie=True)
+
+    def test_trie_matches_flat_alternation(self):
+        rng = random.Random(11)
+        options = [{}, {'whole_word': True}, {'optional': True, 'append': 'b'},
+                   {'non_capturing': False}, {'prepend': r'\s'}]
+        for _ in range(300):
+            items = list({''.join(rng.choice('aAb.-') for _ in range(rng.randrange(1, 6)))
+                          for _ in range(rng.randrange(2, 30))})
+            text = ''.join(rng.choice('aAb .-') for _ in range(200))
+            kwargs = rng.choice(options)
+            flat = RegexString(list(items), **kwargs)
+            trie = RegexString(list(items), trie=True, **kwargs)
+            for case_insensitive in (False, True):
+                self.assertEqual(flat.get_match_triples(text, case_insensitive),
+                                 trie.get_match_triples(text, case_insensitive),
+                                 (items, kwargs, case_insensitive))
+
+        # Items which re.IGNORECASE, unlike str.lower(), treats as equal.
+        for items, text, expected in [(['ıs', 'i', 'ixyz'], 'IS', [('IS', 0, 2)]),
+                                      (['ſun', 's', 'sxyzw'], 'SUN', [('SUN', 0, 3)]),
+                                      (['ςa', 'σ', 'Σxyz'], 'σA', [('σA', 0, 2)])]:
+            flat = RegexString(items)
+            trie = RegexString(items, trie=True)
+            aho_corasick = RegexString(items, backend='aho_corasick')
+            self.assertEqual(expected, flat.get_match_triples(text, True))
+            self.assertEqual(expected, trie.get_match_triples(text, True), items)
+            self.assertEqual(expected, aho_corasick.get_match_triples(text, True))
+
+    def test_trie_longest_match(self):
+        rs = RegexString(['New', 'New York', 'New York City', 'York'], whole_word=True, trie=True)
+        self.assertEqual([('New York City', 0, 13), ('New York', 18, 26), ('New', 30, 33)],
+                         rs.get_match_triples('New York City and New York or New Yorker'))
+        self.assertEqual([('new york', 0, 8)], rs.get_match_triples('new york', case_insensitive=True))
+
+
+class TestAhoCorasickBackend(unittest.TestCase):
+    """Tests for RegexString(..., backend='aho_corasick')."""
+
+    def test_matches_regex_backend(self):
+        rng = random.Random(13)
+        options = [{}, {'whole_word': True}, {'non_capturing': False}]
+        for _ in range(300):
+            # 'ſ' and 's', and 'ς' and 'σ', are equal under re.IGNORECASE.
+            items = list({''.join(rng.choice('aAb._ sſSςσΣ') for _ in range(rng.randrange(1, 6)))
+                          for _ in range(rng.randrange(1, 30))})
+            text = ''.join(rng.choice('aAb ._sſSςσΣ') for _ in range(200))
+            kwargs = rng.choice(options)
+            regex = RegexString(list(items), **kwargs)
+            automaton = RegexString(list(items), backend='aho_corasick', **kwargs)
+            for case_insensitive in (False, True):
+                self.assertEqual(regex.get_match_triples(text, case_insensitive),
+                                 automaton.get_match_triples(text, case_insensitive),
+                                 (items, kwargs, case_insensitive))
+
+    def test_regex_still_built(self):
+        rs = RegexString(['red', 'dark red'], whole_word=True, backend='aho_corasick')
+        self.assertEqual(r'\b(?:dark\ red|red)\b', rs.get_regex_str())
+        concatenated = RegexString.concat(rs, RegexString(['wine']), insert_opt_ws=True)
+        self.assertEqual('regex', concatenated.backend)
+        self.assertEqual([('dark red wine', 0, 13)], concatenated.get_match_triples('dark red wine'))
+
+        # Once regex_str is reassigned, the regex is used.
+        rs.regex_str = r'\bdark\b'
+        self.assertEqual([('dark', 0, 4)], rs.get_match_triples('dark red'))
+
+    def test_invalid_backend(self):
+        with self.assertRaises(ValueError):
+            RegexString(['a', 'b'], backend='dfa')
+        for kwargs in [{'escape': False}, {'optional': True}, {'prepend': r'\s'}, {'append': 's'}]:
+            with self.assertRaises(ValueError):
+                RegexString(['a', 'b'], backend='aho_corasick', **kwargs)
+        with self.assertRaises(ValueError):
+            RegexString(['a', ''], backend='aho_corasick')
+
+
+class TestRequiredLiterals(unittest.TestCase):
+    """Tests for RegexString.get_required_literals() and could_match()."""
+
+    def test_required_literals(self):
+        rs = RegexString(['between', 'from'], prepend=r'\s', append=' ')
+        self.assertEqual([['between', 'from'], [' ']], rs.get_required_literals())
+        self.assertEqual([], RegexString(['kg', 'lbs'], optional=True).get_required_literals())
+        self.assertEqual([], RegexString([r'\d+'], escape=False).get_required_literals())
+
+        concatenated = RegexString.concat(RegexString(['dark', 'light']), RegexString(['red']),
+                                          insert_opt_ws=True)
+        self.assertEqual([['dark', 'light'], ['red']], concatenated.get_required_literals())
+
+        rs.regex_str = r'\bto\b'
+        self.assertEqual([['to']], rs.get_required_literals())
+
+    def test_could_match(self):
+        rs = RegexString(['Between', 'From'], whole_word=True)
+        self.assertTrue(rs.could_match('weighing From 3'))
+        self.assertFalse(rs.could_match('weighing from 3'))
+        self.assertTrue(rs.could_match('weighing from 3', case_insensitive=True))
+        # Necessary, not sufficient.
+        self.assertTrue(rs.could_match('Fromage'))
+        self.assertTrue(RegexString(['a'], optional=True).could_match(''))
+
+    def test_could_match_never_rejects_a_match(self):
+        rng = random.Random(19)
+        options = [{}, {'whole_word': True}, {'optional': True, 'append': 'b'},
+                   {'trie': True}, {'prepend': r'\s', 'append': r'a?'}]
+        for _ in range(300):
+            items = list({''.join(rng.choice('aAb.-') for _ in range(rng.randrange(1, 4)))
+                          for _ in range(rng.randrange(1, 5))})
+            text = ''.join(rng.choice('aAb .-') for _ in range(rng.randrange(0, 12)))
+            rs = RegexString(items, **rng.choice(options))
+            for case_insensitive in (False, True):
+                if rs.get_match_triples(text, case_insensitive):
+                    self.assertTrue(rs.could_match(text, case_insensitive), (rs, text))
+
+
+class TestBacktrackingRisks(unittest.TestCase):
+    """Tests for RegexString.get_backtracking_risks()."""
+
+    def test_backtracking_risks(self):
+        self.assertEqual([], RegexString(['New', 'New York'], whole_word=True).get_backtracking_risks())
+        risks = RegexString([r'(?:\w+\s?)+'], escape=False).get_backtracking_risks()
+        self.assertEqual(['nested'], [risk.kind for risk in risks])
+
+
+class TestBatchMatchTriples(unittest.TestCase):
+    """Tests for RegexString.get_batch_match_triples()."""
+
+    def test_matches_separate_calls(self):
+        rng = random.Random(23)
+        regex_strs = [RegexString.from_regex(regex) for regex in
+                      [r'\d+', r'\b(?:a|ab)\b', r'\W+', r'[^a]*', r'.', r'x*', r'a\s?b',
+                       r'^a', r'b$', r'(?<=a)b', r'(?!a)\w']]
+        regex_strs += [RegexString(['a', 'ab', 'b x'], whole_word=True),
+                       RegexString(['a', 'ab', 'b x'], backend='aho_corasick'),
+                       RegexString(['ab', 'A'], whole_word=True, backend='aho_corasick')]
+        for _ in range(200):
+            texts = [''.join(rng.choice('ab1 x\x00') for _ in range(rng.randrange(0, 8)))
+                     for _ in range(rng.randrange(0, 10))]
+            rs = rng.choice(regex_strs)
+            for case_insensitive in (False, True):
+                expected = [rs.get_match_triples(text, case_insensitive) for text in texts]
+                self.assertEqual(expected, rs.get_batch_match_triples(texts, case_insensitive),
+                                 (rs, texts))
+
+    def test_local_offsets(self):
+        rs = RegexString(['kg', 'lbs'], prepend=r'\d+\s', whole_word=True)
+        self.assertEqual([[('5 kg', 0, 4)], [], [('10 lbs', 4, 10), ('2 kg', 15, 19)]],
+                         rs.get_batch_match_triples(['5 kg', 'none', 'was 10 lbs, or 2 kg']))
+        self.assertEqual([], rs.get_batch_match_triples([]))
+
+
+class TestIterMatchTriples(unittest.TestCase):
+    """Tests for RegexString.iter_match_triples()."""
+
+    def test_matches_get_match_triples(self):
+        rng = random.Random(29)
+        regex_strs = [RegexString.from_regex(r'\d+'), RegexString(['a', 'ab', 'b a'], whole_word=True),
+                      RegexString(['a', 'ab', 'b a'], backend='aho_corasick'),
+                      RegexString(['ab', 'A', 'bab b'], whole_word=True, backend='aho_corasick')]
+        for _ in range(200):
+            text = ''.join(rng.choice('abA1 ') for _ in range(rng.randrange(0, 40)))
+            rs = rng.choice(regex_strs)
+            for case_insensitive in (False, True):
+                self.assertEqual(rs.get_match_triples(text, case_insensitive),
+                                 list(rs.iter_match_triples(text, case_insensitive)))
+
+                # A window behaves as the pos and endpos arguments of finditer().
+                start = rng.randrange(0, len(text) + 1)
+                end = rng.randrange(start, len(text) + 1)
+                regex = RegexString.from_regex(rs.get_regex_str())
+                self.assertEqual(list(regex.iter_match_triples(text, case_insensitive, start, end)),
+                                 list(rs.iter_match_triples(text, case_insensitive, start, end)),
+                                 (rs, text, start, end))
+
+    def test_lazy(self):
+        rs = RegexString(['kg'], backend='aho_corasick')
+        triples = rs.iter_match_triples('1 kg ' * 100_000)
+        self.assertEqual(('kg', 2, 4), next(triples))
+        self.assertEqual(('kg', 7, 9), next(triples))
+        self.assertEqual([('kg', 7, 9)], list(rs.iter_match_triples('1 kg 2 kg 3', start=5, end=10)))
+
+
+class TestAsciiInput(unittest.TestCase):
+    """Tests for the re.ASCII fast path of RegexString(..., ascii_input=...)."""
+
+    def test_same_matches(self):
+        rng = random.Random(31)
+        regexes = [r'\b\w+\b', r'\s\S+', r'\d+\s?(?:kg|lbs)', r'(?i)k\w', r'[^\W\d]+', r'ab|cd']
+        for _ in range(200):
+            text = ''.join(rng.choice('ab kG1_\x1c\t.') for _ in range(rng.randrange(0, 30)))
+            regex = rng.choice(regexes)
+            unicode_rs = RegexString([regex], escape=False, ascii_input=False)
+            for ascii_input in (None, True):
+                rs = RegexString([regex], escape=False, ascii_input=ascii_input)
+                for case_insensitive in (False, True):
+                    expected = unicode_rs.get_match_triples(text, case_insensitive)
+                    if ascii_input is None or '\x1c' not in text:
+                        self.assertEqual(expected, rs.get_match_triples(text, case_insensitive))
+                        self.assertEqual(expected, list(rs.iter_match_triples(text, case_insensitive)))
+                        self.assertEqual([expected, expected],
+                                         rs.get_batch_match_triples([text, text], case_insensitive))
+
+    def test_ascii_flag_used(self):
+        rs = RegexString([r'\w+'], escape=False)
+        self.assertEqual([('caf', 0, 3)], RegexString([r'\w+'], escape=False, ascii_input=True)
+                         .get_match_triples('café'))
+        # Non-ASCII text is detected.
+        self.assertEqual([('café', 0, 4)], rs.get_match_triples('café'))
+        rs.get_match_triples('cafe')
+        self.assertIn(re.ASCII, rs._compiled)
+
+        # Regexes which re.ASCII would change, or not affect, are compiled without it.
+        rs = RegexString(['\u212a'], whole_word=True)
+        self.assertEqual([('k', 0, 1)], rs.get_match_triples('k', case_insensitive=True))
+        self.assertEqual([re.IGNORECASE], list(rs._compiled))
+        rs = RegexString(['ab', 'cd'])
+        rs.get_match_triples('ab cd')
+        self.assertEqual([0], list(rs._compiled))
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_fingerprint(self):
+        rs = RegexString(['kg', 'lbs'], whole_word=True)
+        self.assertEqual(rs.get_fingerprint(), RegexString(['lbs', 'kg'], whole_word=True).get_fingerprint())
+        # The backend does not change which matches are found.
+        self.assertEqual(rs.get_fingerprint(),
+                         RegexString(['kg', 'lbs'], whole_word=True, backend='aho_corasick').get_fingerprint())
+        self.assertNotEqual(rs.get_fingerprint(), rs.get_fingerprint(case_insensitive=True))
+        self.assertNotEqual(rs.get_fingerprint(), RegexString(['kg', 'lbs']).get_fingerprint())
+
+        before = rs.get_fingerprint()
+        rs.regex_str = rs.regex_str + 's?'
+        self.assertNotEqual(before, rs.get_fingerprint())
+
+    def test_pickle(self):
+        text = 'It weighs 12 kg or 26 lbs.'
+        rs = RegexString(['kg', 'lbs'], whole_word=True)
+        rs.get_match_triples(text)
+        rs.get_required_literals()
+        loaded = pickle.loads(pickle.dumps(rs))
+        # Caches derived from the regex are not pickled.
+        self.assertEqual({}, loaded._compiled)
+        self.assertEqual({}, loaded._required_literals)
+        self.assertEqual(rs.get_fingerprint(), loaded.get_fingerprint())
+        self.assertEqual(rs.get_match_triples(text), loaded.get_match_triples(text))
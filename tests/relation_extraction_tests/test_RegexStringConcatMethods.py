@@ -3,7 +3,10 @@ Test the RegexString concat() and concat_with_word_distances() methods.
 Use these tests for examples on how to use the class in the easiest way.
 """
 
+import random
 import re
+import sys
+import time
 import unittest
 
 from text_to_relations.relation_extraction.RegexString import RegexString
@@ -574,3 +577,81 @@ class TestRegexString(unittest.TestCase):
         expected = ['a monkey .', '.', 'a sad monkey.']
         self.assertEqual(expected, match_strs)
 
+
+@unittest.skipUnless(sys.version_info >= (3, 11), "Possessive quantifiers require Python 3.11+.")
+class TestPossessiveJoins(unittest.TestCase):
+    """
+    concat_with_word_distances() also builds a regex with possessive
+    quantifiers, which get_compiled() uses on Python 3.11+.
+    """
+
+    TEXTS = [
+        'i saw a sad monkey. it made me sad to see a morose monkey. the monkey was '
+        'the saddest monkey ever seen. such a sad, sad monkey.',
+        'A monkey. A sad monkey; (saw "the" monkey) -- sad--monkey,  a  sad  monkey',
+    ]
+    WORDS = ['saw', 'see', 'a', 'the', 'sad', 'saddest', 'morose', 'monkey', 'sadness',
+             'a,', '(the', 'monkey.', '"sad"', '--', 'xsaw']
+
+    def make_rs(self, rng):
+        items = rng.sample(['saw', 'see', 'a', 'the', 'sad', 'saddest', 'morose', 'monkey'], rng.randint(1, 3))
+        return RegexString(items, optional=rng.random() < 0.3, whole_word=rng.random() < 0.3)
+
+    def testSameMatches(self):
+        rng = random.Random(0)
+        texts = list(self.TEXTS)
+        for _ in range(30):
+            texts.append(''.join(rng.choice(self.WORDS) + rng.choice([' ', ' ', ' ', '  ', '\n', ''])
+                                 for _ in range(rng.randint(5, 40))))
+        for _ in range(300):
+            rs = self.make_rs(rng)
+            for _ in range(rng.randint(1, 3)):
+                min_nbr_words = rng.randint(0, 2)
+                if rng.random() < 0.2:
+                    rs = RegexString.concat(rs, self.make_rs(rng), insert_opt_ws=rng.random() < 0.5)
+                else:
+                    rs = RegexString.concat_with_word_distances(rs, self.make_rs(rng), min_nbr_words,
+                                                                min_nbr_words + rng.randint(0, 3))
+            try:
+                canonical = re.compile(rs.get_regex_str())
+            except re.error:
+                # Not every combination of options gives a valid regex.
+                continue
+            self.assertEqual(r'\S+' in rs.get_regex_str(), rs.get_regex_str() != rs.get_compiled().pattern)
+            for text in texts:
+                for flags in (0, re.IGNORECASE):
+                    expected = [(m.group(), m.start(), m.end())
+                                for m in re.compile(rs.get_regex_str(), flags).finditer(text)]
+                    self.assertEqual(expected, rs.get_match_triples(text, bool(flags)),
+                                     f"{rs.get_regex_str()} on {text!r}")
+                self.assertEqual(canonical.findall(text), rs.get_compiled().findall(text))
+
+    def testCanonicalRegexStr(self):
+        rs1 = RegexString(['saw', 'see'], optional=True)
+        rs2 = RegexString(['a', 'the'], optional=True)
+        rs = RegexString.concat_with_word_distances(rs1, rs2, 1, 2)
+        self.assertEqual(r'(?:(?:saw|see)(?:\b\S+)?)?(?:\s\S+){1,2}\s(?:the|a)?', rs.get_regex_str())
+        self.assertEqual(r'(?:(?:saw|see)(?:\b\S++)?+)?(?:\s\S++){1,2}\s(?:the|a)?',
+                         rs.get_compiled().pattern)
+
+        # Assigning regex_str drops the possessive form.
+        rs.regex_str = rs.regex_str
+        self.assertEqual(rs.get_regex_str(), rs.get_compiled().pattern)
+
+    def testLessBacktracking(self):
+        # Long words which the first regex matches and the second never does.
+        rs = RegexString.concat_with_word_distances(
+            RegexString(['abc']), RegexString(['xyz']), min_nbr_words=0, max_nbr_words=8)
+        text = ' '.join(['abc'] + ['w' * 1000] * 10 + [''])
+        text = text * 20
+        canonical = re.compile(rs.get_regex_str())
+
+        def best_time(pattern):
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                self.assertEqual([], pattern.findall(text))
+                times.append(time.perf_counter() - start)
+            return min(times)
+
+        self.assertLess(best_time(rs.get_compiled()) * 2, best_time(canonical))
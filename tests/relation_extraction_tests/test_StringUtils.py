@@ -61,3 +61,9 @@ class TestStringUtils(unittest.TestCase):
         # Reverse line feed control character.
         actual = StringUtils.is_all_word_chars(u"\u008D")
         self.assertEqual(False, actual)
+
+    def testFingerprint(self):
+        self.assertEqual(StringUtils.fingerprint({'a': 1, 'b': [2, 'é']}),
+                         StringUtils.fingerprint({'b': [2, 'é'], 'a': 1}))
+        self.assertNotEqual(StringUtils.fingerprint({'a': 1}), StringUtils.fingerprint({'a': '1'}))
+        self.assertEqual(64, len(StringUtils.fingerprint(None)))
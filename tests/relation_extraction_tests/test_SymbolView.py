@@ -0,0 +1,84 @@
+import random
+import unittest
+
+from text_to_relations.relation_extraction import SymbolView
+from text_to_relations.relation_extraction import TypeRegistry
+from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC, SimpleExtractionPhase, ChainLink
+from text_to_relations.relation_extraction.RegexString import RegexString
+
+
+class TestSymbolView(unittest.TestCase):
+
+    def testBuildSymbolRepresentation(self):
+        text = 'The range is 80 to 90.'
+        anns = [Annotation('CARDINAL', '80', 13, 15), Annotation('CARDINAL', '90', 19, 21)]
+        symbol_view_str, view_anns = ExtractionPhaseABC.build_symbol_representation(text, anns)
+        self.assertEqual(ExtractionPhaseABC.build_merged_representation(text, anns),
+                         ''.join(str(ann) for ann in view_anns))
+        self.assertEqual(len(view_anns), len(symbol_view_str))
+        self.assertEqual(['Token', 'Token', 'Token', 'CARDINAL', 'Token', 'CARDINAL', 'Token'],
+                         [ann.type for ann in view_anns])
+        self.assertEqual(SymbolView.type_symbol(TypeRegistry.get_type_id('CARDINAL')), symbol_view_str[3])
+
+    def testTypeClass(self):
+        TypeRegistry.get_type_id('SymbolViewTestType')
+        TypeRegistry.get_type_id('SymbolViewTestTypeLong')
+        # Like <'SymbolViewTestType[^>]*>, the class covers the longer name.
+        self.assertRegex(SymbolView.type_symbol(TypeRegistry.get_type_id('SymbolViewTestTypeLong')),
+                         SymbolView.build_type_class('SymbolViewTestType'))
+        self.assertNotRegex(SymbolView.type_symbol(TypeRegistry.get_type_id('SymbolViewTestType')),
+                            SymbolView.build_type_class('SymbolViewTestTypeLong'))
+        self.assertNotRegex('anything', SymbolView.build_type_class('NoSuchSymbolViewType'))
+
+    def testInvalidView(self):
+        with self.assertRaises(ValueError):
+            SimpleExtractionPhase(
+                relation_name='Weight',
+                regex_patterns={'Number': RegexString([r'\d+'], escape=False),
+                                'Unit': RegexString(['kg'])},
+                chain=[ChainLink('Number', 'number', 0, 1, 'Unit', 'unit')],
+                annotation_view='compact')
+
+    def testSameRelations(self):
+        # Random documents and chains: both views find the same relations.
+        rng = random.Random(0)
+        words = ['weighs', 'weight', 'about', 'kg', 'lbs', 'between', 'and', 'the', '.', ',']
+        patterns = {'Verb': RegexString(['weighs', 'weight'], whole_word=True),
+                    'Number': RegexString([r'\d+'], escape=False),
+                    'NumberRange': RegexString([r'\d+-\d+'], escape=False),
+                    'Unit': RegexString(['kg', 'lbs'], whole_word=True),
+                    'Between': RegexString(['between'], whole_word=True)}
+        chains = [
+            [ChainLink('Verb', 'verb', 0, 2, 'Number', 'number'),
+             ChainLink('Number', 'number', 0, 3, 'Unit', 'unit')],
+            [ChainLink('Between', 'between', 0, 1, 'Number', 'min'),
+             ChainLink('Number', 'min', 0, 2, 'Number', 'max'),
+             ChainLink('Number', 'max', 0, 1, 'Unit', 'unit')],
+            [ChainLink('Number', 'number', 1, 4, 'Unit', 'unit'),
+             ChainLink('Unit', 'unit', 0, 5, 'Verb', 'verb')],
+        ]
+        for _ in range(200):
+            tokens = [rng.choice(words) if rng.random() < 0.6 else
+                      str(rng.randrange(100)) if rng.random() < 0.8 else
+                      f'{rng.randrange(10)}-{rng.randrange(10, 100)}'
+                      for _ in range(rng.randrange(5, 40))]
+            text = ' '.join(tokens)
+            chain = rng.choice(chains)
+            for overlap_strategy in [None, 'longest']:
+                text_phase = SimpleExtractionPhase('Rel', patterns, chain, overlap_strategy=overlap_strategy)
+                symbols_phase = SimpleExtractionPhase('Rel', patterns, chain, overlap_strategy=overlap_strategy,
+                                                      annotation_view='symbols')
+                try:
+                    expected = text_phase.find_match(text)
+                except ValueError:
+                    # Overlapping annotations the text view cannot merge either.
+                    with self.assertRaises(ValueError):
+                        symbols_phase.find_match(text)
+                    continue
+                self.assertEqual(expected, symbols_phase.find_match(text), text)
+                self.assertEqual(text_phase.get_fingerprint(), symbols_phase.get_fingerprint())
+
+
+if __name__ == '__main__':
+    unittest.main()
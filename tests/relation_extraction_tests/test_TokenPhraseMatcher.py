@@ -0,0 +1,99 @@
+import unittest
+
+from text_to_relations.relation_extraction.ExtractionPhaseABC import SimpleExtractionPhase, ChainLink
+from text_to_relations.relation_extraction.PhaseProfiler import PhaseProfiler
+from text_to_relations.relation_extraction.RegexString import RegexString
+from text_to_relations.relation_extraction.TokenAnn import TokenAnn
+from text_to_relations.relation_extraction.TokenPhraseMatcher import TokenPhraseMatcher
+from text_to_relations.relation_extraction.extraction_loop import get_sorted_annotations_for_matching
+
+
+class TestTokenPhraseMatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.phrases = ['within the range of', 'within', 'range', 'range of motion']
+        self.text = 'It is within the range of 5 and within limits; the range of motion is wide. Within range'
+
+    def testMatchTriples(self):
+        matcher = TokenPhraseMatcher(self.phrases)
+        expected = [('within the range of', 6, 25), ('within', 32, 38),
+                    ('range of motion', 51, 66), ('range', 83, 88)]
+        self.assertEqual(expected, matcher.get_match_triples(self.text))
+        # Same matches as the equivalent whole-word RegexString.
+        regex_str = RegexString(self.phrases, whole_word=True)
+        self.assertEqual(regex_str.get_match_triples(self.text), matcher.get_match_triples(self.text))
+
+        tokens = TokenAnn.get_token_objects(self.text, 0)
+        self.assertEqual(expected, matcher.get_match_triples(self.text, tokens=tokens))
+        self.assertEqual(expected[1:3], list(matcher.iter_match_triples(self.text, start=26, end=70)))
+
+    def testWholeTokens(self):
+        matcher = TokenPhraseMatcher(['range of'])
+        self.assertEqual([], matcher.get_match_triples('the rangefinder of'))
+        self.assertEqual([('range  of', 4, 13)], matcher.get_match_triples('the range  of'))
+
+    def testCaseInsensitive(self):
+        matcher = TokenPhraseMatcher(['within the range of'], case_insensitive=True)
+        self.assertEqual([('within the range of', 6, 25)], matcher.get_match_triples(self.text[:30]))
+        self.assertEqual([('WITHIN THE RANGE OF', 0, 19)], matcher.get_match_triples('WITHIN THE RANGE OF'))
+        self.assertTrue(matcher.could_match('WITHIN'))
+
+        matcher = TokenPhraseMatcher(['within'])
+        self.assertEqual([], matcher.get_match_triples('WITHIN'))
+        self.assertFalse(matcher.could_match('WITHIN'))
+        with self.assertRaises(ValueError):
+            matcher.get_match_triples('WITHIN', case_insensitive=True)
+
+    def testInvalid(self):
+        with self.assertRaises(ValueError):
+            TokenPhraseMatcher('within the range of')
+        with self.assertRaises(ValueError):
+            TokenPhraseMatcher(['within', '  '])
+
+    def testFingerprint(self):
+        matcher = TokenPhraseMatcher(self.phrases)
+        self.assertEqual(matcher.get_fingerprint(), TokenPhraseMatcher(list(reversed(self.phrases))).get_fingerprint())
+        self.assertEqual(matcher, TokenPhraseMatcher(list(reversed(self.phrases))))
+        self.assertNotEqual(matcher.get_fingerprint(),
+                            TokenPhraseMatcher(self.phrases, case_insensitive=True).get_fingerprint())
+        self.assertNotEqual(matcher.get_fingerprint(), TokenPhraseMatcher(self.phrases[1:]).get_fingerprint())
+
+    def testSortedAnnotations(self):
+        patterns = {'Range': TokenPhraseMatcher(['within the range of']),
+                    'Number': RegexString([r'\d+'], escape=False)}
+        text = 'It is within the range of 5 and 7.'
+        expected = [('Range', 6, 25), ('Number', 26, 27), ('Number', 32, 33)]
+        anns = get_sorted_annotations_for_matching(text, patterns, [])
+        self.assertEqual(expected, [(ann.type, ann.start_offset, ann.end_offset) for ann in anns])
+
+    def testPhase(self):
+        chain = [ChainLink('Range', 'range', 0, 0, 'Number', 'min'),
+                 ChainLink('Number', 'min', 0, 1, 'Unit', 'unit')]
+        text = 'Set it within the range of 5 kg. It was within the range of 7 lbs.'
+        profiler = PhaseProfiler()
+        phase = SimpleExtractionPhase(
+            relation_name='Limit',
+            regex_patterns={'Range': TokenPhraseMatcher(['within the range of', 'in the range of']),
+                            'Number': RegexString([r'\d+'], escape=False),
+                            'Unit': RegexString(['kg', 'lbs'], whole_word=True)},
+            chain=chain, profiler=profiler)
+        regex_phase = SimpleExtractionPhase(
+            relation_name='Limit',
+            regex_patterns={'Range': RegexString(['within the range of', 'in the range of'], whole_word=True),
+                            'Number': RegexString([r'\d+'], escape=False),
+                            'Unit': RegexString(['kg', 'lbs'], whole_word=True)},
+            chain=chain)
+
+        results = phase.find_match(text)
+        self.assertEqual(2, len(results))
+        self.assertEqual(regex_phase.find_match(text), results)
+        self.assertEqual('within the range of', results[0]['range'])
+        self.assertNotEqual(phase.get_fingerprint(), regex_phase.get_fingerprint())
+        rows = {row[0]: row[1:] for row in profiler.get_report()}
+        self.assertEqual((1, 2), rows["regex_patterns['Range']"][1:])
+        # Tokenizing for the matcher and building the annotation view.
+        self.assertEqual(2, rows['tokenization'][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
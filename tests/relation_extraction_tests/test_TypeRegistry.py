@@ -0,0 +1,45 @@
+import threading
+import unittest
+
+from text_to_relations.relation_extraction import TypeRegistry
+
+
+class TestTypeRegistry(unittest.TestCase):
+
+    def testGetTypeId(self):
+        type_id = TypeRegistry.get_type_id('RegistryTestType')
+        self.assertEqual(type_id, TypeRegistry.get_type_id('RegistryTestType'))
+        self.assertEqual(type_id, TypeRegistry.lookup_type_id('RegistryTestType'))
+        self.assertEqual('RegistryTestType', TypeRegistry.get_type_name(type_id))
+        self.assertEqual('RegistryTestType', TypeRegistry.get_type_names()[type_id])
+        self.assertNotEqual(type_id, TypeRegistry.get_type_id('OtherRegistryTestType'))
+
+        self.assertEqual('Token', TypeRegistry.get_type_name(TypeRegistry.TOKEN_TYPE_ID))
+
+    def testLookupDoesNotRegister(self):
+        nbr_types = TypeRegistry.get_nbr_types()
+        self.assertEqual(nbr_types, len(TypeRegistry.get_type_names()))
+        self.assertIsNone(TypeRegistry.lookup_type_id('NeverRegisteredType'))
+        self.assertEqual(nbr_types, TypeRegistry.get_nbr_types())
+
+    def testUnknownId(self):
+        with self.assertRaises(ValueError):
+            TypeRegistry.get_type_name(-1)
+        with self.assertRaises(ValueError):
+            TypeRegistry.get_type_name(TypeRegistry.get_nbr_types())
+
+    def testConcurrentRegistration(self):
+        results = []
+
+        def register():
+            results.append([TypeRegistry.get_type_id(f'ConcurrentType{i}') for i in range(200)])
+
+        threads = [threading.Thread(target=register) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Every thread saw the same id for every name.
+        self.assertTrue(all(ids == results[0] for ids in results))
+        self.assertEqual(200, len(set(results[0])))
@@ -4,7 +4,9 @@ import inspect
 from text_to_relations.relation_extraction.RegexString import RegexString
 from text_to_relations.relation_extraction.ExtractionPhaseABC import ExtractionPhaseABC, ChainLink, SimpleExtractionPhase
 from text_to_relations.relation_extraction.TokenAnn import TokenAnn
-from text_to_relations.relation_extraction.extraction_loop import ExtractionLoop, run_loop, get_sorted_annotations_for_matching
+from text_to_relations.relation_extraction.Annotation import Annotation
+from text_to_relations.relation_extraction.extraction_loop import (
+    ExtractionLoop, run_loop, get_sorted_annotations_for_matching, iter_sorted_annotations_for_matching)
 
 
 def _simple_properties(match_triples):
@@ -226,3 +228,151 @@ class TestExtractionLoop(unittest.TestCase):
             'max': '92',
             'UNIT_OF_MEASUREMENT_2': 'ft-lb',
         }], relations)
+
+    def test_get_sorted_annotations_for_matching(self):
+        text = "between 1 and 2 or between 3 and 45 units"
+        regex_strs = {
+            'Number': RegexString([r'\d+'], escape=False),
+            'Range': RegexString(['between']),
+            'Digit': RegexString([r'\d'], escape=False),
+        }
+        given_anns = [Annotation('Unit', 'units', 36, 41),
+                      Annotation('Number', '1', 8, 9),
+                      Annotation('Conj', 'and', 10, 13)]
+        given_copy = list(given_anns)
+
+        actual = get_sorted_annotations_for_matching(text=text, regex_strs=regex_strs,
+                                                     given_anns=given_anns)
+
+        # Same result as concatenating everything and sorting, ties included.
+        concatenated = list(given_anns)
+        for key, regex_str in regex_strs.items():
+            concatenated += [Annotation(key, *triple) for triple in regex_str.get_match_triples(text)]
+        expected = Annotation.sort(concatenated)
+        self.assertEqual(expected, actual)
+        self.assertEqual([ann.type for ann in expected], [ann.type for ann in actual])
+        self.assertEqual(['Range', 'Number', 'Number', 'Digit', 'Conj'], [ann.type for ann in actual[:5]])
+
+        # The given list is left untouched.
+        self.assertEqual(given_copy, given_anns)
+
+        # The iterator variant yields the same annotations lazily.
+        iterator = iter_sorted_annotations_for_matching(text, regex_strs, given_anns)
+        self.assertEqual(expected[0], next(iterator))
+        self.assertEqual(expected[1:], list(iterator))
+
+    def test_get_sorted_annotations_with_overlap_strategy(self):
+        text = "He paid 15,000,000 dollars for 3 million shares."
+        regex_strs = {
+            'Money': RegexString([r'[\d,]+ dollars'], escape=False),
+            'Number': RegexString([r'\d[\d,]*'], escape=False),
+            'Quantity': RegexString([r'\d+ million'], escape=False),
+        }
+
+        unresolved = get_sorted_annotations_for_matching(text, regex_strs, [])
+        self.assertEqual(['Number', 'Money', 'Number', 'Quantity'], [ann.type for ann in unresolved])
+
+        resolved = get_sorted_annotations_for_matching(text, regex_strs, [], overlap_strategy='longest')
+        self.assertEqual(['Money', 'Quantity'], [ann.type for ann in resolved])
+        view = ExtractionPhaseABC.build_merged_representation(text, resolved)
+        self.assertEqual(resolved, [ann for ann in ExtractionPhaseABC.merged_representation_to_annotations(view)
+                                    if ann.type != 'Token'])
+
+        resolved = get_sorted_annotations_for_matching(text, regex_strs, [], overlap_strategy='priority',
+                                                       type_priority=['Number'])
+        self.assertEqual(['15,000,000', '3'], [ann.text for ann in resolved])
+
+    def test_get_sorted_annotations_with_deduplication(self):
+        text = "He paid 15,000,000 dollars."
+        regex_strs = {'Number': RegexString([r'\d[\d,]*'], escape=False)}
+        given_anns = [Annotation('Number', '15,000,000', 8, 18, {'source': 'ner'}),
+                      Annotation('Unit', 'dollars', 19, 26)]
+
+        actual = get_sorted_annotations_for_matching(text, regex_strs, given_anns)
+        self.assertEqual(['Number', 'Number', 'Unit'], [ann.type for ann in actual])
+
+        actual = get_sorted_annotations_for_matching(text, regex_strs, given_anns, deduplicate='first')
+        self.assertEqual(given_anns, actual)
+
+        # Given annotations come before the patterns' on the same span.
+        actual = get_sorted_annotations_for_matching(text, regex_strs, given_anns[:1], deduplicate='merge')
+        self.assertEqual([{'source': 'ner'}], [ann.properties for ann in actual])
+
+        phase = SimpleExtractionPhase(relation_name='Payment', regex_patterns=regex_strs,
+                                      chain=[], deduplicate='first')
+        self.assertEqual('first', phase.deduplicate)
+        with self.assertRaises(ValueError):
+            SimpleExtractionPhase(relation_name='Payment', regex_patterns=regex_strs,
+                                  chain=[], deduplicate='all')
+
+    def test_phase_could_match(self):
+        regex_patterns = {
+            'Weight': RegexString([r'\d+ kg'], escape=False),
+            'Price': RegexString([r'\d+ dollars'], escape=False),
+            'Container': RegexString(['box', 'crate']),
+        }
+        chain = [ChainLink(start_type='Weight', start_property='weight', min_distance=0,
+                           max_distance=3, end_type='Price', end_property='price'),
+                 ChainLink(start_type='Price', start_property='price', min_distance=0,
+                           max_distance=1, end_type='Container', end_property='container')]
+        phase = SimpleExtractionPhase(relation_name='WeightPrice', regex_patterns=regex_patterns,
+                                      chain=chain)
+
+        text = "The package weighs 5 kg and costs 5 dollars per box."
+        self.assertTrue(phase.could_match(text))
+        self.assertEqual(1, len(phase.find_match(text)))
+
+        text = "The package weighs 5 kg and costs 5 dollars per bag."
+        self.assertFalse(phase.could_match(text))
+        self.assertEqual([], phase.find_match(text))
+
+        # Types supplied by entity_annotations impose no condition.
+        entity_annotations = [{'type': 'Container', 'text': 'bag', 'start': 48, 'end': 51}]
+        self.assertTrue(phase.could_match(text, entity_annotations))
+        self.assertEqual('bag', phase.find_match(text, entity_annotations)[0]['container'])
+
+    def test_phase_could_match_type_prefix(self):
+        # <'Unit[^>]*> in the chain regex also matches 'UnitLong' and 'UnitX'.
+        chain = [ChainLink('Verb', 'verb', 0, 0, 'Number', 'number'),
+                 ChainLink('Number', 'number', 0, 0, 'Unit', 'unit')]
+        text = 'It weighs 5 pounds.'
+        regex_patterns = {'Verb': RegexString(['weighs']), 'Number': RegexString([r'\d+'], escape=False),
+                          'Unit': RegexString(['kg']), 'UnitLong': RegexString(['pounds'])}
+        phase = SimpleExtractionPhase(relation_name='Weight', regex_patterns=regex_patterns, chain=chain)
+        self.assertTrue(phase.could_match(text))
+        self.assertEqual('pounds', phase.find_match(text)[0]['unit'])
+
+        del regex_patterns['UnitLong']
+        phase = SimpleExtractionPhase(relation_name='Weight', regex_patterns=regex_patterns, chain=chain)
+        self.assertFalse(phase.could_match(text))
+        entity_annotations = [{'type': 'UnitX', 'text': 'pounds', 'start': 12, 'end': 18}]
+        self.assertTrue(phase.could_match(text, entity_annotations))
+        self.assertEqual('pounds', phase.find_match(text, entity_annotations)[0]['unit'])
+
+    def test_phase_overlap_strategy(self):
+        text = "The package weighs 5 kg and costs 5 dollars per box."
+        regex_patterns = {
+            'Weight': RegexString([r'\d+ kg'], escape=False),
+            'Price': RegexString([r'\d+ dollars'], escape=False),
+            'Container': RegexString(['box', 'crate']),
+        }
+        # An external tool also tagged both numbers.
+        entity_annotations = [
+            {'type': 'CARDINAL', 'text': '5', 'start': 19, 'end': 20},
+            {'type': 'CARDINAL', 'text': '5', 'start': 34, 'end': 35},
+        ]
+        chain = [ChainLink(start_type='Weight', start_property='weight', min_distance=0,
+                           max_distance=3, end_type='Price', end_property='price'),
+                 ChainLink(start_type='Price', start_property='price', min_distance=0,
+                           max_distance=1, end_type='Container', end_property='container')]
+
+        phase = SimpleExtractionPhase(relation_name='WeightPrice', regex_patterns=regex_patterns,
+                                      chain=chain, overlap_strategy='longest')
+        self.assertEqual([{
+            'type': 'WeightPrice', 'text': '5 kg and costs 5 dollars per box', 'start': 19, 'end': 51,
+            'weight': '5 kg', 'price': '5 dollars', 'container': 'box',
+        }], phase.find_match(text, entity_annotations=entity_annotations))
+
+        phase = SimpleExtractionPhase(relation_name='WeightPrice', regex_patterns=regex_patterns,
+                                      chain=chain, overlap_strategy='priority', type_priority=['CARDINAL'])
+        self.assertEqual([], phase.find_match(text, entity_annotations=entity_annotations))